@@ -0,0 +1,294 @@
+"""
+Cold start benchmark
+====================
+
+Runs every public entry point of inqdo_tools in a fresh interpreter, against moto, and
+records the wall time, the import time (``-X importtime``) and the peak RSS.
+
+The results are written as JSON so they can be stored per release and compared::
+
+    $ python benchmarks/cold_start.py --repeat 5 --output cold_start-1.3.7.json
+    $ python benchmarks/cold_start.py --compare cold_start-1.3.7.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import textwrap
+import time
+from datetime import datetime, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# The repository layout, or the docker-compose layout where the package is mounted in the root
+SOURCE = os.path.join(ROOT, "inqdo_tools", "src")
+if not os.path.isdir(SOURCE):
+    SOURCE = ROOT
+
+# Name -> (import statement, moto mocks, setup with a separate boto3 session, first call)
+ENTRY_POINTS = {
+    "Invoker": (
+        "from inqdo_tools import Invoker",
+        [],
+        "",
+        """
+        Invoker(
+            event={"body": '{"message": "benchmark"}'},
+            context={},
+            file="benchmark.py",
+            delegate=lambda event, body, logger, context: body,
+        ).lambda_handler()
+        """,
+    ),
+    "DynamoDBClient": (
+        "from inqdo_tools import DynamoDBClient",
+        ["mock_dynamodb", "mock_sts"],
+        """
+        session.client("dynamodb").create_table(
+            TableName="benchmark",
+            KeySchema=[{"AttributeName": "id", "KeyType": "HASH"}],
+            AttributeDefinitions=[{"AttributeName": "id", "AttributeType": "S"}],
+            BillingMode="PAY_PER_REQUEST",
+        )
+        """,
+        """
+        client = DynamoDBClient(table_name="benchmark")
+        client.create_and_update(data={"id": "benchmark", "value": "1"})
+        client.read(table_primary_key="id", value_primary_key="benchmark")
+        """,
+    ),
+    "S3Client": (
+        "from inqdo_tools import S3Client",
+        ["mock_s3"],
+        """
+        session.client("s3").create_bucket(
+            Bucket="benchmark",
+            CreateBucketConfiguration={"LocationConstraint": "eu-west-1"},
+        )
+        """,
+        """
+        S3Client(bucket_name="benchmark").list_objects()
+        """,
+    ),
+    "ParameterStore": (
+        "from inqdo_tools import ParameterStore",
+        ["mock_ssm"],
+        """
+        session.client("ssm").put_parameter(Name="/benchmark/key", Value="value", Type="String")
+        """,
+        """
+        ParameterStore(prefix="/benchmark")["key"]
+        """,
+    ),
+    "EventsClient": (
+        "from inqdo_tools import EventsClient",
+        ["mock_events"],
+        "",
+        """
+        EventsClient(detail_type="benchmark", bus_name="default").put_events(
+            source="benchmark",
+            body={"message": "benchmark"},
+        )
+        """,
+    ),
+}
+
+CHILD_TEMPLATE = """
+import json
+import os
+import resource
+import sys
+import time
+
+for key in ("AWS_ACCESS_KEY_ID", "AWS_SECRET_ACCESS_KEY", "AWS_SECURITY_TOKEN", "AWS_SESSION_TOKEN"):
+    os.environ[key] = "testing"
+os.environ["AWS_DEFAULT_REGION"] = "eu-west-1"
+
+
+def peak_rss_kb():
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss // 1024 if sys.platform == "darwin" else rss
+
+
+start = time.perf_counter()
+{import_statement}
+import_seconds = time.perf_counter() - start
+import_peak_rss_kb = peak_rss_kb()
+
+import contextlib
+
+import boto3
+import moto
+
+with contextlib.ExitStack() as stack:
+    for mock in {mocks!r}:
+        stack.enter_context(getattr(moto, mock)())
+
+    session = boto3.Session(region_name="eu-west-1")
+{setup}
+    start = time.perf_counter()
+{call}
+    first_call_seconds = time.perf_counter() - start
+
+print(json.dumps({{
+    "import_seconds": import_seconds,
+    "first_call_seconds": first_call_seconds,
+    "import_peak_rss_kb": import_peak_rss_kb,
+    "peak_rss_kb": peak_rss_kb(),
+}}))
+"""
+
+IMPORT_TIME_LINE = re.compile(
+    r"^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)$", re.MULTILINE
+)
+
+
+def _child_code(name: str) -> str:
+    import_statement, mocks, setup, call = ENTRY_POINTS[name]
+
+    return CHILD_TEMPLATE.format(
+        import_statement=import_statement,
+        mocks=mocks,
+        setup=textwrap.indent(textwrap.dedent(setup), " " * 4),
+        call=textwrap.indent(textwrap.dedent(call), " " * 4),
+    )
+
+
+def _library_import_us(stderr: str) -> int:
+    """Sums the cumulative import time of the top level inqdo_tools modules"""
+    return sum(
+        int(cumulative)
+        for _, cumulative, indent, module in IMPORT_TIME_LINE.findall(stderr)
+        if not indent and module.split(".")[0] == "inqdo_tools"
+    )
+
+
+def run_once(name: str) -> dict:
+    env = {
+        **os.environ,
+        "PYTHONPATH": os.pathsep.join([SOURCE, os.environ.get("PYTHONPATH", "")]),
+    }
+    env.pop("DEBUG_INQDO_TOOLS", None)
+
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _child_code(name)],
+        capture_output=True,
+        env=env,
+        text=True,
+    )
+    wall_seconds = time.perf_counter() - start
+
+    if result.returncode != 0:
+        raise RuntimeError(f"Entry point {name} failed:\n{result.stderr[-2000:]}")
+
+    measurements = json.loads(result.stdout.strip().splitlines()[-1])
+    measurements["wall_seconds"] = wall_seconds
+    measurements["library_import_us"] = _library_import_us(result.stderr)
+
+    return measurements
+
+
+def run(names: list, repeat: int) -> dict:
+    results = {}
+
+    for name in names:
+        runs = [run_once(name) for _ in range(repeat)]
+        results[name] = {
+            metric: {
+                "median": statistics.median(r[metric] for r in runs),
+                "min": min(r[metric] for r in runs),
+                "max": max(r[metric] for r in runs),
+            }
+            for metric in runs[0]
+        }
+
+    return {
+        "version": _library_version(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "created": datetime.now(timezone.utc).isoformat(),
+        "repeat": repeat,
+        "entry_points": results,
+    }
+
+
+def compare(current: dict, baseline: dict) -> list:
+    """Returns (entry point, metric, baseline median, current median, change in %) rows"""
+    rows = []
+
+    for name, metrics in current["entry_points"].items():
+        for metric, values in metrics.items():
+            base = baseline["entry_points"].get(name, {}).get(metric)
+            if not base or not base["median"]:
+                continue
+
+            change = (values["median"] - base["median"]) / base["median"] * 100
+            rows.append((name, metric, base["median"], values["median"], change))
+
+    return rows
+
+
+def _library_version() -> str:
+    version = {}
+    with open(os.path.join(SOURCE, "inqdo_tools", "_version.py")) as f:
+        exec(f.read(), version)
+
+    return version["__version__"]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "entry_points", nargs="*", help=f"Defaults to all of: {', '.join(ENTRY_POINTS)}"
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=3, help="Fresh interpreters per entry point"
+    )
+    parser.add_argument(
+        "--output", help="Write the JSON results to this file instead of stdout"
+    )
+    parser.add_argument(
+        "--compare", help="Print the change in median against an earlier JSON result"
+    )
+    args = parser.parse_args(argv)
+
+    unknown = set(args.entry_points) - set(ENTRY_POINTS)
+    if unknown:
+        parser.error(f"unknown entry points: {', '.join(sorted(unknown))}")
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+    results = run(args.entry_points or list(ENTRY_POINTS), args.repeat)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    else:
+        print(json.dumps(results, indent=2))
+
+    if baseline:
+        print(
+            f"\nCompared to {baseline['version']} ({baseline['created']}):",
+            file=sys.stderr,
+        )
+        for name, metric, base, current, change in compare(results, baseline):
+            print(
+                f"{name:<16} {metric:<20} {base:>14.4f} -> {current:>14.4f} ({change:+.1f}%)",
+                file=sys.stderr,
+            )
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,136 @@
+"""
+Serialization benchmark
+=======================
+
+Compares the DynamoDB (de)serialization engine of inqdo_tools with the previous implementation,
+which created a new boto3 ``TypeSerializer``/``TypeDeserializer`` on every call::
+
+    $ python benchmarks/serialization.py --items 5000 --output serialization-1.3.7.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import timeit
+from datetime import datetime, timezone
+from decimal import Decimal
+
+sys.path.insert(
+    0,
+    os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        "inqdo_tools",
+        "src",
+    ),
+)
+
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer  # noqa: E402
+from inqdo_tools.dynamodb.serializer import Deserializer, Serializer  # noqa: E402
+
+
+def previous_serialize(items: list) -> list:
+    """The per-item serialization of DynamoDBClient before the engine was added"""
+    result = []
+    for item in items:
+        serializer = TypeSerializer()
+        result.append({k: serializer.serialize(v) for k, v in item.items()})
+
+    return result
+
+
+def previous_deserialize(response: list) -> list:
+    """DynamoDBClient._deserialize before the engine was added"""
+    deserializer = TypeDeserializer()
+    items = []
+    for item in response:
+        items.append({k: deserializer.deserialize(v) for k, v in item.items()})
+
+    return items
+
+
+def make_items(count: int) -> list:
+    return [
+        {
+            "id": f"device-{i:06d}",
+            "timestamp": 1700000000 + i,
+            "temperature": Decimal("21.5") + i % 10,
+            "active": i % 2 == 0,
+            "tags": {"sensor", "outdoor"},
+            "location": {
+                "lat": Decimal("52.09"),
+                "lon": Decimal("5.12"),
+                "name": "Utrecht",
+            },
+            "readings": [Decimal(i % 100), Decimal("0.5"), None, "ok"],
+        }
+        for i in range(count)
+    ]
+
+
+def run(count: int, repeat: int) -> dict:
+    items = make_items(count)
+    serialized = Serializer().serialize_items(items)
+
+    cases = {
+        "serialize_previous": lambda: previous_serialize(items),
+        "serialize_engine": lambda: Serializer().serialize_items(items),
+        "deserialize_previous": lambda: previous_deserialize(serialized),
+        "deserialize_engine": lambda: Deserializer().deserialize_items(serialized),
+        "deserialize_engine_native_numbers": lambda: Deserializer(
+            numbers="native"
+        ).deserialize_items(serialized),
+    }
+
+    results = {
+        name: min(timeit.repeat(case, number=1, repeat=repeat))
+        for name, case in cases.items()
+    }
+
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "created": datetime.now(timezone.utc).isoformat(),
+        "items": count,
+        "repeat": repeat,
+        "seconds": results,
+        "speedup": {
+            "serialize": results["serialize_previous"] / results["serialize_engine"],
+            "deserialize": results["deserialize_previous"]
+            / results["deserialize_engine"],
+        },
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "--items", type=int, default=5000, help="Number of items per run"
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=5,
+        help="Runs per case, the fastest run is reported",
+    )
+    parser.add_argument(
+        "--output", help="Write the JSON results to this file instead of stdout"
+    )
+    args = parser.parse_args(argv)
+
+    results = run(args.items, args.repeat)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    else:
+        print(json.dumps(results, indent=2))
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
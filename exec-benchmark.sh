@@ -0,0 +1,4 @@
+#!/usr/bin/env bash
+
+# Run the cold start benchmark, extra arguments are passed on (see --help)
+docker-compose exec inqdo-tools python benchmarks/cold_start.py "$@"
@@ -1,36 +1,43 @@
 """
 inQdo Tools library
+
+The public names are loaded lazily (PEP 562), so importing a single helper such as
+:class:`Response` does not pull in boto3 and every client module on a cold start.
 """
 from __future__ import absolute_import
 
+from typing import TYPE_CHECKING
+
 from ._version import __version__
-from .dynamodb.client import DynamoDBClient
-from .ec2.client import Ec2
-from .events.client import EventsClient
-from .invoker.client import Invoker
-from .s3.client import S3Client
-from .ssm.client import ParameterStore
-from .utils.assume_role import AssumeRole
-from .utils.common import (
-    b64decode,
-    b64encode,
-    destruct_dict,
-    dict_get,
-    dict_get_forced,
-    dict_set,
-    from_json,
-    lower_key_dict,
-    to_json,
-)
-from .utils.error import ErrorHandler
-from .utils.get_client import Client
-from .utils.logger import (
-    InQdoLogger,
-    SaveSequenceLogger,
-    SequenceLogger,
-    newline_logger,
-)
-from .utils.response import Response
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .dynamodb.client import DynamoDBClient
+    from .ec2.client import Ec2
+    from .events.client import EventsClient
+    from .invoker.client import Invoker
+    from .s3.client import S3Client
+    from .ssm.client import ParameterStore
+    from .utils.assume_role import AssumeRole
+    from .utils.common import (
+        b64decode,
+        b64encode,
+        destruct_dict,
+        dict_get,
+        dict_get_forced,
+        dict_set,
+        from_json,
+        lower_key_dict,
+        to_json,
+    )
+    from .utils.error import ErrorHandler
+    from .utils.get_client import Client
+    from .utils.logger import (
+        InQdoLogger,
+        SaveSequenceLogger,
+        SequenceLogger,
+        newline_logger,
+    )
+    from .utils.response import Response
 
 __author__ = "inQdo Cloud (info@inqdo.cloud)"
 __license__ = "MIT"
@@ -61,3 +68,49 @@ __all__ = (
     "SequenceLogger",
     "to_json",
 )
+
+# Public name -> submodule that defines it
+_LAZY_ATTRIBUTES = {
+    "AssumeRole": "utils.assume_role",
+    "b64decode": "utils.common",
+    "b64encode": "utils.common",
+    "Client": "utils.get_client",
+    "DynamoDBClient": "dynamodb.client",
+    "destruct_dict": "utils.common",
+    "dict_get": "utils.common",
+    "dict_get_forced": "utils.common",
+    "dict_set": "utils.common",
+    "Ec2": "ec2.client",
+    "ErrorHandler": "utils.error",
+    "EventsClient": "events.client",
+    "from_json": "utils.common",
+    "InQdoLogger": "utils.logger",
+    "Invoker": "invoker.client",
+    "lower_key_dict": "utils.common",
+    "newline_logger": "utils.logger",
+    "ParameterStore": "ssm.client",
+    "Response": "utils.response",
+    "S3Client": "s3.client",
+    "SaveSequenceLogger": "utils.logger",
+    "SequenceLogger": "utils.logger",
+    "to_json": "utils.common",
+}
+
+
+def __getattr__(name: str):
+    if name not in _LAZY_ATTRIBUTES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    # Same as `from .<submodule> import <name>`, which unlike importlib.import_module
+    # keeps the submodule visible in `python -X importtime`
+    module = __import__(_LAZY_ATTRIBUTES[name], globals(), None, (name,), 1)
+    value = getattr(module, name)
+
+    # Cache on the module so the next lookup does not go through __getattr__
+    globals()[name] = value
+
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
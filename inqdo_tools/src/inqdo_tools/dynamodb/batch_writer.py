@@ -0,0 +1,211 @@
+"""
+DynamoDB batch writer
+=====================
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Iterable, List, Tuple
+
+from botocore.exceptions import ClientError
+
+if "DEBUG_INQDO_TOOLS" in os.environ.keys():  # pragma: no cover
+    from dynamodb.metrics import MetricsSink, measured
+    from dynamodb.rate_limiter import WRITE, CapacityRateLimiter, limited_call
+    from dynamodb.utils import backoff_delay, batched
+else:
+    from inqdo_tools.dynamodb.metrics import MetricsSink, measured
+    from inqdo_tools.dynamodb.rate_limiter import (
+        WRITE,
+        CapacityRateLimiter,
+        limited_call,
+    )
+    from inqdo_tools.dynamodb.utils import backoff_delay, batched
+
+# Maximum number of requests in a single batch_write_item call
+BATCH_WRITE_SIZE = 25
+
+# Errors after which the same request is tried again
+RETRYABLE_ERRORS = (
+    "InternalServerError",
+    "ProvisionedThroughputExceededException",
+    "RequestLimitExceeded",
+    "ThrottlingException",
+)
+
+
+class BatchWriter(object):
+    """
+    The BatchWriter class writes large amounts of puts and deletes with ``batch_write_item``.
+
+    Requests are grouped in batches of 25 that are written by several threads at the same time.
+    ``UnprocessedItems`` and throttled batches are retried with jittered exponential backoff.
+    When a batch is rejected as invalid, its requests are retried one by one, so that only the
+    offending items are reported as failed. The requests are consumed lazily, so generators of
+    any size can be written with flat memory use.
+
+    It works on a low-level client, so the same writer is used for the local account and for
+    clients of an assumed role.
+
+    :param client: A low-level DynamoDB client.
+    :type client: :class:`botocore.client.BaseClient`
+
+    :param table_name: The name of the table to write to.
+    :type table_name: str
+
+    :param serialize: Function that serializes a python dict into DynamoDB attribute values.
+    :type serialize: Callable
+
+    :param max_workers: An optional number of parallel writers, defaults to 4.
+    :type max_workers: int, optional
+
+    :param max_retries: An optional number of retries for unprocessed and throttled items, defaults to 8.
+    :type max_retries: int, optional
+
+    :param rate_limiter: An optional limiter that keeps the writes within the capacity of the table.
+    :type rate_limiter: :class:`CapacityRateLimiter`, optional
+
+    :param metrics: An optional sink to record the metrics of the requests in.
+    :type metrics: :class:`MetricsSink`, optional
+
+    :param on_written: An optional function that is called with the ``(kind, payload)`` tuples of
+        every batch once DynamoDB acknowledged them, for example to invalidate a cache.
+    :type on_written: Callable, optional
+    """
+
+    def __init__(
+        self,
+        client,
+        table_name: str,
+        serialize: Callable,
+        max_workers: int = 4,
+        max_retries: int = 8,
+        rate_limiter: CapacityRateLimiter = None,
+        metrics: MetricsSink = None,
+        on_written: Callable[[List[Tuple[str, dict]]], None] = None,
+    ):
+        """Constructor method"""
+        self.client = client
+        self.table_name = table_name
+        self.serialize = serialize
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.rate_limiter = rate_limiter
+        self.metrics = metrics
+        self.on_written = on_written
+
+    def put_items(self, items: Iterable[dict]) -> dict:
+        """Writes the items with ``PutRequest``.
+
+        :rtype: dict
+        """
+        return self.write(("PutRequest", item) for item in items)
+
+    def delete_keys(self, keys: Iterable[dict]) -> dict:
+        """Deletes the items with the given keys with ``DeleteRequest``.
+
+        :rtype: dict
+        """
+        return self.write(("DeleteRequest", key) for key in keys)
+
+    def write(self, requests: Iterable[Tuple[str, dict]]) -> dict:
+        """
+        Writes a stream of ``("PutRequest", item)`` and ``("DeleteRequest", key)`` tuples.
+
+        :return: The number of written requests under ``Written``, and under ``Failed`` a list with
+            the item (``Item``) or key (``Key``) and the ``Error`` of every failed request.
+        :rtype: dict
+        """
+        result = {"Written": 0, "Failed": []}
+        lock = threading.Lock()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            in_flight = set()
+
+            for batch in batched(requests, BATCH_WRITE_SIZE):
+                # Only a few batches are queued ahead of the writers, to keep memory use flat
+                if len(in_flight) >= self.max_workers * 2:
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        future.result()
+
+                in_flight.add(executor.submit(self._write_batch, batch, result, lock))
+
+            for future in in_flight:
+                future.result()
+
+        return result
+
+    def _write_batch(
+        self, batch: List[Tuple[str, dict]], result: dict, lock: threading.Lock
+    ):
+        pending = [
+            (self._serialize_request(kind, payload), (kind, payload))
+            for kind, payload in batch
+        ]
+
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                time.sleep(backoff_delay(attempt))
+
+            try:
+                response = limited_call(
+                    measured(
+                        self.client.batch_write_item,
+                        "batch_write_item",
+                        self.table_name,
+                        self.metrics,
+                    ),
+                    WRITE,
+                    self.rate_limiter,
+                    RequestItems={self.table_name: [request for request, _ in pending]},
+                )
+            except ClientError as e:
+                code = e.response["Error"]["Code"]
+
+                if code in RETRYABLE_ERRORS:
+                    continue
+
+                if code == "ValidationException" and len(pending) > 1:
+                    for _, request in pending:
+                        self._write_batch([request], result, lock)
+                    return
+
+                self._fail(pending, e.response["Error"]["Message"], result, lock)
+                return
+
+            unprocessed = response.get("UnprocessedItems", {}).get(self.table_name, [])
+            written = [
+                original for request, original in pending if request not in unprocessed
+            ]
+            pending = [
+                (request, original)
+                for request, original in pending
+                if request in unprocessed
+            ]
+
+            with lock:
+                result["Written"] += len(written)
+
+            if self.on_written is not None and written:
+                self.on_written(written)
+
+            if not pending:
+                return
+
+        self._fail(
+            pending, f"Unprocessed after {self.max_retries} retries.", result, lock
+        )
+
+    def _serialize_request(self, kind: str, payload: dict) -> dict:
+        field = "Item" if kind == "PutRequest" else "Key"
+        return {kind: {field: self.serialize(payload)}}
+
+    @staticmethod
+    def _fail(pending: list, message: str, result: dict, lock: threading.Lock):
+        with lock:
+            for _, (kind, payload) in pending:
+                field = "Item" if kind == "PutRequest" else "Key"
+                result["Failed"].append({field: payload, "Error": message})
@@ -0,0 +1,156 @@
+"""
+DynamoDB item cache
+===================
+"""
+
+import copy
+import threading
+import time
+from collections import OrderedDict
+from typing import Union
+
+
+class ItemCache(object):
+    """
+    The ItemCache class is a thread-safe, in-process read-through cache for DynamoDB items.
+
+    Entries are keyed on the scope of the client, the table name and the full key of the item.
+    The scope identifies the account, region and endpoint of the client, so clients of tables
+    with the same name in another account or region never read each other's items. The cache holds at most
+    :class:`max_size` items, the least recently used item is evicted when it is full. Every entry
+    expires :class:`ttl` seconds after it was stored. Items are copied on the way in and out, so
+    callers can modify the returned items without changing the cache.
+
+    One cache can be shared by several :class:`DynamoDBClient` instances, for example as a module
+    level variable that survives warm Lambda invocations. Each client passes its own scope.
+
+    :param max_size: An optional maximum number of cached items, defaults to 1024.
+    :type max_size: int, optional
+
+    :param ttl: An optional number of seconds an item stays valid, defaults to 60.
+    :type ttl: float, optional
+
+    Attributes:
+        hits (int): The number of reads that were served from the cache.
+        misses (int): The number of reads that were not in the cache or had expired.
+        evictions (int): The number of items removed to make room for new ones.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl: float = 60):
+        """Constructor method"""
+        if max_size < 1:
+            raise ValueError("max_size should be at least 1.")
+
+        self.max_size = max_size
+        self.ttl = ttl
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(table_name: str, key: dict, scope: tuple = ()) -> tuple:
+        """Returns the cache key for an item key, for example ``{"movieName": "The Dark Knight"}``.
+
+        :param scope: Optional values that identify the account, region and endpoint of the client.
+        :type scope: tuple, optional
+
+        :rtype: tuple
+        """
+        return (*scope, table_name) + tuple(sorted(key.items()))
+
+    def get(self, table_name: str, key: dict, scope: tuple = ()) -> Union[dict, None]:
+        """Returns a copy of the cached item, or None when it is not cached or has expired.
+
+        :rtype: dict
+        """
+        cache_key = self.key(table_name, key, scope)
+
+        with self._lock:
+            entry = self._items.get(cache_key)
+
+            if entry is not None:
+                item, expires_at = entry
+                if expires_at > time.monotonic():
+                    self._items.move_to_end(cache_key)
+                    self.hits += 1
+                    return copy.deepcopy(item)
+
+                del self._items[cache_key]
+
+            self.misses += 1
+
+        return None
+
+    def put(
+        self,
+        table_name: str,
+        key: dict,
+        item: dict,
+        ttl: float = None,
+        scope: tuple = (),
+    ):
+        """Stores a copy of an item, optionally with its own :class:`ttl` in seconds."""
+        cache_key = self.key(table_name, key, scope)
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        item = copy.deepcopy(item)
+
+        with self._lock:
+            self._items[cache_key] = (item, expires_at)
+            self._items.move_to_end(cache_key)
+
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, table_name: str, key: dict, scope: tuple = ()) -> bool:
+        """
+        Removes a single item from the cache.
+
+        :rtype: bool
+        :return: True when the item was cached.
+        """
+        with self._lock:
+            return self._items.pop(self.key(table_name, key, scope), None) is not None
+
+    def invalidate_table(self, table_name: str, scope: tuple = ()) -> int:
+        """
+        Removes every cached item of a table.
+
+        :rtype: int
+        :return: The number of removed items.
+        """
+        prefix = (*scope, table_name)
+
+        with self._lock:
+            matching = [
+                cache_key
+                for cache_key in self._items
+                if cache_key[: len(prefix)] == prefix
+            ]
+            for cache_key in matching:
+                del self._items[cache_key]
+
+        return len(matching)
+
+    def clear(self):
+        """Removes all cached items and resets the counters."""
+        with self._lock:
+            self._items.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def stats(self) -> dict:
+        """Returns the hit/miss/eviction counters and the number of cached items.
+
+        :rtype: dict
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._items),
+            }
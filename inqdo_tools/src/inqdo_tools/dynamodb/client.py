@@ -4,18 +4,77 @@ DynamoDB client
 """
 
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal, InvalidOperation
 from enum import Enum
+from typing import Callable, Iterable, Iterator, List, Tuple, Union
 
 import boto3
-from boto3.dynamodb.conditions import Key
-from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+from boto3.dynamodb.conditions import ConditionBase, Key
 from inqdo_tools.utils.get_client import Client
 
 if "DEBUG_INQDO_TOOLS" in os.environ.keys():  # pragma: no cover
-    from utils.common import destruct_dict
+    from dynamodb.batch_writer import BatchWriter
+    from dynamodb.cache import ItemCache
+    from dynamodb.compression import (
+        MAX_ITEM_SIZE,
+        AttributeCompressor,
+        capacity_units,
+        item_size,
+    )
+    from dynamodb.counter import ShardedCounter
+    from dynamodb.cursor import Cursor
+    from dynamodb.export import export_table, import_table
+    from dynamodb.fan_out import fan_out
+    from dynamodb.metrics import MetricsSink, measured, metrics_sink
+    from dynamodb.rate_limiter import READ, CapacityRateLimiter, limited_call
+    from dynamodb.serializer import Deserializer, deserializer, serializer
+    from dynamodb.table_copy import TableCopy
+    from dynamodb.table_metadata import TableMetadata, table_metadata_cache
+    from dynamodb.transaction import TransactionBuilder
+    from dynamodb.upsert import DiffUpsert
+    from dynamodb.utils import (
+        BATCH_GET_SIZE,
+        batch_get,
+        build_projection,
+        build_request,
+        chunks,
+        key_id,
+    )
     from utils.error import ErrorHandler
 else:
-    from inqdo_tools.utils.common import destruct_dict
+    from inqdo_tools.dynamodb.batch_writer import BatchWriter
+    from inqdo_tools.dynamodb.cache import ItemCache
+    from inqdo_tools.dynamodb.compression import (
+        MAX_ITEM_SIZE,
+        AttributeCompressor,
+        capacity_units,
+        item_size,
+    )
+    from inqdo_tools.dynamodb.counter import ShardedCounter
+    from inqdo_tools.dynamodb.cursor import Cursor
+    from inqdo_tools.dynamodb.export import export_table, import_table
+    from inqdo_tools.dynamodb.fan_out import fan_out
+    from inqdo_tools.dynamodb.metrics import MetricsSink, measured, metrics_sink
+    from inqdo_tools.dynamodb.rate_limiter import (
+        READ,
+        CapacityRateLimiter,
+        limited_call,
+    )
+    from inqdo_tools.dynamodb.serializer import Deserializer, deserializer, serializer
+    from inqdo_tools.dynamodb.table_copy import TableCopy
+    from inqdo_tools.dynamodb.table_metadata import TableMetadata, table_metadata_cache
+    from inqdo_tools.dynamodb.transaction import TransactionBuilder
+    from inqdo_tools.dynamodb.upsert import DiffUpsert
+    from inqdo_tools.dynamodb.utils import (
+        BATCH_GET_SIZE,
+        batch_get,
+        build_projection,
+        build_request,
+        chunks,
+        key_id,
+    )
     from inqdo_tools.utils.error import ErrorHandler
 
 
@@ -26,6 +85,8 @@ class ComparisonOperators(Enum):
     LE = "LE"
     GE = "GE"
     GT = "GT"
+    BETWEEN = "BETWEEN"
+    BEGINS_WITH = "BEGINS_WITH"
 
 
 class DynamoDBClient(object):
@@ -51,6 +112,45 @@ class DynamoDBClient(object):
         which the DynamoDB client will connect.
     :type arn: str, optional
 
+    :param numbers: An optional argument, which determines how numbers are returned by the reads
+        that are deserialized by the client: "decimal" (default), "float" or "native" (int or float).
+    :type numbers: str, optional
+
+    :param cache: An optional read-through cache for :meth:`read`. Pass True for a cache with the
+        default settings, or an :class:`ItemCache` to configure it or share it between clients.
+        Writes through this client invalidate the cached items they change.
+    :type cache: bool or :class:`ItemCache`, optional
+
+    :param cursor_secret: An optional secret to sign the cursors of :meth:`query_page` and
+        :meth:`scan_page` with, see :class:`Cursor`.
+    :type cursor_secret: str, optional
+
+    :param rate_limit: An optional limit for the scans, queries and batch operations of the client.
+        Pass True to use 80% of the provisioned capacity of the table, a number between 0 and 1 to
+        use another part of it, or a :class:`CapacityRateLimiter` to share one between clients.
+    :type rate_limit: bool, float or :class:`CapacityRateLimiter`, optional
+
+    :param metrics: An optional sink that receives the latency, consumed capacity, item counts and
+        bytes of every request. Pass True to aggregate them in the shared :class:`InMemoryMetricsSink`
+        ``metrics_sink``, or any :class:`MetricsSink`.
+    :type metrics: bool or :class:`MetricsSink`, optional
+
+    :param compression: An optional list of attributes that are stored compressed when they are
+        larger than 1 KB, or an :class:`AttributeCompressor` to configure the threshold and algorithm.
+        They are compressed by :meth:`create_and_update` and the batch writes, and decompressed by
+        all reads. Use :meth:`item_size` to see the savings.
+    :type compression: list or :class:`AttributeCompressor`, optional
+
+    :param check_exists: An optional argument, which determines if the table is described when the
+        client is created, to raise a ValueError right away when it does not exist. Defaults to True.
+        The description is cached for the whole process, see :class:`TableMetadataCache`. With False
+        the table is only described when its key schema is first needed.
+    :type check_exists: bool, optional
+
+    The key names of the table are taken from its key schema, so :class:`table_primary_key` and
+    :class:`table_sort_key` can be left out of :meth:`read`, :meth:`update`, :meth:`delete`,
+    :meth:`delete_batch` and :meth:`query`.
+
     :rtype: dict
     """
 
@@ -61,6 +161,15 @@ class DynamoDBClient(object):
         self.region_name = "eu-west-1"
         self.endpoint_url = False
         self.arn = False
+        self.deserializer = deserializer
+        self.cache = None
+        self.cursor = Cursor()
+        self.rate_limiter = None
+        self.metrics = None
+        self.compressor = None
+        self._metadata = None
+        check_exists = True
+        rate_limit = None
 
         if len(kwargs.items()) > 0:
             for key, value in kwargs.items():
@@ -70,27 +179,86 @@ class DynamoDBClient(object):
                     self.endpoint_url = value
                 if key == "arn":
                     self.arn = value
-
-        # Test if table exists, otherwise throw a value error
-        test_table_exists = boto3.client("dynamodb", region_name=self.region_name)
-        try:
-            test_table_exists.describe_table(TableName=table_name)
-            self.table_name = table_name
-        except test_table_exists.exceptions.ResourceNotFoundException:
-            raise ValueError(
-                f"Table: '{table_name}' does not exist. Did you create one yet and are you in the correct region?"
-            )
-
+                if key == "numbers":
+                    self.deserializer = Deserializer(numbers=value)
+                if key == "rate_limit":
+                    rate_limit = value
+                if key == "cursor_secret":
+                    self.cursor = Cursor(secret=value)
+                if key == "cache" and value:
+                    self.cache = value if isinstance(value, ItemCache) else ItemCache()
+                if key == "metrics" and value:
+                    self.metrics = (
+                        value if isinstance(value, MetricsSink) else metrics_sink
+                    )
+                if key == "compression" and value:
+                    self.compressor = (
+                        value
+                        if isinstance(value, AttributeCompressor)
+                        else AttributeCompressor(value)
+                    )
+                if key == "check_exists":
+                    check_exists = value
+
+        self.table_name = table_name
+
+        # Low-level client, used for the cross-account calls and for the multi-threaded operations
         if self.arn:
-            self.dynamodb_client = Client("dynamodb", region=self.region_name, arn=self.arn).service
+            self.dynamodb_client = Client(
+                "dynamodb", region=self.region_name, arn=self.arn
+            ).service
+        else:
+            self.dynamodb_client = Client(
+                "dynamodb", region=self.region_name, endpoint_url=self.endpoint_url
+            ).service
 
         if self.endpoint_url:
-            self.dynamodb = boto3.resource("dynamodb", region_name=self.region_name, endpoint_url=self.endpoint_url)
+            self.dynamodb = boto3.resource(
+                "dynamodb", region_name=self.region_name, endpoint_url=self.endpoint_url
+            )
         else:
             self.dynamodb = boto3.resource("dynamodb", region_name=self.region_name)
 
         self.table_connection = self.dynamodb.Table(table_name)
 
+        # The table is described with the client of its own account and endpoint, at most once per ttl
+        if check_exists or rate_limit or self.compressor is not None:
+            metadata = self.table_metadata()
+            self.rate_limiter = self._rate_limiter(rate_limit, metadata.table)
+
+            if self.compressor is not None and self.compressor.attributes.intersection(
+                metadata.key_names
+            ):
+                raise ValueError("Key attributes can not be compressed.")
+
+    @property
+    def key_names(self) -> List[str]:
+        """The names of the key attributes of the table, the partition key first.
+
+        :rtype: list
+        """
+        return self.table_metadata().key_names
+
+    def table_metadata(self, refresh: bool = False) -> TableMetadata:
+        """Returns the key schema, indexes, billing mode and item count of the table.
+
+        :param refresh: Describe the table again instead of using the cached description, defaults to False.
+        :type refresh: bool, optional
+
+        :raises ValueError: When the table does not exist.
+
+        :rtype: :class:`TableMetadata`
+        """
+        if self._metadata is None or refresh:
+            self._metadata = table_metadata_cache.get(
+                self.dynamodb_client,
+                self.table_name,
+                scope=self._scope(),
+                refresh=refresh,
+            )
+
+        return self._metadata
+
     @ErrorHandler.base_exception
     def create_and_update(self, data: dict) -> dict:
         """Create or update a given row in DynamoDB.
@@ -101,52 +269,71 @@ class DynamoDBClient(object):
 
         :rtype: dict
         """
-        if (self.arn):
-            self.dynamodb_client.put_item(
-                TableName=self.table_name,
-                Item=self._serialize(data)
+        # Compressed attributes are serialized by the client, so they take the low-level path as well
+        if self.arn or self.compressor is not None:
+            self._measured(self.dynamodb_client.put_item, "put_item")(
+                TableName=self.table_name, Item=self._serialize_item(data)
             )
         else:
-            self.table_connection.put_item(Item=data)
+            self._measured(self.table_connection.put_item, "put_item")(Item=data)
+
+        self._invalidate(data)
 
         data = {"Success": "Saved or updated item."}
 
         return data
 
     @ErrorHandler.base_exception
-    def create_and_update_batch(self, batch_list: list) -> dict:
+    def create_and_update_batch(self, batch_list: Iterable[dict], **kwargs) -> dict:
         """Create objects in DynamoDB in batch.
 
         This expects the :class:`batch_list` parameter.
         It will return an dict with either a success or error message.
 
+        The objects are written by several parallel writers, see :class:`BatchWriter`.
+        When some objects could not be written, the error message contains them under ``Failed``.
+
         :param batch_list: This is a list containing all the objects that need to be written to
             the database in batch. These objects need to be of type dict. Each object in the
-            list needs to have a primary key - value pair.
+            list needs to have a primary key - value pair. Any iterable, like a generator, is accepted.
         :type batch_list: list
 
+        :param max_workers: An optional number of parallel writers, defaults to 4.
+        :type max_workers: int, optional
+
+        :param diff: An optional way to compare the objects with the table, "hash" or "item", to only
+            write the objects that are new or changed, see :class:`DiffUpsert`. The result then
+            holds the number of ``Written`` and ``Skipped`` objects.
+        :type diff: str, optional
+
+        :param hash_attribute: An optional name of the attribute that holds the content hash when
+            :class:`diff` is "hash", defaults to "contentHash".
+        :type hash_attribute: str, optional
+
         :rtype: dict
         """
-        with self.table_connection.batch_writer() as batch:
-            for entry in batch_list:
-                batch.put_item(Item=entry)
+        if kwargs.get("diff"):
+            return self._diff_upsert(batch_list, **kwargs)
 
-        data = {"Success": "Saved or updated items in batch."}
+        kwargs.pop("diff", None)
+        result = self.batch_writer(**kwargs).put_items(batch_list)
 
-        return data
+        return self._batch_result(result, "Saved or updated items in batch.")
 
     @ErrorHandler.base_exception
     def update(
         self,
-        table_primary_key: str,
-        value_primary_key: str,
-        update_expression: str,
-        expression_values: dict,
+        table_primary_key: str = None,
+        value_primary_key=None,
+        update_expression: str = None,
+        expression_values: dict = None,
+        **kwargs,
     ) -> dict:
         """Update single attributes of a DynamoDB row
 
-        :param table_primary_key: The primary key of the table you want to read from.
-        :type table_primary_key: str
+        :param table_primary_key: The primary key of the table you want to read from, defaults to the
+            partition key of the table.
+        :type table_primary_key: str, optional
 
         :param value_primary_key: The the primary key value of the specific object you want to read.
         :type value_primary_key: str
@@ -157,33 +344,42 @@ class DynamoDBClient(object):
         :param expression_values: The dict with the mapped expression key value pairs.
         :type expression_values: dict
 
+        :param value_sort_key: The sort key value of the object, for tables with a sort key.
+        :type value_sort_key: str, optional
+
         :rtype: dict
         """
-        update_dict = {table_primary_key: value_primary_key}
+        update_dict = self._key(table_primary_key, value_primary_key, kwargs)
 
-        if (self.arn):
-            response = self.dynamodb_client.update_item(
+        if self.arn:
+            response = self._measured(self.dynamodb_client.update_item, "update_item")(
                 TableName=self.table_name,
                 Key=self._serialize(update_dict),
                 ExpressionAttributeValues=expression_values,
                 UpdateExpression=update_expression,
-                ReturnValues="ALL_NEW"
+                ReturnValues="ALL_NEW",
             )["Attributes"]
 
+            self._invalidate(update_dict)
+
             return self._deserialize(response)
 
-        self.table_connection.update_item(
+        self._measured(self.table_connection.update_item, "update_item")(
             Key=update_dict,
             UpdateExpression=update_expression,
             ExpressionAttributeValues=expression_values,
         )
 
+        self._invalidate(update_dict)
+
         data = {"Success": "Updated fields."}
 
         return data
 
     @ErrorHandler.base_exception
-    def read(self, table_primary_key: str, value_primary_key: str, **kwargs) -> dict:
+    def read(
+        self, table_primary_key: str = None, value_primary_key=None, **kwargs
+    ) -> dict:
         """Read a test single object of a given table in DynamoDB.
 
         This expects the :class:`table_primary_key` and the :class:`value_primary_key` parameters.
@@ -191,52 +387,114 @@ class DynamoDBClient(object):
 
         Optional keys are :class:`table_sort_key` and :class:`value_sort_key` if there is a sort key.
 
-        :param table_primary_key: The primary key of the table you want to read from.
-        :type table_primary_key: str
+        :param table_primary_key: The primary key of the table you want to read from, defaults to the
+            partition key of the table.
+        :type table_primary_key: str, optional
 
         :param value_primary_key: The the primary key value of the specific object you want to read.
         :type value_primary_key: str
 
-        :param table_sort_key: An optional :class:`table_sort_key` argument.
+        :param table_sort_key: An optional :class:`table_sort_key` argument, defaults to the sort key of the table.
         :type table_sort_key: str, optinal
 
         :param value_sort_key: An optional :class:`value_sort_key` argument.
         :type value_sort_key: str, optinal
 
+        :param projection: An optional list of the attributes to return.
+        :type projection: list, optional
+
         :rtype: dict
         """
-        query_dict = {table_primary_key: value_primary_key}
+        query_dict = self._key(table_primary_key, value_primary_key, kwargs)
 
-        if (self.arn):
-            response = self.dynamodb_client.get_item(
-                TableName=self.table_name,
-                Key=self._serialize(query_dict),
-            )
+        projection = (
+            build_projection(kwargs["projection"]) if kwargs.get("projection") else {}
+        )
 
-            data = (
-                self._deserialize(response["Item"])
-                if "Item" in response
-                else f"No items found. Check your request - query: {query_dict}"
-            )
-        else:
-            if "table_sort_key" and "value_sort_key" in kwargs:
-                table_sort_key, value_sort_key = self._get_sort_key_value_pair(
-                    kwargs=kwargs
-                )
-                query_dict[table_sort_key] = value_sort_key
+        # Only complete items are cached, projected reads always go to the table
+        use_cache = self.cache is not None and not projection
 
-            response = self.table_connection.get_item(Key=query_dict)
+        if use_cache:
+            item = self.cache.get(self.table_name, query_dict, scope=self._scope())
+            if item is not None:
+                return item
 
-            data = (
-                response["Item"]
-                if "Item" in response
-                else f"No items found. Check your request - query: {query_dict}"
-            )
+        response = self._measured(self.dynamodb_client.get_item, "get_item")(
+            TableName=self.table_name,
+            Key=self._serialize(query_dict),
+            **projection,
+        )
+
+        if "Item" not in response:
+            return f"No items found. Check your request - query: {query_dict}"
+
+        data = self._deserialize(response["Item"])
+
+        if use_cache:
+            self.cache.put(self.table_name, query_dict, data, scope=self._scope())
 
         return data
 
     @ErrorHandler.base_exception
-    def delete(self, table_primary_key: str, value_primary_key: str, **kwargs) -> dict:
+    def read_batch(
+        self,
+        keys: List[dict],
+        max_workers: int = 4,
+        max_retries: int = 8,
+        projection: List[str] = None,
+    ) -> list:
+        """Read multiple objects by key with ``batch_get_item``.
+
+        The keys are split in chunks of 100 that are requested concurrently. ``UnprocessedKeys``
+        are retried with jittered exponential backoff. Works on the resource and the :class:`arn` path.
+
+        :param keys: The keys of the objects to read, for example ``[{"movieName": "The Dark Knight"}]``.
+        :type keys: list
+
+        :param max_workers: An optional number of chunks that are requested concurrently, defaults to 4.
+        :type max_workers: int, optional
+
+        :param max_retries: An optional number of retries for unprocessed keys, defaults to 8.
+        :type max_retries: int, optional
+
+        :param projection: An optional list of the attributes to return. The key attributes
+            are always returned.
+        :type projection: list, optional
+
+        :return: The objects in the order of :class:`keys`, with None for keys that do not exist.
+        :rtype: list
+        """
+        if not keys:
+            return []
+
+        # batch_get_item rejects duplicate keys, so every key is only requested once
+        key_names = list(keys[0])
+        unique_keys = list({key_id(key, key_names): key for key in keys}.values())
+
+        # The key attributes are needed to return the objects in request order
+        request = (
+            build_projection(key_names + [a for a in projection if a not in key_names])
+            if projection
+            else {}
+        )
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            responses = executor.map(
+                lambda chunk: self._batch_get_chunk(
+                    chunk, request=request, max_retries=max_retries
+                ),
+                chunks(unique_keys, BATCH_GET_SIZE),
+            )
+            found = {
+                key_id(item, key_names): item for items in responses for item in items
+            }
+
+        return [found.get(key_id(key, key_names)) for key in keys]
+
+    @ErrorHandler.base_exception
+    def delete(
+        self, table_primary_key: str = None, value_primary_key=None, **kwargs
+    ) -> dict:
         """Delete a single object of a given table in DynamoDB.
 
         This expects the :class:`table_primary_key` parameter.
@@ -258,28 +516,27 @@ class DynamoDBClient(object):
 
         :rtype: dict
         """
-        deletion_dict = {table_primary_key: value_primary_key}
+        deletion_dict = self._key(table_primary_key, value_primary_key, kwargs)
 
-        if (self.arn):
-            self.dynamodb_client.delete_item(
-                TableName=self.table_name,
-                Key=self._serialize(deletion_dict)
+        if self.arn:
+            self._measured(self.dynamodb_client.delete_item, "delete_item")(
+                TableName=self.table_name, Key=self._serialize(deletion_dict)
             )
         else:
-            if "table_sort_key" and "value_sort_key" in kwargs:
-                table_sort_key, value_sort_key = self._get_sort_key_value_pair(
-                    kwargs=kwargs
-                )
-                deletion_dict[table_sort_key] = value_sort_key
+            self._measured(self.table_connection.delete_item, "delete_item")(
+                Key=deletion_dict
+            )
 
-            self.table_connection.delete_item(Key=deletion_dict)
+        self._invalidate(deletion_dict)
 
         data = {"Success": "Deleted item from database."}
 
         return data
 
     @ErrorHandler.base_exception
-    def delete_batch(self, table_primary_key: str, batch_list: list) -> dict:
+    def delete_batch(
+        self, table_primary_key: str = None, batch_list: Iterable = (), **kwargs
+    ) -> dict:
         """Delete objects in DynamoDB in batch.
 
         This expects the :class:`table_primary_key` and the :class:`batch_list` parameters.
@@ -290,25 +547,356 @@ class DynamoDBClient(object):
 
         :param batch_list: This is a list containing all the primary key values of the objects
             that need to be deleted from the database in batch. The items in the list need
-            to be of type string.
+            to be of type string. For tables with a sort key, pass complete keys as dicts instead,
+            for example ``{"device": "d1", "timestamp": 1700000000}``.
         :type batch_list: list
 
+        :param max_workers: An optional number of parallel writers, defaults to 4.
+        :type max_workers: int, optional
+
         :rtype: dict
         """
-        with self.table_connection.batch_writer() as batch:
-            for entry in batch_list:
-                batch.delete_item(Key={table_primary_key: entry})
+        table_primary_key = table_primary_key or self.key_names[0]
+        result = self.batch_writer(**kwargs).delete_keys(
+            entry if isinstance(entry, dict) else {table_primary_key: entry}
+            for entry in batch_list
+        )
 
-        data = {"Success": "Deleted items in batch."}
+        return self._batch_result(result, "Deleted items in batch.")
 
-        return data
+    @ErrorHandler.base_exception
+    def delete_partition(
+        self,
+        value_primary_key,
+        value_sort_key=None,
+        comparison_operator: ComparisonOperators = ComparisonOperators.EQ,
+        max_workers: int = 4,
+        max_retries: int = 8,
+        page_size: int = None,
+    ) -> dict:
+        """Delete all objects of a partition, or the part of it that matches a sort key condition.
+
+        The partition is queried page by page for the key attributes only, and the keys are streamed
+        to parallel batch deleters, so partitions of any size are deleted with flat memory use.
+        The key names are taken from the key schema of the table.
+
+        :param value_primary_key: The partition key value of the objects to delete.
+        :type value_primary_key: str
+
+        :param value_sort_key: An optional sort key value, or a ``(low, high)`` tuple for ``BETWEEN``.
+        :type value_sort_key: str, optional
+
+        :param comparison_operator: Expects :class:`ComparisonOperators` to compare the sort key,
+            defaults to ``EQ``.
+        :type comparison_operator: :class:`ComparisonOperators`, optional
+
+        :param max_workers: An optional number of parallel deleters, defaults to 4.
+        :type max_workers: int, optional
+
+        :param max_retries: An optional number of retries for unprocessed keys, defaults to 8.
+        :type max_retries: int, optional
+
+        :param page_size: An optional maximum number of keys read per request.
+        :type page_size: int, optional
+
+        :return: The number of deleted objects under ``Count``.
+        :rtype: dict
+        """
+        key_condition = Key(self.key_names[0]).eq(value_primary_key)
+
+        if value_sort_key is not None:
+            sort_key = self._sort_key_name()
+            if not sort_key:
+                raise ValueError(f"Table: '{self.table_name}' has no sort key.")
+            key_condition &= self._sort_key_condition(
+                sort_key, comparison_operator, value_sort_key
+            )
+
+        request = self._query_request(key_condition, projection=self.key_names)
+        if page_size:
+            request["Limit"] = page_size
+
+        keys = (
+            key
+            for response in self._iter_pages(self.dynamodb_client.query, request)
+            for key in response["Items"]
+        )
+
+        return self._delete_keys(keys, "Deleted partition.", max_workers, max_retries)
 
     @ErrorHandler.base_exception
-    def query(self, table_primary_key: str, query_value: str, **kwargs):
+    def delete_where(
+        self,
+        filter_expression: Union[ConditionBase, dict],
+        total_segments: int = 4,
+        max_workers: int = 4,
+        max_retries: int = 8,
+        page_size: int = None,
+    ) -> dict:
+        """Delete all objects of the table that match a filter.
+
+        The table is read with a parallel scan of :class:`total_segments` segments that only returns
+        the key attributes of the matching objects. The keys are streamed to parallel batch
+        deleters while the scan continues. The scan waits when the deleters fall behind, for
+        example because deletes are throttled, so only a few pages of keys are held in memory.
+
+        :param filter_expression: The filter, built with :class:`boto3.dynamodb.conditions.Attr` or :func:`where`.
+        :type filter_expression: :class:`boto3.dynamodb.conditions.ConditionBase` or dict
+
+        :param total_segments: An optional number of segments that are scanned in parallel, defaults to 4.
+        :type total_segments: int, optional
+
+        :param max_workers: An optional number of parallel deleters, defaults to 4.
+        :type max_workers: int, optional
+
+        :param max_retries: An optional number of retries for unprocessed keys, defaults to 8.
+        :type max_retries: int, optional
+
+        :param page_size: An optional maximum number of items evaluated per scan request.
+        :type page_size: int, optional
+
+        :return: The number of deleted objects under ``Count``.
+        :rtype: dict
+        """
+        request = build_request(
+            serialize=serializer.serialize,
+            filter_expression=filter_expression,
+            projection=self.key_names,
+        )
+        if page_size:
+            request["Limit"] = page_size
+
+        def source(segment: int) -> Callable:
+            segment_request = {
+                **request,
+                "Segment": segment,
+                "TotalSegments": total_segments,
+            }
+            return lambda: (
+                response["Items"]
+                for response in self._iter_pages(
+                    self.dynamodb_client.scan, segment_request
+                )
+            )
+
+        keys = fan_out(
+            [source(segment) for segment in range(total_segments)],
+            max_workers=total_segments,
+        )
+
+        return self._delete_keys(
+            keys, "Deleted matching items.", max_workers, max_retries
+        )
+
+    def batch_writer(self, max_workers: int = 4, max_retries: int = 8) -> BatchWriter:
+        """Returns a :class:`BatchWriter` for this table, on the resource or the :class:`arn` path.
+
+        Written items are removed from the :class:`cache` of this client once their batch is acknowledged.
+
+        :param max_workers: An optional number of parallel writers, defaults to 4.
+        :type max_workers: int, optional
+
+        :param max_retries: An optional number of retries for unprocessed items, defaults to 8.
+        :type max_retries: int, optional
+
+        :rtype: :class:`BatchWriter`
+        """
+        return BatchWriter(
+            client=self.dynamodb_client,
+            table_name=self.table_name,
+            serialize=self._serialize_item,
+            max_workers=max_workers,
+            max_retries=max_retries,
+            rate_limiter=self.rate_limiter,
+            metrics=self.metrics,
+            on_written=self._invalidate_requests if self.cache is not None else None,
+        )
+
+    @ErrorHandler.base_exception
+    def copy_to(self, target: "DynamoDBClient", **kwargs) -> dict:
+        """Copy all objects of this table to the table of another client, see :class:`TableCopy`.
+
+        The target can be in another region, or in another account through its :class:`arn`.
+
+        :param target: The client of the table to copy to.
+        :type target: :class:`DynamoDBClient`
+
+        :param total_segments: An optional number of segments that are copied in parallel, defaults to 4.
+        :type total_segments: int, optional
+
+        :param transform: An optional function that is called with every object and returns the object
+            to write, or None to skip it.
+        :type transform: Callable, optional
+
+        :param checkpoint_file: An optional path of a file to save the progress in, so an interrupted
+            copy can be resumed by calling this method again with the same file.
+        :type checkpoint_file: str, optional
+
+        :return: The number of copied objects and the throughput, see :meth:`TableCopy.run`.
+        :rtype: dict
+        """
+        return TableCopy(
+            source_client=self.dynamodb_client,
+            source_table=self.table_name,
+            target_client=target.dynamodb_client,
+            target_table=target.table_name,
+            source_rate_limiter=self.rate_limiter,
+            target_rate_limiter=target.rate_limiter,
+            **kwargs,
+        ).run()
+
+    @ErrorHandler.base_exception
+    def export_to_file(
+        self, path: str, total_segments: int = 4, page_size: int = None
+    ) -> dict:
+        """Export all objects of the table to a gzip compressed JSON Lines file, see :func:`export_table`.
+
+        :param path: The path of the file to write, for example ``movies.jsonl.gz``.
+        :type path: str
+
+        :param total_segments: An optional number of segments that are scanned in parallel, defaults to 4.
+        :type total_segments: int, optional
+
+        :param page_size: An optional maximum number of items read per scan request.
+        :type page_size: int, optional
+
+        :rtype: dict
+        """
+        count = export_table(
+            self.dynamodb_client,
+            self.table_name,
+            path,
+            total_segments=total_segments,
+            page_size=page_size,
+            rate_limiter=self.rate_limiter,
+        )
+
+        return {"Success": "Exported items.", "Count": count}
+
+    @ErrorHandler.base_exception
+    def import_from_file(self, path: str, **kwargs) -> dict:
+        """Import the objects of a file written by :meth:`export_to_file` into the table.
+
+        The file is read lazily and written by several parallel writers, see :func:`import_table`.
+        When some objects could not be written, the error message contains them under ``Failed``.
+
+        :param path: The path of the file to read.
+        :type path: str
+
+        :param max_workers: An optional number of parallel writers, defaults to 4.
+        :type max_workers: int, optional
+
+        :param max_items_per_second: An optional maximum write rate.
+        :type max_items_per_second: float, optional
+
+        :rtype: dict
+        """
+        result = import_table(
+            self.dynamodb_client,
+            self.table_name,
+            path,
+            rate_limiter=self.rate_limiter,
+            **kwargs,
+        )
+
+        if self.cache is not None:
+            self.cache.invalidate_table(self.table_name, scope=self._scope())
+
+        result["Failed"] = [
+            {"Item": self._deserialize(failed["Item"]), "Error": failed["Error"]}
+            for failed in result["Failed"]
+        ]
+        if result["Failed"]:
+            return self._batch_error(result)
+
+        return {"Success": "Imported items.", "Count": result["Written"]}
+
+    def transaction(self, max_retries: int = 8) -> TransactionBuilder:
+        """Returns a :class:`TransactionBuilder` for this table, on the resource or the :class:`arn` path.
+
+        Items written through the transaction are removed from the :class:`cache` of this client
+        when it is committed. Put items and values that an update assigns to an attribute are
+        compressed like :meth:`create` when :class:`compression` is configured.
+
+        :param max_retries: An optional number of retries for conflicting transactions, defaults to 8.
+        :type max_retries: int, optional
+
+        :rtype: :class:`TransactionBuilder`
+        """
+        return TransactionBuilder(
+            client=self.dynamodb_client,
+            table_name=self.table_name,
+            serialize=serializer.serialize,
+            serialize_item=self._serialize_item,
+            max_retries=max_retries,
+            on_commit=self._invalidate_operations,
+        )
+
+    def counter(
+        self, shards: int = 10, shard_counts: dict = None, attribute: str = "count"
+    ) -> ShardedCounter:
+        """Returns a :class:`ShardedCounter` on this table, on the resource or the :class:`arn` path.
+        The table should only have a partition key.
+
+        :param shards: An optional default number of shards per counter, defaults to 10.
+        :type shards: int, optional
+
+        :param shard_counts: An optional number of shards per counter, for example ``{"page-views": 50}``.
+        :type shard_counts: dict, optional
+
+        :param attribute: An optional name of the attribute that holds the count, defaults to "count".
+        :type attribute: str, optional
+
+        :rtype: :class:`ShardedCounter`
+        """
+        if self._sort_key_name():
+            raise ValueError(
+                f"Table: '{self.table_name}' has a sort key, counters need a partition key only."
+            )
+
+        return ShardedCounter(
+            client=self.dynamodb_client,
+            table_name=self.table_name,
+            partition_key=self.key_names[0],
+            serialize=serializer.serialize,
+            deserialize=self.deserializer.deserialize,
+            shards=shards,
+            shard_counts=shard_counts,
+            attribute=attribute,
+        )
+
+    def item_size(self, data: dict) -> dict:
+        """Estimate the size of an object as DynamoDB counts it, with and without :class:`compression`.
+
+        :param data: The object, as it would be passed to :meth:`create_and_update`.
+        :type data: dict
+
+        :return: The ``Size`` and ``CompressedSize`` in bytes, the write capacity units of both
+            and whether the stored object ``Fits`` in the 400 KB item limit.
+        :rtype: dict
+        """
+        size = item_size(serializer.serialize_item(data))
+        compressed_size = item_size(self._serialize_item(data))
+
+        return {
+            "Size": size,
+            "CompressedSize": compressed_size,
+            "WriteCapacityUnits": capacity_units(size),
+            "CompressedWriteCapacityUnits": capacity_units(compressed_size),
+            "Fits": compressed_size <= MAX_ITEM_SIZE,
+        }
+
+    @ErrorHandler.base_exception
+    def query(self, table_primary_key: str = None, query_value=None, **kwargs):
         """Query object in database
 
-        :param table_primary_key: Expects the name of the primary key
-        :type table_primary_key: str
+        All pages of the result are read, so large partitions are returned in full.
+        Use :meth:`iter_query` to process them one page at a time.
+        Key values are converted to the attribute type of the key, so ``6`` queries a string key as ``"6"``
+        and ``"6"`` queries a number key as ``6``.
+
+        :param table_primary_key: Expects the name of the primary key, defaults to the partition key of the table.
+        :type table_primary_key: str, optional
 
         :param query_value: Expects a value which is used for the query.
         :type query_value: str
@@ -316,199 +904,915 @@ class DynamoDBClient(object):
         :param comparison_operator: Expects :class:`ComparisonOperators` to determine the key condition expression
         :type comparison_operator: :class:`ComparisonOperators`, Optional
 
+        :param page_size: An optional maximum number of items evaluated per request.
+        :type page_size: int, optional
+
+        :param projection: An optional list of the attributes to return.
+        :type projection: list, optional
+
+        :param filter_expression: An optional filter, built with :class:`boto3.dynamodb.conditions.Attr`
+            or :func:`where`.
+        :type filter_expression: :class:`boto3.dynamodb.conditions.ConditionBase` or dict, optional
+
         :rtype: list
         """
-        if kwargs:
-            table_sort_key = kwargs["table_sort_key"]
-            value_primary_key = kwargs["value_primary_key"]
-            comparison_operator = kwargs["comparison_operator"]
-
-            if (self.arn):
-                comparison_functions = {
-                    ComparisonOperators.EQ: f"{table_primary_key} = {value_primary_key}",
-                    ComparisonOperators.LT: f"{table_sort_key} < {query_value}",
-                    ComparisonOperators.LE: f"{table_sort_key} <= {query_value}",
-                    ComparisonOperators.GE: f"{table_sort_key} >= {query_value}",
-                    ComparisonOperators.GT: f"{table_sort_key} > {query_value}",
-                }
-                response = self.dynamodb_client.query(
-                    TableName=self.table_name,
-                    KeyConditionExpression=f"{comparison_functions[ComparisonOperators.EQ]} \
-                    AND {comparison_functions[comparison_operator]}"
-                )["Items"]
+        page_size = kwargs.pop("page_size", None)
+        projection = kwargs.pop("projection", None)
+        filter_expression = kwargs.pop("filter_expression", None)
+        key_condition = self._key_condition(table_primary_key, query_value, **kwargs)
+
+        return list(
+            self.iter_query(
+                key_condition=key_condition,
+                page_size=page_size,
+                projection=projection,
+                filter_expression=filter_expression,
+            )
+        )
 
-                return self._deserialize(response)
+    @ErrorHandler.base_exception
+    def count(
+        self,
+        table_primary_key: str = None,
+        query_value=None,
+        key_condition: ConditionBase = None,
+        filter_expression: Union[ConditionBase, dict] = None,
+        index_name: str = None,
+        **kwargs,
+    ) -> dict:
+        """Count the objects of a query, without reading them.
 
-            comparison_functions = {
-                ComparisonOperators.EQ: Key(f"{table_primary_key}").eq(
-                    f"{value_primary_key}"
-                ),
-                ComparisonOperators.LT: Key(f"{table_sort_key}").lt(f"{query_value}"),
-                ComparisonOperators.LE: Key(f"{table_sort_key}").lte(f"{query_value}"),
-                ComparisonOperators.GE: Key(f"{table_sort_key}").gte(f"{query_value}"),
-                ComparisonOperators.GT: Key(f"{table_sort_key}").gt(f"{query_value}"),
-            }
-            return self.table_connection.query(
-                KeyConditionExpression=comparison_functions[ComparisonOperators.EQ]
-                & comparison_functions[comparison_operator],
-            )["Items"]
+        The query is made with ``Select=COUNT``, so DynamoDB only returns the number of matching
+        objects of every page. The pages are followed until the end and the counts are summed.
+        The key condition arguments are the same as for :meth:`query` and :meth:`iter_query`.
+        Counting still consumes the read capacity of all evaluated objects.
 
-        if (self.arn):
-            response = self.dynamodb_client.query(
-                TableName=self.table_name,
-                ExpressionAttributeValues={
-                    f":{table_primary_key}": self._serialize(query_value)
-                },
-                KeyConditionExpression=f"{table_primary_key} = :{table_primary_key}"
-            )["Items"]
+        :param filter_expression: An optional filter, built with :class:`boto3.dynamodb.conditions.Attr`
+            or :func:`where`.
+        :type filter_expression: :class:`boto3.dynamodb.conditions.ConditionBase` or dict, optional
 
-            return self._deserialize(response)
+        :param index_name: An optional name of the secondary index to query.
+        :type index_name: str, optional
 
-        return self.table_connection.query(
-            ExpressionAttributeValues={
-                f":{table_primary_key}": {"S": f"{query_value}"}
-            },
-            KeyConditionExpression=Key(f"{table_primary_key}").eq(f"{query_value}"),
-        )["Items"]
+        :return: The number of matching objects under ``Count`` and of evaluated objects under ``ScannedCount``.
+        :rtype: dict
+        """
+        if key_condition is None:
+            key_condition = self._key_condition(
+                table_primary_key, query_value, **kwargs
+            )
+
+        request = self._query_request(
+            key_condition, filter_expression, index_name=index_name
+        )
+
+        return self._count(self.dynamodb_client.query, request)
 
     @ErrorHandler.base_exception
-    def read_all(self) -> list:
+    def count_all(
+        self,
+        filter_expression: Union[ConditionBase, dict] = None,
+        total_segments: int = 1,
+        max_workers: int = None,
+    ) -> dict:
+        """Count the objects of the table, or the objects that match a filter, without reading them.
+
+        The table is scanned with ``Select=COUNT``. Passing :class:`total_segments` scans that many
+        segments in parallel, which makes counting large tables a lot faster.
+
+        :param filter_expression: An optional filter, built with :class:`boto3.dynamodb.conditions.Attr`
+            or :func:`where`.
+        :type filter_expression: :class:`boto3.dynamodb.conditions.ConditionBase` or dict, optional
+
+        :param total_segments: An optional number of segments to scan in parallel, defaults to 1.
+        :type total_segments: int, optional
+
+        :param max_workers: An optional number of threads, defaults to :class:`total_segments`.
+        :type max_workers: int, optional
+
+        :return: The number of matching objects under ``Count`` and of evaluated objects under ``ScannedCount``.
+        :rtype: dict
+        """
+        request = build_request(
+            serialize=serializer.serialize, filter_expression=filter_expression
+        )
+
+        if total_segments == 1:
+            return self._count(self.dynamodb_client.scan, request)
+
+        with ThreadPoolExecutor(max_workers=max_workers or total_segments) as executor:
+            counts = list(
+                executor.map(
+                    lambda segment: self._count(
+                        self.dynamodb_client.scan,
+                        {
+                            **request,
+                            "Segment": segment,
+                            "TotalSegments": total_segments,
+                        },
+                    ),
+                    range(total_segments),
+                )
+            )
+
+        return {
+            "Count": sum(count["Count"] for count in counts),
+            "ScannedCount": sum(count["ScannedCount"] for count in counts),
+        }
+
+    @ErrorHandler.base_exception
+    def read_all(self, **kwargs) -> Union[list, dict]:
         """Read all objects of a given table in DynamoDB.
 
         No parameters required, just the :class:`table_name` in the constructor method of the DynamoDBClient.
         It will return an list with all the table rows or an error message.
 
+        Passing :class:`total_segments` switches to a parallel scan, in which the table is split into
+        segments that are scanned concurrently (``Segment``/``TotalSegments``). The other arguments
+        can also be used without it, the table is then scanned as a single segment.
+
+        :param total_segments: An optional number of segments to scan in parallel.
+        :type total_segments: int, optional
+
+        :param max_workers: An optional number of threads, defaults to :class:`total_segments`.
+        :type max_workers: int, optional
+
+        :param filter_expression: An optional filter, built with :class:`boto3.dynamodb.conditions.Attr`
+            or :func:`where`.
+        :type filter_expression: :class:`boto3.dynamodb.conditions.ConditionBase` or dict, optional
+
+        :param projection: An optional list of the attributes to return.
+        :type projection: list, optional
+
+        :param item_callback: An optional function that is called with every item instead of collecting
+            the items. It is called from the worker threads.
+        :type item_callback: Callable, optional
+
+        :rtype: list
+        """
+        if kwargs:
+            return self._parallel_scan(**kwargs)
+
+        return list(self.iter_scan())
+
+    def iter_scan(
+        self,
+        page_size: int = None,
+        pages: bool = False,
+        filter_expression: Union[ConditionBase, dict] = None,
+        projection: List[str] = None,
+        segment: int = None,
+        total_segments: int = None,
+    ) -> Iterator[Union[dict, list]]:
+        """Lazily scan the table, following ``LastEvaluatedKey`` until the end of the table.
+
+        Only one page is held in memory at a time, so memory use does not grow with the table size.
+
+        :param page_size: An optional maximum number of items evaluated per request (``Limit``).
+        :type page_size: int, optional
+
+        :param pages: Yield a list of items per page instead of single items, defaults to False.
+        :type pages: bool, optional
+
+        :param filter_expression: An optional filter, built with :class:`boto3.dynamodb.conditions.Attr`
+            or :func:`where`.
+        :type filter_expression: :class:`boto3.dynamodb.conditions.ConditionBase` or dict, optional
+
+        :param projection: An optional list of the attributes to return.
+        :type projection: list, optional
+
+        :param segment: An optional segment to scan, together with :class:`total_segments`.
+        :type segment: int, optional
+
+        :param total_segments: An optional total number of segments.
+        :type total_segments: int, optional
+
+        :rtype: Iterator[dict]
+        """
+        request = build_request(
+            serialize=serializer.serialize,
+            filter_expression=filter_expression,
+            projection=projection,
+        )
+        if total_segments:
+            request["Segment"] = segment
+            request["TotalSegments"] = total_segments
+
+        return self._iter_items(
+            self.dynamodb_client.scan, request, page_size=page_size, pages=pages
+        )
+
+    def iter_query(
+        self,
+        table_primary_key: str = None,
+        query_value: str = None,
+        key_condition: ConditionBase = None,
+        page_size: int = None,
+        pages: bool = False,
+        filter_expression: Union[ConditionBase, dict] = None,
+        projection: List[str] = None,
+        index_name: str = None,
+        limit: int = None,
+        reverse: bool = False,
+        **kwargs,
+    ) -> Iterator[Union[dict, list]]:
+        """Lazily query the table, following ``LastEvaluatedKey`` until the partition is read in full.
+
+        The key condition is either given as :class:`table_primary_key` and :class:`query_value`
+        (with the optional sort key arguments of :meth:`query`), or as a :class:`key_condition`
+        built with :class:`boto3.dynamodb.conditions.Key`.
+        Pass :class:`index_name` to query a local or global secondary index instead of the table.
+
+        :param table_primary_key: The name of the primary key.
+        :type table_primary_key: str, optional
+
+        :param query_value: The value which is used for the query.
+        :type query_value: str, optional
+
+        :param key_condition: An optional key condition, instead of the primary key arguments.
+        :type key_condition: :class:`boto3.dynamodb.conditions.ConditionBase`, optional
+
+        :param page_size: An optional maximum number of items evaluated per request (``Limit``).
+        :type page_size: int, optional
+
+        :param pages: Yield a list of items per page instead of single items, defaults to False.
+        :type pages: bool, optional
+
+        :param filter_expression: An optional filter, built with :class:`boto3.dynamodb.conditions.Attr`
+            or :func:`where`.
+        :type filter_expression: :class:`boto3.dynamodb.conditions.ConditionBase` or dict, optional
+
+        :param projection: An optional list of the attributes to return.
+        :type projection: list, optional
+
+        :param index_name: An optional name of the secondary index to query.
+        :type index_name: str, optional
+
+        :param limit: An optional maximum number of items to return in total.
+        :type limit: int, optional
+
+        :param reverse: Return the items in descending sort key order, defaults to False.
+        :type reverse: bool, optional
+
+        :rtype: Iterator[dict]
+        """
+        if key_condition is None:
+            key_condition = self._key_condition(
+                table_primary_key, query_value, **kwargs
+            )
+
+        request = self._query_request(
+            key_condition, filter_expression, projection, index_name, reverse
+        )
+
+        return self._iter_items(
+            self.dynamodb_client.query,
+            request,
+            page_size=page_size,
+            pages=pages,
+            limit=limit,
+        )
+
+    def query_many(
+        self,
+        table_primary_key: str,
+        partition_values: Iterable,
+        sort_key: str = None,
+        value_sort_key=None,
+        comparison_operator: ComparisonOperators = ComparisonOperators.EQ,
+        ordered: bool = False,
+        max_workers: int = 8,
+        timeout: float = None,
+        **kwargs,
+    ) -> Iterator[dict]:
+        """Run the same query for many partition values at the same time.
+
+        Every partition is queried with all its pages on a bounded thread pool, and the items are
+        streamed as soon as they arrive. With :class:`ordered` the partitions are merged into one
+        stream that is sorted on the sort key (descending with :class:`reverse`).
+        The other arguments of :meth:`iter_query` (``index_name``, ``filter_expression``, ``projection``,
+        ``page_size`` and ``reverse``) are passed to every query.
+
+        For example the last day of readings of every device::
+
+            client.query_many(
+                "device", devices, sort_key="timestamp", value_sort_key=since,
+                comparison_operator=ComparisonOperators.GE, ordered=True,
+            )
+
+        :param table_primary_key: The partition key of the table or index.
+        :type table_primary_key: str
+
+        :param partition_values: The partition key values to query.
+        :type partition_values: list
+
+        :param sort_key: An optional sort key to compare against and to order on.
+            Defaults to the sort key of the index, or of the table.
+        :type sort_key: str, optional
+
+        :param value_sort_key: The sort key value, or a ``(low, high)`` tuple for ``BETWEEN``.
+        :type value_sort_key: str, optional
+
+        :param comparison_operator: Expects :class:`ComparisonOperators` to compare the sort key,
+            defaults to ``EQ``.
+        :type comparison_operator: :class:`ComparisonOperators`, optional
+
+        :param ordered: Merge the partitions in sort key order, defaults to False.
+        :type ordered: bool, optional
+
+        :param max_workers: An optional number of partitions that are queried at the same time, defaults to 8.
+        :type max_workers: int, optional
+
+        :param timeout: An optional overall number of seconds, after which a :class:`TimeoutError` is raised.
+        :type timeout: float, optional
+
+        :raises ValueError: When :class:`value_sort_key` or :class:`ordered` is given for a table or
+            index without a sort key.
+
+        :rtype: Iterator[dict]
+        """
+        sort_key = sort_key or self._index_sort_key_name(kwargs.get("index_name"))
+        if not sort_key and (ordered or value_sort_key is not None):
+            raise ValueError(
+                "A query on the sort key or an ordered query needs a sort_key."
+            )
+
+        order_by = sort_key if ordered else None
+
+        def source(partition_value) -> Callable:
+            key_condition = Key(table_primary_key).eq(partition_value)
+            if value_sort_key is not None:
+                key_condition &= self._sort_key_condition(
+                    sort_key, comparison_operator, value_sort_key
+                )
+
+            return lambda: self.iter_query(
+                key_condition=key_condition, pages=True, **kwargs
+            )
+
+        return fan_out(
+            [source(value) for value in partition_values],
+            max_workers=max_workers,
+            timeout=timeout,
+            key=(lambda item: item[order_by]) if order_by else None,
+            reverse=kwargs.get("reverse", False),
+        )
+
+    def query_page(
+        self,
+        table_primary_key: str = None,
+        query_value: str = None,
+        cursor: str = None,
+        page_size: int = 25,
+        key_condition: ConditionBase = None,
+        filter_expression: Union[ConditionBase, dict] = None,
+        projection: List[str] = None,
+        index_name: str = None,
+        reverse: bool = False,
+        **kwargs,
+    ) -> Tuple[list, Union[str, None]]:
+        """Query a single page, for paginated API endpoints.
+
+        Every call makes one request to DynamoDB, so the latency is bounded by :class:`page_size`.
+        The returned cursor is passed to the next call to read the next page. It is an opaque,
+        URL-safe token, signed when the client has a :class:`cursor_secret`.
+        The key condition arguments are the same as for :meth:`iter_query`.
+
+        :param cursor: An optional cursor of the previous page, None for the first page.
+        :type cursor: str, optional
+
+        :param page_size: An optional maximum number of items evaluated per page, defaults to 25.
+            A page can hold fewer items when a filter is used.
+        :type page_size: int, optional
+
+        :raises InvalidCursor: When the cursor is malformed or its signature does not match.
+
+        :return: The items of the page and the cursor of the next page, which is None after the last page.
+        :rtype: tuple
+        """
+        if key_condition is None:
+            key_condition = self._key_condition(
+                table_primary_key, query_value, **kwargs
+            )
+
+        request = self._query_request(
+            key_condition, filter_expression, projection, index_name, reverse
+        )
+
+        return self._page(
+            self.dynamodb_client.query,
+            request,
+            cursor,
+            page_size,
+            scope=f"query:{index_name or ''}",
+        )
+
+    def scan_page(
+        self,
+        cursor: str = None,
+        page_size: int = 25,
+        filter_expression: Union[ConditionBase, dict] = None,
+        projection: List[str] = None,
+    ) -> Tuple[list, Union[str, None]]:
+        """Scan a single page of the table, see :meth:`query_page`.
+
+        :raises InvalidCursor: When the cursor is malformed or its signature does not match.
+
+        :return: The items of the page and the cursor of the next page, which is None after the last page.
+        :rtype: tuple
+        """
+        request = build_request(
+            serialize=serializer.serialize,
+            filter_expression=filter_expression,
+            projection=projection,
+        )
+
+        return self._page(
+            self.dynamodb_client.scan, request, cursor, page_size, scope="scan:"
+        )
+
+    @ErrorHandler.base_exception
+    def index_query(
+        self,
+        index_name: str,
+        index_primary_key: str,
+        value_primary_key,
+        index_sort_key: str = None,
+        value_sort_key=None,
+        comparison_operator: ComparisonOperators = ComparisonOperators.EQ,
+        **kwargs,
+    ) -> list:
+        """Query a local or global secondary index.
+
+        All pages of the result are read, unless a :class:`limit` is given.
+        Use :meth:`iter_query` with :class:`index_name` to process them one page at a time.
+
+        :param index_name: The name of the local or global secondary index.
+        :type index_name: str
+
+        :param index_primary_key: The partition key of the index.
+        :type index_primary_key: str
+
+        :param value_primary_key: The partition key value to query.
+        :type value_primary_key: str
+
+        :param index_sort_key: An optional sort key of the index to compare against.
+        :type index_sort_key: str, optional
+
+        :param value_sort_key: The sort key value, or a ``(low, high)`` tuple for ``BETWEEN``.
+        :type value_sort_key: str, optional
+
+        :param comparison_operator: Expects :class:`ComparisonOperators` to compare the sort key,
+            defaults to ``EQ``. ``NE`` can not be used in a key condition.
+        :type comparison_operator: :class:`ComparisonOperators`, optional
+
+        :param projection: An optional list of the attributes to return.
+        :type projection: list, optional
+
+        :param limit: An optional maximum number of items to return.
+        :type limit: int, optional
+
+        :param reverse: Return the items in descending sort key order, defaults to False.
+        :type reverse: bool, optional
+
+        :param page_size: An optional maximum number of items evaluated per request.
+        :type page_size: int, optional
+
+        :param filter_expression: An optional filter on non-key attributes, built with
+            :class:`boto3.dynamodb.conditions.Attr` or :func:`where`.
+        :type filter_expression: :class:`boto3.dynamodb.conditions.ConditionBase` or dict, optional
+
         :rtype: list
         """
+        key_condition = Key(index_primary_key).eq(value_primary_key)
+
+        if index_sort_key:
+            key_condition &= self._sort_key_condition(
+                index_sort_key, comparison_operator, value_sort_key
+            )
+
+        return list(
+            self.iter_query(
+                key_condition=key_condition, index_name=index_name, **kwargs
+            )
+        )
+
+    def _parallel_scan(
+        self,
+        total_segments: int = 1,
+        max_workers: int = None,
+        filter_expression: Union[ConditionBase, dict] = None,
+        projection: List[str] = None,
+        item_callback: Callable = None,
+    ) -> Union[list, dict]:
+        request = build_request(
+            serialize=serializer.serialize,
+            filter_expression=filter_expression,
+            projection=projection,
+        )
+
         data = []
+        data_lock = threading.Lock()
+
+        def consume(items: list):
+            if item_callback:
+                for item in items:
+                    item_callback(item)
+            else:
+                # Pages are added to one shared list and dropped, so items are never held twice
+                with data_lock:
+                    data.extend(items)
+
+        with ThreadPoolExecutor(max_workers=max_workers or total_segments) as executor:
+            futures = [
+                executor.submit(
+                    self._scan_segment, request, segment, total_segments, consume
+                )
+                for segment in range(total_segments)
+            ]
+            count = sum(future.result() for future in futures)
+
+        if item_callback:
+            return {"Success": "Scanned items in parallel.", "Count": count}
+
+        return data
+
+    def _scan_segment(
+        self, request: dict, segment: int, total_segments: int, consume: Callable
+    ) -> int:
+        count = 0
+        request = {**request, "Segment": segment, "TotalSegments": total_segments}
+
+        for items in self._iter_items(self.dynamodb_client.scan, request, pages=True):
+            count += len(items)
+            consume(items)
+
+        return count
+
+    @staticmethod
+    def _rate_limiter(rate_limit, table: dict) -> Union[CapacityRateLimiter, None]:
+        if isinstance(rate_limit, CapacityRateLimiter):
+            return rate_limit
+        if rate_limit is True:
+            return CapacityRateLimiter.from_table(table)
+        if rate_limit:
+            return CapacityRateLimiter.from_table(table, target=rate_limit)
+
+        return None
+
+    def _diff_upsert(
+        self,
+        batch_list: Iterable[dict],
+        diff: str,
+        hash_attribute: str = "contentHash",
+        max_workers: int = 4,
+        max_retries: int = 8,
+    ) -> dict:
+        result = DiffUpsert(
+            client=self.dynamodb_client,
+            table_name=self.table_name,
+            key_names=self.key_names,
+            serialize=self._serialize_item,
+            deserialize=self._deserialize_stored,
+            compare=diff,
+            hash_attribute=hash_attribute,
+            max_workers=max_workers,
+            max_retries=max_retries,
+            rate_limiter=self.rate_limiter,
+            metrics=self.metrics,
+            on_written=self._invalidate,
+        ).write(batch_list)
+
+        counts = {
+            "Written": result["Written"],
+            "Skipped": result["Skipped"],
+            "Conflicts": result["Conflicts"],
+        }
+        if result["Failed"]:
+            return {**self._batch_error(result), **counts}
+
+        return {"Success": "Saved or updated changed items in batch.", **counts}
+
+    def _delete_keys(
+        self, keys: Iterable[dict], success: str, max_workers: int, max_retries: int
+    ) -> dict:
+        # The keys are already serialized, they are written as they are
+        result = BatchWriter(
+            client=self.dynamodb_client,
+            table_name=self.table_name,
+            serialize=lambda key: key,
+            max_workers=max_workers,
+            max_retries=max_retries,
+            rate_limiter=self.rate_limiter,
+            metrics=self.metrics,
+        ).delete_keys(keys)
+
+        if self.cache is not None:
+            self.cache.invalidate_table(self.table_name, scope=self._scope())
+
+        result["Failed"] = [
+            {"Key": self._deserialize(failed["Key"]), "Error": failed["Error"]}
+            for failed in result["Failed"]
+        ]
+        if result["Failed"]:
+            return self._batch_error(result)
+
+        return {"Success": success, "Count": result["Written"]}
+
+    def _measured(self, operation: Callable, name: str) -> Callable:
+        return measured(operation, name, self.table_name, self.metrics)
+
+    def _scope(self) -> tuple:
+        # The account, region and endpoint of the client, tables with the same name elsewhere are other tables
+        return (self.arn or "", self.region_name, self.endpoint_url or "")
+
+    def _sort_key_name(self) -> Union[str, None]:
+        return self.key_names[1] if len(self.key_names) > 1 else None
+
+    def _index_sort_key_name(self, index_name: Union[str, None]) -> Union[str, None]:
+        if not index_name:
+            return self._sort_key_name()
+
+        key_names = self.table_metadata().indexes.get(index_name, [])
+        return key_names[1] if len(key_names) > 1 else None
+
+    def _invalidate(self, item: dict):
+        if self.cache is not None:
+            self.cache.invalidate(
+                self.table_name,
+                {name: item[name] for name in self.key_names if name in item},
+                scope=self._scope(),
+            )
+
+    def _invalidate_operations(self, operations: List[dict]):
+        if self.cache is None:
+            return
+
+        for operation in operations:
+            ((kind, request),) = operation.items()
+            if kind != "ConditionCheck" and request["TableName"] == self.table_name:
+                self._invalidate(
+                    self._deserialize(request.get("Key") or request["Item"])
+                )
+
+    def _invalidate_requests(self, requests: List[Tuple[str, dict]]):
+        # Called after the batch is written, so a read in between can not cache the old item again
+        for _, payload in requests:
+            self._invalidate(payload)
+
+    @classmethod
+    def _batch_result(cls, result: dict, success: str) -> dict:
+        if result["Failed"]:
+            return cls._batch_error(result)
+
+        return {"Success": success}
+
+    @staticmethod
+    def _batch_error(result: dict) -> dict:
+        return {
+            "Error": "Something went wrong.",
+            "Message": f"{len(result['Failed'])} items could not be written.",
+            "Written": result["Written"],
+            "Failed": result["Failed"],
+        }
+
+    def _batch_get_chunk(
+        self, keys: List[dict], request: dict, max_retries: int
+    ) -> list:
+        items = batch_get(
+            self.dynamodb_client,
+            self.table_name,
+            [self._serialize(key) for key in keys],
+            request=request,
+            max_retries=max_retries,
+            rate_limiter=self.rate_limiter,
+            metrics=self.metrics,
+        )
+
+        return self._deserialize(items)
+
+    @staticmethod
+    def _query_request(
+        key_condition: ConditionBase,
+        filter_expression: Union[ConditionBase, dict] = None,
+        projection: List[str] = None,
+        index_name: str = None,
+        reverse: bool = False,
+    ) -> dict:
+        request = build_request(
+            serialize=serializer.serialize,
+            key_condition=key_condition,
+            filter_expression=filter_expression,
+            projection=projection,
+        )
+        if index_name:
+            request["IndexName"] = index_name
+        if reverse:
+            request["ScanIndexForward"] = False
+
+        return request
+
+    def _page(
+        self,
+        operation: Callable,
+        request: dict,
+        cursor: str,
+        page_size: int,
+        scope: str,
+    ) -> tuple:
+        scope = f"{self.table_name}:{scope}"
+        request = {**request, "Limit": page_size}
+
+        start_key = self.cursor.decode(cursor, scope=scope)
+        if start_key:
+            request["ExclusiveStartKey"] = start_key
+
+        operation = self._measured(operation, _operation_name(request))
+        response = limited_call(
+            operation, READ, self.rate_limiter, TableName=self.table_name, **request
+        )
+
+        return self._deserialize(response["Items"]), self.cursor.encode(
+            response.get("LastEvaluatedKey"), scope=scope
+        )
+
+    def _count(self, operation: Callable, request: dict) -> dict:
+        count = {"Count": 0, "ScannedCount": 0}
+
+        for response in self._iter_pages(operation, {**request, "Select": "COUNT"}):
+            count["Count"] += response["Count"]
+            count["ScannedCount"] += response["ScannedCount"]
+
+        return count
+
+    def _iter_items(
+        self,
+        operation: Callable,
+        request: dict,
+        page_size: int = None,
+        pages: bool = False,
+        limit: int = None,
+    ):
+        if page_size or limit:
+            # A request never has to read more items than the limit
+            request = {**request, "Limit": min(n for n in (page_size, limit) if n)}
+
+        remaining = limit
+
+        for response in self._iter_pages(operation, request):
+            items = self._deserialize(response["Items"])
+
+            if remaining is not None:
+                items = items[:remaining]
+                remaining -= len(items)
+
+            if pages:
+                yield items
+            else:
+                yield from items
+
+            if remaining == 0:
+                return
+
+    def _iter_pages(self, operation: Callable, request: dict):
+        operation = self._measured(operation, _operation_name(request))
         last_evaluated_key = None
 
         while True:
             if last_evaluated_key:
-                response = self.table_connection.scan(
-                    ExclusiveStartKey=last_evaluated_key
+                response = limited_call(
+                    operation,
+                    READ,
+                    self.rate_limiter,
+                    TableName=self.table_name,
+                    ExclusiveStartKey=last_evaluated_key,
+                    **request,
                 )
             else:
-                response = self.table_connection.scan()
+                response = limited_call(
+                    operation,
+                    READ,
+                    self.rate_limiter,
+                    TableName=self.table_name,
+                    **request,
+                )
 
-            for item in response["Items"]:
-                data.append(item)
+            yield response
 
             if "LastEvaluatedKey" in response:
                 last_evaluated_key = response["LastEvaluatedKey"]
             else:
                 break
 
-        return data
+    def _key_condition(
+        self, table_primary_key: str, query_value, **kwargs
+    ) -> ConditionBase:
+        table_primary_key = table_primary_key or self.key_names[0]
+
+        if not any(
+            k in kwargs
+            for k in ("table_sort_key", "value_primary_key", "comparison_operator")
+        ):
+            return Key(table_primary_key).eq(
+                self._key_value(table_primary_key, query_value)
+            )
 
-    # TODO FIX THIS
-    # def local_secondary_index_query(
-    #     self,
-    #     index_name: str,
-    #     table_primary_key: str,
-    #     value_primary_key: str,
-    #     local_secondary_sort_key: str,
-    #     value_local_secondary_sort_key: str,
-    #     comparison_operator: ComparisonOperators,
-    # ):
-    #     """
-    #     Uses a local secondary index to query a table.
-    #     This expects an :class:`index_name`, :class:`table_primary_key`,
-    #     :class:`value_primary_key`, :class:`local_Secondary_sort_key`,
-    #     :class:`value_local_secondary_sory_key`,
-    #     and a :class:`comparison_operator` parameter.
-    #     Use this method when you have a local secondary index on the table setup.
-
-    #     Parameters
-    #     ----------
-
-    #         index_name: str
-    #             the name of the local secondary index
-
-    #         partition_key: str
-    #             the key used in stead of the original sort key
-    #         local_Secondary_sory_query: str
-    #             the value you are looking for
-    #         local_secondary_sort_key: str
-    #             the local secondary sort key
-    #         partition_value: str
-    #             the value of the partition key.
-    #         comparison_perator: ComparisonOperators
-    #             can compare with comparison operators.
-
-    #                 - ComparisonOperators.EQ = equals
-    #                 - ComparisonOperators.LT = less than
-    #                 - ComparisonOperators.LE = Less or equal
-    #                 - ComparisonOperators.GE = greater than or equal
-    #                 - ComparisonOperators.GT = greater than
-    #     """
-
-    #     comparison_functions = {
-    #         ComparisonOperators.EQ: Key(f"{local_secondary_sort_key}").eq,
-    #         ComparisonOperators.LT: Key(f"{local_secondary_sort_key}").lt,
-    #         ComparisonOperators.LE: Key(f"{local_secondary_sort_key}").lt,
-    #         ComparisonOperators.GE: Key(f"{local_secondary_sort_key}").gte,
-    #         ComparisonOperators.GT: Key(f"{local_secondary_sort_key}").gt,
-    #     }
-
-    #     data = []
-    #     last_evaluated_key = None
-
-    #     while True:
-    #         if last_evaluated_key:
-    #             response = self.table_connection.query(
-    #                 IndexName=index_name,
-    #                 ExclusiveStartKey=last_evaluated_key,
-    #                 KeyConditionExpression=Key(f"{table_primary_key}").eq(f"{value_primary_key}")
-    #                 & comparison_functions[comparison_operator],
-    #             )
-    #         else:
-    #             response = self.table_connection.query(
-    #                 IndexName=index_name,
-    #                 KeyConditionExpression=Key(f"{table_primary_key}").eq(f"{value_primary_key}")
-    #                 & comparison_functions[comparison_operator](value_local_secondary_sort_key),
-    #             )
-
-    #         for item in response["Items"]:
-    #             data.append(item)
-
-    #         if "LastEvaluatedKey" in response:
-    #             last_evaluated_key = response["LastEvaluatedKey"]
-    #         else:
-    #             break
-
-    #     return data
+        table_sort_key = kwargs.get("table_sort_key") or self._sort_key_name()
+        value_primary_key = self._key_value(
+            table_primary_key, kwargs["value_primary_key"]
+        )
+        comparison_operator = kwargs["comparison_operator"]
 
-    @staticmethod
-    def _get_sort_key_value_pair(kwargs):
-        destructed_kwargs = destruct_dict(
-            dict_to_destruct=kwargs,
-            keys=[
-                "table_sort_key",
-                "value_sort_key",
-            ],
+        return Key(table_primary_key).eq(value_primary_key) & self._sort_key_condition(
+            table_sort_key, comparison_operator, query_value
         )
 
-        return destructed_kwargs
+    def _sort_key_condition(
+        self, sort_key: str, comparison_operator: ComparisonOperators, value
+    ) -> ConditionBase:
+        key = Key(sort_key)
+        if comparison_operator == ComparisonOperators.BETWEEN:
+            value = [self._key_value(sort_key, v) for v in value]
+        else:
+            value = self._key_value(sort_key, value)
+
+        comparison_functions = {
+            ComparisonOperators.EQ: key.eq,
+            ComparisonOperators.LT: key.lt,
+            ComparisonOperators.LE: key.lte,
+            ComparisonOperators.GE: key.gte,
+            ComparisonOperators.GT: key.gt,
+            ComparisonOperators.BETWEEN: lambda values: key.between(*values),
+            ComparisonOperators.BEGINS_WITH: key.begins_with,
+        }
+        if comparison_operator not in comparison_functions:
+            raise ValueError(
+                f"{comparison_operator} can not be used in a key condition."
+            )
+
+        return comparison_functions[comparison_operator](value)
+
+    def _key_value(self, key_name: str, value):
+        # Key values follow the attribute type of the key schema, so a number still queries a string key
+        attribute_type = self.table_metadata().attribute_types.get(key_name)
+
+        if attribute_type == "S" and not isinstance(value, str):
+            return f"{value}"
+        if attribute_type == "N" and isinstance(value, str):
+            try:
+                return Decimal(value)
+            except InvalidOperation:
+                return value
+
+        return value
+
+    def _key(
+        self, table_primary_key: Union[str, None], value_primary_key, kwargs: dict
+    ) -> dict:
+        key = {table_primary_key or self.key_names[0]: value_primary_key}
+
+        if "value_sort_key" in kwargs:
+            table_sort_key = kwargs.get("table_sort_key") or self._sort_key_name()
+            if not table_sort_key:
+                raise ValueError(f"Table: '{self.table_name}' has no sort key.")
+            key[table_sort_key] = kwargs["value_sort_key"]
+
+        return key
+
+    def _serialize_item(self, item: dict) -> dict:
+        serialized = serializer.serialize_item(item)
+        if self.compressor is not None:
+            return self.compressor.compress_item(serialized)
+
+        return serialized
+
+    def _deserialize_stored(self, item: dict) -> dict:
+        # Stored items are compared with python values, so numbers stay exact whatever the numbers option is
+        if self.compressor is not None:
+            item = self.compressor.decompress_item(item)
+
+        return deserializer.deserialize_item(item)
 
     @staticmethod
     def _serialize(object):
-        serializer = TypeSerializer()
         if type(object) is dict:
-            return {k: serializer.serialize(v) for k, v in object.items()}
+            return serializer.serialize_item(object)
         else:
             return serializer.serialize(object)
 
-    @staticmethod
-    def _deserialize(response):
-        deserializer = TypeDeserializer()
+    def _deserialize(self, response):
         if type(response) is list:
-            items = []
-            for item in response:
-                items.append({k: deserializer.deserialize(v) for k, v in item.items()})
-
-            return items
+            if self.compressor is not None:
+                response = [self.compressor.decompress_item(item) for item in response]
+            return self.deserializer.deserialize_items(response)
         elif type(response) is dict:
-            return {k: deserializer.deserialize(v) for k, v in response.items()}
+            if self.compressor is not None:
+                response = self.compressor.decompress_item(response)
+            return self.deserializer.deserialize_item(response)
         else:
-            return deserializer.deserialize(response)
+            return self.deserializer.deserialize(response)
+
+
+def _operation_name(request: dict) -> str:
+    # Queries always have a key condition, scans never do
+    return "query" if "KeyConditionExpression" in request else "scan"
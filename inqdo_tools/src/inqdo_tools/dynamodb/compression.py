@@ -0,0 +1,190 @@
+"""
+DynamoDB attribute compression
+==============================
+"""
+
+import json
+import lzma
+import math
+import os
+import zlib
+from typing import Iterable
+
+if "DEBUG_INQDO_TOOLS" in os.environ.keys():  # pragma: no cover
+    from dynamodb.utils import from_json_item, to_json_item
+else:
+    from inqdo_tools.dynamodb.utils import from_json_item, to_json_item
+
+# Prefix of every compressed value, followed by one byte for the algorithm
+MARKER = b"\x00iqz"
+_HEADER_SIZE = len(MARKER) + 1
+
+_ALGORITHMS = {
+    "zlib": (b"z", zlib.compress, zlib.decompress),
+    "lzma": (b"x", lzma.compress, lzma.decompress),
+}
+_DECOMPRESSORS = {tag: decompress for tag, _, decompress in _ALGORITHMS.values()}
+
+# Maximum size of a single item
+MAX_ITEM_SIZE = 400 * 1024
+
+
+class AttributeCompressor(object):
+    """
+    The AttributeCompressor class stores large attributes of an item as compressed Binary values.
+
+    Item size drives the read and write capacity that every request consumes, and an item can be
+    at most 400 KB. Attributes that hold large JSON blobs often compress to a fraction of that.
+    Configured attributes of which the serialized value is larger than :class:`threshold` bytes are
+    compressed with zlib or lzma and stored as Binary with a marker. Values that do not get smaller
+    are stored as they are. Marked values are decompressed into their original type on read,
+    whichever algorithm they were written with, so the algorithm can be changed later.
+
+    Compressed attributes can not be used in key conditions, filters or update expressions.
+
+    :param attributes: The names of the attributes to compress.
+    :type attributes: list
+
+    :param threshold: An optional minimum size in bytes of the values to compress, defaults to 1024.
+    :type threshold: int, optional
+
+    :param algorithm: An optional compression algorithm, "zlib" (default) or "lzma".
+    :type algorithm: str, optional
+    """
+
+    def __init__(
+        self, attributes: Iterable[str], threshold: int = 1024, algorithm: str = "zlib"
+    ):
+        """Constructor method"""
+        if algorithm not in _ALGORITHMS:
+            raise ValueError(
+                f"algorithm should be one of {', '.join(_ALGORITHMS)}, not '{algorithm}'."
+            )
+
+        self.attributes = frozenset(attributes)
+        self.threshold = threshold
+        self.algorithm = algorithm
+        self._tag, self._compress, _ = _ALGORITHMS[algorithm]
+
+    def compress_item(self, item: dict) -> dict:
+        """Compresses the configured attributes of a serialized item that are above the threshold.
+
+        :rtype: dict
+        """
+        compressed = None
+
+        for name in self.attributes.intersection(item):
+            value = item[name]
+            if attribute_value_size(value) < self.threshold:
+                continue
+
+            payload = self.compress(value)
+            if len(payload) < attribute_value_size(value):
+                compressed = compressed or dict(item)
+                compressed[name] = {"B": payload}
+
+        return compressed or item
+
+    def compress(self, value: dict) -> bytes:
+        """Returns the marked, compressed form of a serialized attribute value.
+
+        :rtype: bytes
+        """
+        data = json.dumps(to_json_item({"v": value}), separators=(",", ":")).encode(
+            "utf-8"
+        )
+        return MARKER + self._tag + self._compress(data)
+
+    @staticmethod
+    def decompress_item(item: dict) -> dict:
+        """Restores the compressed attributes of a serialized item, other items are returned as they are.
+
+        :rtype: dict
+        """
+        decompressed = None
+
+        for name, value in item.items():
+            if is_compressed(value):
+                decompressed = decompressed or dict(item)
+                decompressed[name] = AttributeCompressor.decompress(value["B"])
+
+        return decompressed or item
+
+    @staticmethod
+    def decompress(payload: bytes) -> dict:
+        """Returns the serialized attribute value of a compressed payload.
+
+        :rtype: dict
+        """
+        header, compressed = payload[:_HEADER_SIZE], payload[_HEADER_SIZE:]
+        data = _DECOMPRESSORS[header[-1:]](compressed)
+        return from_json_item(json.loads(data.decode("utf-8")))["v"]
+
+
+def is_compressed(value: dict) -> bool:
+    """Returns whether a serialized attribute value was written by :class:`AttributeCompressor`.
+
+    :rtype: bool
+    """
+    data = value.get("B")
+    return isinstance(data, (bytes, bytearray)) and data.startswith(MARKER)
+
+
+def item_size(item: dict) -> int:
+    """
+    Estimates the size in bytes of a serialized item the way DynamoDB counts it: the UTF-8 length of
+    every attribute name plus the size of its value.
+
+    :rtype: int
+    """
+    return sum(
+        len(name.encode("utf-8")) + attribute_value_size(value)
+        for name, value in item.items()
+    )
+
+
+def attribute_value_size(value: dict) -> int:
+    """Estimates the size in bytes of a serialized attribute value, see :func:`item_size`.
+
+    :rtype: int
+    """
+    ((tag, data),) = value.items()
+
+    if tag == "S":
+        return len(data.encode("utf-8"))
+    if tag == "N":
+        return _number_size(data)
+    if tag == "B":
+        return len(data)
+    if tag in ("BOOL", "NULL"):
+        return 1
+    if tag == "SS":
+        return sum(len(v.encode("utf-8")) for v in data)
+    if tag == "NS":
+        return sum(_number_size(v) for v in data)
+    if tag == "BS":
+        return sum(len(v) for v in data)
+    if tag == "L":
+        # 3 bytes for the list and 1 byte per element
+        return 3 + sum(1 + attribute_value_size(v) for v in data)
+    if tag == "M":
+        return 3 + sum(
+            1 + len(k.encode("utf-8")) + attribute_value_size(v)
+            for k, v in data.items()
+        )
+
+    raise ValueError(f"Unknown attribute value type '{tag}'.")
+
+
+def capacity_units(size: int, write: bool = True) -> int:
+    """Returns the write (1 KB) or strongly consistent read (4 KB) capacity units for an item of :class:`size` bytes.
+
+    :rtype: int
+    """
+    return max(1, math.ceil(size / (1024 if write else 4096)))
+
+
+def _number_size(number: str) -> int:
+    # 1 byte per two significant digits, plus 1 byte
+    digits = number.lstrip("-").replace(".", "").split("E")[0].split("e")[0].strip("0")
+    return (len(digits) + 1) // 2 + 1
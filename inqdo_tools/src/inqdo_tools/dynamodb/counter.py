@@ -0,0 +1,154 @@
+"""
+DynamoDB sharded counter
+========================
+"""
+
+import os
+import random
+from typing import Callable, Dict, Iterable, List
+
+if "DEBUG_INQDO_TOOLS" in os.environ.keys():  # pragma: no cover
+    from dynamodb.utils import BATCH_GET_SIZE, batch_get, chunks
+else:
+    from inqdo_tools.dynamodb.utils import BATCH_GET_SIZE, batch_get, chunks
+
+
+class ShardedCounter(object):
+    """
+    The ShardedCounter class spreads the increments of a hot counter over several items.
+
+    A single item can only take a limited number of writes per second, so every increment of a
+    counter goes to one of N items with a random suffix, for example ``page-views#0`` to
+    ``page-views#9``. Reading the counter sums all shards with a single ``batch_get_item``.
+    Very hot counters can be given more shards than the default with :class:`shard_counts`.
+    The number of shards of a counter can be increased later, but not decreased, because the
+    counts in the removed shards would no longer be read.
+
+    :meth:`shard_keys` can also be used for write sharding of other data, for example to spread
+    writes over suffixed partition keys and read them back with :meth:`DynamoDBClient.query_many`.
+
+    :param client: A low-level DynamoDB client.
+    :type client: :class:`botocore.client.BaseClient`
+
+    :param table_name: The name of the table of the counters.
+    :type table_name: str
+
+    :param partition_key: The name of the partition key of the table.
+    :type partition_key: str
+
+    :param serialize: Function that serializes a python value into a DynamoDB attribute value.
+    :type serialize: Callable
+
+    :param deserialize: Function that deserializes a DynamoDB attribute value into a python value.
+    :type deserialize: Callable
+
+    :param shards: An optional default number of shards per counter, defaults to 10.
+    :type shards: int, optional
+
+    :param shard_counts: An optional number of shards per counter, for counters that need more or fewer
+        shards than the default, for example ``{"page-views": 50}``.
+    :type shard_counts: dict, optional
+
+    :param attribute: An optional name of the attribute that holds the count, defaults to "count".
+    :type attribute: str, optional
+
+    :param separator: An optional separator between the counter and the shard number, defaults to "#".
+    :type separator: str, optional
+    """
+
+    def __init__(
+        self,
+        client,
+        table_name: str,
+        partition_key: str,
+        serialize: Callable,
+        deserialize: Callable,
+        shards: int = 10,
+        shard_counts: Dict[str, int] = None,
+        attribute: str = "count",
+        separator: str = "#",
+    ):
+        """Constructor method"""
+        self.client = client
+        self.table_name = table_name
+        self.partition_key = partition_key
+        self.serialize = serialize
+        self.deserialize = deserialize
+        self.shards = shards
+        self.shard_counts = dict(shard_counts or {})
+        self.attribute = attribute
+        self.separator = separator
+
+    def shard_count(self, counter: str) -> int:
+        """Returns the number of shards of a counter.
+
+        :rtype: int
+        """
+        return self.shard_counts.get(counter, self.shards)
+
+    def shard_keys(self, counter: str) -> List[str]:
+        """Returns the partition key values of all shards of a counter.
+
+        :rtype: list
+        """
+        return [
+            f"{counter}{self.separator}{shard}"
+            for shard in range(self.shard_count(counter))
+        ]
+
+    def increment(self, counter: str, amount=1):
+        """Adds :class:`amount` (which can be negative) to a random shard of the counter."""
+        shard = random.randrange(self.shard_count(counter))
+
+        self.client.update_item(
+            TableName=self.table_name,
+            Key={
+                self.partition_key: self.serialize(f"{counter}{self.separator}{shard}")
+            },
+            UpdateExpression="ADD #c :a",
+            ExpressionAttributeNames={"#c": self.attribute},
+            ExpressionAttributeValues={":a": self.serialize(amount)},
+        )
+
+    def value(self, counter: str):
+        """Returns the total of all shards of a counter, 0 when it was never incremented.
+
+        :rtype: Decimal
+        """
+        return self.values([counter])[counter]
+
+    def values(self, counters: Iterable[str]) -> dict:
+        """
+        Returns the totals of several counters. All shards are read with one ``batch_get_item``
+        request per 100 shards.
+
+        :rtype: dict
+        """
+        counters = list(dict.fromkeys(counters))
+        owners = {
+            shard_key: counter
+            for counter in counters
+            for shard_key in self.shard_keys(counter)
+        }
+        totals = {counter: 0 for counter in counters}
+
+        request = {
+            "ProjectionExpression": "#k, #c",
+            "ExpressionAttributeNames": {
+                "#k": self.partition_key,
+                "#c": self.attribute,
+            },
+        }
+
+        for shard_keys in chunks(list(owners), BATCH_GET_SIZE):
+            keys = [
+                {self.partition_key: self.serialize(shard_key)}
+                for shard_key in shard_keys
+            ]
+
+            for item in batch_get(self.client, self.table_name, keys, request=request):
+                if self.attribute in item:
+                    counter = owners[self.deserialize(item[self.partition_key])]
+                    totals[counter] += self.deserialize(item[self.attribute])
+
+        return totals
@@ -0,0 +1,116 @@
+"""
+DynamoDB pagination cursor
+==========================
+"""
+
+import base64
+import binascii
+import hashlib
+import hmac
+import json
+import os
+from typing import Union
+
+if "DEBUG_INQDO_TOOLS" in os.environ.keys():  # pragma: no cover
+    from utils.common import to_json
+else:
+    from inqdo_tools.utils.common import to_json
+
+
+class InvalidCursor(ValueError):
+    """Raised when a cursor can not be decoded, or its signature does not match."""
+
+
+class Cursor(object):
+    """
+    The Cursor class turns a ``LastEvaluatedKey`` into an opaque, URL-safe token and back.
+
+    The key is kept in its typed DynamoDB form (``{"name": {"S": "inQdo"}}``), so no type
+    information is lost, and is encoded as URL-safe base64 json without padding.
+    When a :class:`secret` is given the token is signed with HMAC-SHA256, so clients of an API
+    can not forge a start key. The signature also covers the :class:`scope` (for example the
+    table and index name), so a token can not be replayed against another query.
+
+    :param secret: An optional secret to sign the tokens with.
+    :type secret: str or bytes, optional
+    """
+
+    def __init__(self, secret: Union[str, bytes, None] = None):
+        """Constructor method"""
+        self.secret = secret.encode() if isinstance(secret, str) else secret
+
+    def encode(
+        self, last_evaluated_key: Union[dict, None], scope: str = ""
+    ) -> Union[str, None]:
+        """Returns the token for a ``LastEvaluatedKey``, or None when there is no next page.
+
+        :rtype: str
+        """
+        if not last_evaluated_key:
+            return None
+
+        payload = {
+            "k": {
+                name: _encode_value(value) for name, value in last_evaluated_key.items()
+            }
+        }
+        if self.secret:
+            payload["s"] = self._sign(payload["k"], scope)
+
+        return base64.urlsafe_b64encode(to_json(payload).encode()).decode().rstrip("=")
+
+    def decode(self, cursor: Union[str, None], scope: str = "") -> Union[dict, None]:
+        """
+        Returns the ``ExclusiveStartKey`` for a token, or None for an empty token.
+
+        :raises InvalidCursor: When the token is malformed or the signature does not match.
+        :rtype: dict
+        """
+        if not cursor:
+            return None
+
+        # Cursors come from callers, so a malformed one is an InvalidCursor and not an error to log
+        try:
+            payload = json.loads(
+                base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+            )
+        except (binascii.Error, ValueError):
+            raise InvalidCursor("The cursor is not valid.")
+
+        if not isinstance(payload, dict) or not isinstance(payload.get("k"), dict):
+            raise InvalidCursor("The cursor is not valid.")
+
+        if self.secret and not hmac.compare_digest(
+            str(payload.get("s", "")), self._sign(payload["k"], scope)
+        ):
+            raise InvalidCursor("The cursor signature is not valid.")
+
+        try:
+            return {name: _decode_value(value) for name, value in payload["k"].items()}
+        except (AttributeError, TypeError, ValueError):
+            raise InvalidCursor("The cursor is not valid.")
+
+    def _sign(self, key: dict, scope: str) -> str:
+        message = f"{scope}\n{to_json(key)}".encode()
+        digest = hmac.new(self.secret, message, hashlib.sha256).digest()
+
+        return base64.urlsafe_b64encode(digest[:16]).decode().rstrip("=")
+
+
+def _encode_value(value: dict) -> dict:
+    # Key attributes are always a string, number or binary; binary is not valid json
+    ((tag, data),) = value.items()
+    if tag == "B":
+        return {"B": base64.b64encode(data).decode()}
+
+    return {tag: data}
+
+
+def _decode_value(value: dict) -> dict:
+    ((tag, data),) = value.items()
+    if tag == "B":
+        return {"B": base64.b64decode(data, validate=True)}
+    if tag not in ("S", "N") or not isinstance(data, str):
+        raise ValueError(f"Unsupported key type {tag}")
+
+    return {tag: data}
@@ -0,0 +1,164 @@
+"""
+DynamoDB export and import
+==========================
+"""
+
+import gzip
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator
+
+if "DEBUG_INQDO_TOOLS" in os.environ.keys():  # pragma: no cover
+    from dynamodb.batch_writer import BatchWriter
+    from dynamodb.rate_limiter import READ, CapacityRateLimiter, limited_call
+    from dynamodb.utils import from_json_item, rate_limited, to_json_item
+    from utils.json import Json
+else:
+    from inqdo_tools.dynamodb.batch_writer import BatchWriter
+    from inqdo_tools.dynamodb.rate_limiter import (
+        READ,
+        CapacityRateLimiter,
+        limited_call,
+    )
+    from inqdo_tools.dynamodb.utils import from_json_item, rate_limited, to_json_item
+    from inqdo_tools.utils.json import Json
+
+
+def export_table(
+    client,
+    table_name: str,
+    path: str,
+    total_segments: int = 4,
+    page_size: int = None,
+    rate_limiter: CapacityRateLimiter = None,
+) -> int:
+    """
+    Streams all items of a table to a gzip compressed JSON Lines file.
+
+    The table is read with a parallel segmented scan and every page is written as soon as it
+    arrives, so memory use does not grow with the table size. Every line holds one item in the
+    typed DynamoDB JSON format with base64 encoded binary values, the same format as the
+    DynamoDB export to S3::
+
+        {"Item": {"movieName": {"S": "The Dark Knight"}, "year": {"N": "2008"}}}
+
+    :param client: A low-level DynamoDB client.
+    :type client: :class:`botocore.client.BaseClient`
+
+    :param table_name: The name of the table to export.
+    :type table_name: str
+
+    :param path: The path of the file to write, for example ``movies.jsonl.gz``.
+    :type path: str
+
+    :param total_segments: An optional number of segments that are scanned in parallel, defaults to 4.
+    :type total_segments: int, optional
+
+    :param page_size: An optional maximum number of items read per scan request.
+    :type page_size: int, optional
+
+    :param rate_limiter: An optional limiter that keeps the scan within the capacity of the table.
+    :type rate_limiter: :class:`CapacityRateLimiter`, optional
+
+    :return: The number of exported items.
+    :rtype: int
+    """
+    lock = threading.Lock()
+
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+
+        def export_segment(segment: int) -> int:
+            count = 0
+            request = {
+                "TableName": table_name,
+                "Segment": segment,
+                "TotalSegments": total_segments,
+            }
+            if page_size:
+                request["Limit"] = page_size
+
+            while True:
+                response = limited_call(client.scan, READ, rate_limiter, **request)
+                lines = "".join(
+                    Json.compact({"Item": to_json_item(item)}) + "\n"
+                    for item in response["Items"]
+                )
+
+                with lock:
+                    f.write(lines)
+                count += len(response["Items"])
+
+                if "LastEvaluatedKey" not in response:
+                    return count
+                request["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+        with ThreadPoolExecutor(max_workers=total_segments) as executor:
+            return sum(executor.map(export_segment, range(total_segments)))
+
+
+def read_export(path: str) -> Iterator[dict]:
+    """Lazily reads the serialized items of a file written by :func:`export_table`.
+
+    :rtype: Iterator[dict]
+    """
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield from_json_item(json.loads(line)["Item"])
+
+
+def import_table(
+    client,
+    table_name: str,
+    path: str,
+    max_workers: int = 4,
+    max_retries: int = 8,
+    max_items_per_second: float = None,
+    rate_limiter: CapacityRateLimiter = None,
+) -> dict:
+    """
+    Writes all items of a file written by :func:`export_table` to a table.
+
+    The file is read lazily and fed to a :class:`BatchWriter`, optionally limited to
+    :class:`max_items_per_second` to leave capacity of the table for other work.
+
+    :param client: A low-level DynamoDB client.
+    :type client: :class:`botocore.client.BaseClient`
+
+    :param table_name: The name of the table to import into.
+    :type table_name: str
+
+    :param path: The path of the file to read.
+    :type path: str
+
+    :param max_workers: An optional number of parallel writers, defaults to 4.
+    :type max_workers: int, optional
+
+    :param max_retries: An optional number of retries for unprocessed and throttled items, defaults to 8.
+    :type max_retries: int, optional
+
+    :param max_items_per_second: An optional maximum write rate.
+    :type max_items_per_second: float, optional
+
+    :param rate_limiter: An optional limiter that keeps the writes within the capacity of the table.
+    :type rate_limiter: :class:`CapacityRateLimiter`, optional
+
+    :return: The result of :meth:`BatchWriter.write`, with serialized items under ``Failed``.
+    :rtype: dict
+    """
+    writer = BatchWriter(
+        client=client,
+        table_name=table_name,
+        serialize=lambda item: item,
+        max_workers=max_workers,
+        max_retries=max_retries,
+        rate_limiter=rate_limiter,
+    )
+    items = read_export(path)
+
+    if max_items_per_second:
+        items = rate_limited(items, max_items_per_second)
+
+    return writer.put_items(items)
@@ -0,0 +1,172 @@
+"""
+DynamoDB fan-out
+================
+"""
+
+import heapq
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from typing import Callable, Iterable, Iterator, List
+
+# Number of pages that are buffered per source, so readers wait for a slow consumer
+PAGES_PER_SOURCE = 2
+
+# Seconds between checks for a stopped fan-out while a reader waits for room in the queue
+POLL_INTERVAL = 0.1
+
+# Marks the end of the pages of a source
+_DONE = object()
+
+
+class _Failure(object):
+    def __init__(self, exception: BaseException):
+        self.exception = exception
+
+
+def fan_out(
+    sources: List[Callable[[], Iterable[list]]],
+    max_workers: int = 8,
+    timeout: float = None,
+    key: Callable = None,
+    reverse: bool = False,
+) -> Iterator[dict]:
+    """
+    Reads several paginated sources on a bounded thread pool and streams their items.
+
+    Every source is a function without arguments that returns an iterable of pages (lists of items),
+    for example a partial :meth:`DynamoDBClient.iter_query` with ``pages=True``. Pages are yielded as
+    soon as they arrive. With a :class:`key` the sources must already be sorted on that key, and the
+    items are merged into one sorted stream with a k-way merge (:func:`heapq.merge`).
+
+    Only a few pages per source are buffered. When the caller consumes the items slower than the
+    sources are read, the readers wait, so memory use stays flat however large the sources are.
+    Sorted merges read every source one page ahead, so they never wait for a source that is not read.
+
+    When the overall :class:`timeout` passes, or the caller stops iterating, the remaining sources
+    are cancelled and the running ones stop after their current page.
+
+    :param sources: The functions that return the pages of each source.
+    :type sources: list
+
+    :param max_workers: An optional number of sources that are read at the same time, defaults to 8.
+    :type max_workers: int, optional
+
+    :param timeout: An optional number of seconds after which a :class:`TimeoutError` is raised.
+    :type timeout: float, optional
+
+    :param key: An optional function that returns the sort key of an item, to merge the sources in order.
+    :type key: Callable, optional
+
+    :param reverse: The sources are sorted in descending order, defaults to False.
+    :type reverse: bool, optional
+
+    :rtype: Iterator[dict]
+    """
+    deadline = time.monotonic() + timeout if timeout is not None else None
+    stop = threading.Event()
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    futures, streams = [], []
+
+    try:
+        if key:
+            streams = [_read_ahead(source, executor, deadline) for source in sources]
+            yield from heapq.merge(*streams, key=key, reverse=reverse)
+        elif sources:
+            pages = queue.Queue(
+                maxsize=PAGES_PER_SOURCE * min(max_workers, len(sources))
+            )
+            futures = [
+                executor.submit(_read, source, pages, stop, deadline)
+                for source in sources
+            ]
+            yield from _drain(pages, len(sources), deadline)
+    finally:
+        stop.set()
+        for future in futures:
+            future.cancel()
+        for stream in streams:
+            stream.close()
+        executor.shutdown(wait=False)
+
+
+def _read(
+    source: Callable, pages: queue.Queue, stop: threading.Event, deadline: float = None
+):
+    try:
+        for page in source():
+            if not _put(pages, page, stop) or (
+                deadline is not None and time.monotonic() > deadline
+            ):
+                break
+    except BaseException as e:
+        _put(pages, _Failure(e), stop)
+    finally:
+        _put(pages, _DONE, stop)
+
+
+def _put(pages: queue.Queue, page, stop: threading.Event) -> bool:
+    # Waits for room in the queue, but gives up when the fan-out is stopped
+    while not stop.is_set():
+        try:
+            pages.put(page, timeout=POLL_INTERVAL)
+            return True
+        except queue.Full:
+            continue
+
+    return False
+
+
+def _drain(pages: queue.Queue, sources: int, deadline: float = None) -> Iterator[dict]:
+    while sources:
+        try:
+            if deadline is None:
+                page = pages.get()
+            else:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise queue.Empty
+                page = pages.get(timeout=remaining)
+        except queue.Empty:
+            raise TimeoutError("The fan-out did not finish before the deadline.")
+
+        if page is _DONE:
+            sources -= 1
+        elif isinstance(page, _Failure):
+            raise page.exception
+        else:
+            yield from page
+
+
+def _read_ahead(
+    source: Callable, executor: ThreadPoolExecutor, deadline: float = None
+) -> Iterator[dict]:
+    # Reads the next page of the source on the pool while the items of the current page are consumed
+    pages = []
+
+    def next_page():
+        if not pages:
+            pages.append(iter(source()))
+        return next(pages[0], _DONE)
+
+    future = executor.submit(next_page)
+    try:
+        while True:
+            page = _result(future, deadline)
+            if page is _DONE:
+                return
+            future = executor.submit(next_page)
+            yield from page
+    finally:
+        future.cancel()
+
+
+def _result(future: Future, deadline: float = None):
+    try:
+        return future.result(
+            timeout=None if deadline is None else max(deadline - time.monotonic(), 0)
+        )
+    except FuturesTimeoutError:
+        raise TimeoutError("The fan-out did not finish before the deadline.")
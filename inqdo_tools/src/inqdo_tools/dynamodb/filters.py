@@ -0,0 +1,133 @@
+"""
+DynamoDB filters
+================
+"""
+
+from collections import abc as collections_abc
+
+from boto3.dynamodb.conditions import Attr, ConditionBase
+
+# Attribute types that can be checked with the "type" lookup
+ATTRIBUTE_TYPES = ("S", "SS", "N", "NS", "B", "BS", "BOOL", "NULL", "L", "M")
+
+# Separator between the attribute (path) and the lookup
+SEPARATOR = "__"
+
+
+def _between(attribute: Attr, value) -> ConditionBase:
+    if not isinstance(value, (list, tuple)) or len(value) != 2:
+        raise TypeError("between expects a (low, high) tuple.")
+    return attribute.between(*value)
+
+
+def _is_in(attribute: Attr, value) -> ConditionBase:
+    if isinstance(value, (str, bytes)) or not isinstance(
+        value, collections_abc.Iterable
+    ):
+        raise TypeError("in expects a list of values.")
+    values = list(value)
+    if not values or len(values) > 100:
+        raise ValueError("in expects between 1 and 100 values.")
+    return attribute.is_in(values)
+
+
+def _begins_with(attribute: Attr, value) -> ConditionBase:
+    if not isinstance(value, (str, bytes)):
+        raise TypeError("begins_with expects a string or bytes.")
+    return attribute.begins_with(value)
+
+
+def _exists(attribute: Attr, value) -> ConditionBase:
+    if not isinstance(value, bool):
+        raise TypeError("exists expects True or False.")
+    return attribute.exists() if value else attribute.not_exists()
+
+
+def _attribute_type(attribute: Attr, value) -> ConditionBase:
+    if value not in ATTRIBUTE_TYPES:
+        raise ValueError(f"type expects one of {', '.join(ATTRIBUTE_TYPES)}.")
+    return attribute.attribute_type(value)
+
+
+LOOKUPS = {
+    "eq": lambda attribute, value: attribute.eq(value),
+    "ne": lambda attribute, value: attribute.ne(value),
+    "lt": lambda attribute, value: attribute.lt(value),
+    "lte": lambda attribute, value: attribute.lte(value),
+    "gt": lambda attribute, value: attribute.gt(value),
+    "gte": lambda attribute, value: attribute.gte(value),
+    "between": _between,
+    "in": _is_in,
+    "begins_with": _begins_with,
+    "contains": lambda attribute, value: attribute.contains(value),
+    "exists": _exists,
+    "type": _attribute_type,
+}
+
+
+def where(conditions: dict = None, **lookups) -> ConditionBase:
+    """
+    Builds a filter expression from lookups, which are all combined with AND. A lookup is an attribute
+    (path) and an optional operator separated by a double underscore, for example::
+
+        where(genre="drama", year__between=(2000, 2010), title__begins_with="The", rating__exists=True)
+
+    The lookups are ``eq`` (default), ``ne``, ``lt``, ``lte``, ``gt``, ``gte``, ``between``, ``in``,
+    ``begins_with``, ``contains``, ``exists`` and ``type``. Their values are checked when the filter
+    is built, instead of failing on the request. Attribute names that are not valid python names
+    are passed in the :class:`conditions` dict instead, for example ``where({"address.city": "Utrecht"})``.
+    Nested paths use dots. A keyword with an unknown lookup raises a ValueError, while in the
+    :class:`conditions` dict it is taken as an attribute name that contains a double underscore.
+
+    The result is a :class:`boto3.dynamodb.conditions.ConditionBase`, so it can be combined with
+    other conditions with ``&``, ``|`` and ``~``. The reads of :class:`DynamoDBClient` also accept
+    the lookups as a dict for their ``filter_expression``.
+
+    :param conditions: Optional lookups as a dict.
+    :type conditions: dict, optional
+
+    :raises TypeError: When the value of a lookup has the wrong type.
+    :raises ValueError: When no lookups are given, or a keyword has an unknown lookup.
+
+    :rtype: :class:`boto3.dynamodb.conditions.ConditionBase`
+    """
+    filter_expression = None
+
+    parsed = [(*_split(lookup), value) for lookup, value in (conditions or {}).items()]
+    parsed += [
+        (*_split(lookup, strict=True), value) for lookup, value in lookups.items()
+    ]
+
+    for name, operator, value in parsed:
+        condition = LOOKUPS[operator](Attr(name), value)
+        filter_expression = (
+            condition if filter_expression is None else filter_expression & condition
+        )
+
+    if filter_expression is None:
+        raise ValueError("where expects at least one lookup.")
+
+    return filter_expression
+
+
+def to_condition(filter_expression) -> ConditionBase:
+    """Returns the condition of a ``filter_expression``, which is either a condition or a dict for :func:`where`.
+
+    :rtype: :class:`boto3.dynamodb.conditions.ConditionBase`
+    """
+    if isinstance(filter_expression, dict):
+        return where(filter_expression)
+
+    return filter_expression
+
+
+def _split(lookup: str, strict: bool = False) -> tuple:
+    name, separator, operator = lookup.rpartition(SEPARATOR)
+    if separator and operator in LOOKUPS:
+        return name, operator
+    if separator and strict:
+        raise ValueError(
+            f"Unknown lookup '{operator}' in '{lookup}', expected one of {', '.join(LOOKUPS)}."
+        )
+
+    return lookup, "eq"
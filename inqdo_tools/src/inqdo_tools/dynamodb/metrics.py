@@ -0,0 +1,316 @@
+"""
+DynamoDB metrics
+================
+"""
+
+import abc
+import functools
+import logging
+import os
+import threading
+import time
+from typing import Callable, Union
+
+from botocore.exceptions import ClientError
+
+if "DEBUG_INQDO_TOOLS" in os.environ.keys():  # pragma: no cover
+    from dynamodb.rate_limiter import consumed_units
+    from utils.json import Json
+else:
+    from inqdo_tools.dynamodb.rate_limiter import consumed_units
+    from inqdo_tools.utils.json import Json
+
+# Upper bounds of the latency buckets, in milliseconds
+LATENCY_BUCKETS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+class MetricsSink(abc.ABC):
+    """
+    The MetricsSink class receives one metric for every request that a :class:`DynamoDBClient` makes.
+
+    Subclasses implement :meth:`record`, for example to send the metrics to CloudWatch or to a log.
+    A metric is a dict with the ``Table`` and ``Operation`` (for example ``query``), the ``Latency``
+    in milliseconds, the ``ConsumedCapacity`` in capacity units, the ``Count`` of returned or written
+    items, the ``ScannedCount`` of evaluated items, the ``Bytes`` of the response and, for failed
+    requests, the error code under ``Error``. It is called from the worker threads of parallel
+    operations, so it should be thread-safe.
+    """
+
+    @abc.abstractmethod
+    def record(self, metric: dict):
+        """Records the metric of a single request."""
+
+
+class _Histogram(object):
+    # Fixed latency buckets, so recording is cheap and percentiles are approximations
+    def __init__(self, buckets: tuple):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+
+    def add(self, value: float):
+        index = next(
+            (i for i, bound in enumerate(self.buckets) if value <= bound),
+            len(self.buckets),
+        )
+        self.counts[index] += 1
+        self.total += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def percentile(self, percentile: float) -> Union[float, None]:
+        if not self.total:
+            return None
+
+        rank = percentile / 100 * self.total
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if count and seen >= rank:
+                # The upper bound of the bucket, or the slowest request for the last bucket
+                return (
+                    float(min(self.buckets[index], self.max))
+                    if index < len(self.buckets)
+                    else self.max
+                )
+
+        return self.max
+
+    def to_dict(self) -> dict:
+        labels = [str(bound) for bound in self.buckets] + ["+Inf"]
+
+        return {
+            "Avg": round(self.sum / self.total, 3) if self.total else None,
+            "Min": self.min,
+            "Max": self.max,
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p99": self.percentile(99),
+            "Buckets": dict(zip(labels, self.counts)),
+        }
+
+
+class _OperationStats(object):
+    def __init__(self, buckets: tuple):
+        self.calls = 0
+        self.errors = 0
+        self.consumed_capacity = 0.0
+        self.count = 0
+        self.scanned_count = 0
+        self.bytes = 0
+        self.latency = _Histogram(buckets)
+
+    def add(self, metric: dict):
+        self.calls += 1
+        self.errors += 1 if metric.get("Error") else 0
+        self.consumed_capacity += metric.get("ConsumedCapacity", 0)
+        self.count += metric.get("Count", 0)
+        self.scanned_count += metric.get("ScannedCount", 0)
+        self.bytes += metric.get("Bytes", 0)
+        self.latency.add(metric["Latency"])
+
+    def to_dict(self) -> dict:
+        return {
+            "Calls": self.calls,
+            "Errors": self.errors,
+            "ConsumedCapacity": round(self.consumed_capacity, 3),
+            "Count": self.count,
+            "ScannedCount": self.scanned_count,
+            "Bytes": self.bytes,
+            "Latency": self.latency.to_dict(),
+        }
+
+
+class InMemoryMetricsSink(MetricsSink):
+    """
+    The InMemoryMetricsSink class aggregates the metrics per table and operation in memory.
+
+    Every operation keeps totals of the calls, errors, consumed capacity, items and bytes, and a
+    histogram of its latency from which the average and (approximate) percentiles are taken.
+    Nothing is sent anywhere until :meth:`dump` is called, which makes it cheap enough to leave on.
+    In a Lambda function the metrics of an invocation are logged by decorating the handler::
+
+        @metrics_sink.dump_after
+        def handler(event, context):
+            DynamoDBClient(table_name="movies-prd", metrics=True).read_all()
+
+    :param buckets: Optional upper bounds of the latency buckets in milliseconds.
+    :type buckets: tuple, optional
+    """
+
+    def __init__(self, buckets: tuple = LATENCY_BUCKETS):
+        """Constructor method"""
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._tables = {}
+
+    def record(self, metric: dict):
+        """Adds the metric of a single request to the totals of its table and operation."""
+        with self._lock:
+            operations = self._tables.setdefault(metric["Table"], {})
+            if metric["Operation"] not in operations:
+                operations[metric["Operation"]] = _OperationStats(self.buckets)
+            operations[metric["Operation"]].add(metric)
+
+    def snapshot(self) -> dict:
+        """Returns the aggregated metrics per table and operation.
+
+        :rtype: dict
+        """
+        with self._lock:
+            return {
+                table: {
+                    operation: stats.to_dict()
+                    for operation, stats in operations.items()
+                }
+                for table, operations in self._tables.items()
+            }
+
+    def reset(self):
+        """Removes all aggregated metrics."""
+        with self._lock:
+            self._tables = {}
+
+    def dump(self, reset: bool = True, log: bool = True) -> dict:
+        """
+        Returns the aggregated metrics and logs them as a single line of json with the
+        ``inqdo_tools.dynamodb.metrics`` logger, which CloudWatch Logs keeps as one event.
+
+        :param reset: Start over after the dump, so every invocation reports its own metrics, defaults to True.
+        :type reset: bool, optional
+
+        :param log: Log the metrics, defaults to True.
+        :type log: bool, optional
+
+        :rtype: dict
+        """
+        with self._lock:
+            tables, self._tables = self._tables, ({} if reset else self._tables)
+
+        metrics = {
+            table: {
+                operation: stats.to_dict() for operation, stats in operations.items()
+            }
+            for table, operations in tables.items()
+        }
+
+        if log and metrics:
+            logger.info(Json.compact({"DynamoDBMetrics": metrics}))
+
+        return metrics
+
+    def dump_after(self, handler: Callable) -> Callable:
+        """Decorates a Lambda handler, so the metrics are dumped at the end of every invocation.
+
+        :rtype: Callable
+        """
+
+        @functools.wraps(handler)
+        def wrapper(*args, **kwargs):
+            try:
+                return handler(*args, **kwargs)
+            finally:
+                self.dump()
+
+        return wrapper
+
+
+# The default sink, shared by all clients that are created with metrics=True
+metrics_sink = InMemoryMetricsSink()
+
+
+def measured(
+    operation: Callable, name: str, table_name: str, sink: Union[MetricsSink, None]
+) -> Callable:
+    """
+    Wraps a DynamoDB operation, so every call is made with ``ReturnConsumedCapacity`` and is recorded
+    in the sink. Without a sink the operation is returned as it is.
+
+    :param operation: The operation of a low-level client or table resource, for example ``client.query``.
+    :type operation: Callable
+
+    :param name: The name of the operation in the metrics, for example "query".
+    :type name: str
+
+    :param table_name: The name of the table in the metrics.
+    :type table_name: str
+
+    :param sink: An optional sink to record the metrics in.
+    :type sink: :class:`MetricsSink`, optional
+
+    :rtype: Callable
+    """
+    if sink is None:
+        return operation
+
+    def call(**request) -> dict:
+        request = {"ReturnConsumedCapacity": "TOTAL", **request}
+        started_at = time.perf_counter()
+
+        try:
+            response = operation(**request)
+        except ClientError as e:
+            sink.record(
+                {
+                    "Table": table_name,
+                    "Operation": name,
+                    "Latency": _milliseconds(started_at),
+                    "Error": e.response["Error"]["Code"],
+                }
+            )
+            raise
+
+        count = _item_count(name, request, response)
+        sink.record(
+            {
+                "Table": table_name,
+                "Operation": name,
+                "Latency": _milliseconds(started_at),
+                "ConsumedCapacity": consumed_units(response),
+                "Count": count,
+                "ScannedCount": response.get("ScannedCount", count),
+                "Bytes": _response_bytes(response),
+            }
+        )
+
+        return response
+
+    return call
+
+
+def _milliseconds(started_at: float) -> float:
+    return round((time.perf_counter() - started_at) * 1000, 3)
+
+
+def _item_count(name: str, request: dict, response: dict) -> int:
+    if "Count" in response:
+        return response["Count"]
+    if "Responses" in response:
+        return sum(len(items) for items in response["Responses"].values())
+    if "RequestItems" in request:
+        requested = sum(len(requests) for requests in request["RequestItems"].values())
+        unprocessed = sum(
+            len(requests)
+            for requests in (response.get("UnprocessedItems") or {}).values()
+        )
+        return requested - unprocessed
+    if name == "get_item":
+        return int("Item" in response)
+
+    return 1
+
+
+def _response_bytes(response: dict) -> int:
+    headers = response.get("ResponseMetadata", {}).get("HTTPHeaders", {})
+
+    try:
+        return int(headers.get("content-length", 0))
+    except ValueError:
+        return 0
@@ -0,0 +1,233 @@
+"""
+DynamoDB rate limiter
+=====================
+"""
+
+import threading
+import time
+from typing import Callable, Union
+
+from botocore.exceptions import ClientError
+
+# Errors that mean the table has no capacity left
+THROTTLING_ERRORS = (
+    "ProvisionedThroughputExceededException",
+    "RequestLimitExceeded",
+    "ThrottlingException",
+)
+
+READ = "read"
+WRITE = "write"
+
+
+class _Budget(object):
+    # Token bucket of capacity units, of which the rate is adjusted with AIMD
+    def __init__(
+        self, ceiling: float, increase: float, decrease: float, cooldown: float
+    ):
+        self.ceiling = ceiling
+        self.floor = max(1.0, ceiling * 0.05)
+        self.rate = ceiling
+        self.tokens = ceiling
+        self.increase = increase
+        self.decrease = decrease
+        self.cooldown = cooldown
+        self.updated_at = time.monotonic()
+        self.decreased_at = 0.0
+        self.consumed = 0.0
+        self.throttles = 0
+
+    def refill(self, now: float):
+        elapsed = now - self.updated_at
+        self.updated_at = now
+
+        # Additive increase: every second without throttling adds a fixed part of the ceiling
+        self.rate = min(
+            self.ceiling, self.rate + self.ceiling * self.increase * elapsed
+        )
+        self.tokens = min(self.rate, self.tokens + self.rate * elapsed)
+
+    def throttled(self, now: float):
+        self.refill(now)
+        self.throttles += 1
+
+        # Concurrent requests are throttled at the same time, which should count as one signal
+        if now - self.decreased_at >= self.cooldown:
+            self.rate = max(self.floor, self.rate * self.decrease)
+            self.tokens = min(self.tokens, 0.0)
+            self.decreased_at = now
+
+
+class CapacityRateLimiter(object):
+    """
+    The CapacityRateLimiter class keeps bulk operations within a share of the capacity of a table.
+
+    Every request waits until enough read or write capacity units are available, is made with
+    ``ReturnConsumedCapacity`` and then pays for the units it actually consumed. The allowed rate
+    starts at :class:`target` times the provisioned capacity of the table. It is halved when DynamoDB
+    throttles a request or leaves items unprocessed, and grows back step by step while requests
+    succeed (additive increase, multiplicative decrease). Tables in on-demand mode have no
+    provisioned capacity, for them the rate is not limited.
+
+    One limiter is shared by all threads of the scans, queries and batch writers of a client.
+
+    :param read_capacity: The provisioned read capacity units of the table, 0 for unlimited.
+    :type read_capacity: float
+
+    :param write_capacity: The provisioned write capacity units of the table, 0 for unlimited.
+    :type write_capacity: float
+
+    :param target: An optional part of the capacity to use, defaults to 0.8.
+    :type target: float, optional
+
+    :param increase: An optional part of the target rate that is added back per second, defaults to 0.05.
+    :type increase: float, optional
+
+    :param decrease: An optional factor for the rate after throttling, defaults to 0.5.
+    :type decrease: float, optional
+
+    :param cooldown: An optional number of seconds in which throttles only lower the rate once, defaults to 1.
+    :type cooldown: float, optional
+    """
+
+    def __init__(
+        self,
+        read_capacity: float,
+        write_capacity: float,
+        target: float = 0.8,
+        increase: float = 0.05,
+        decrease: float = 0.5,
+        cooldown: float = 1.0,
+    ):
+        """Constructor method"""
+        if not 0 < target <= 1:
+            raise ValueError("target should be more than 0 and at most 1.")
+
+        self.target = target
+        self._lock = threading.Lock()
+        self._budgets = {
+            kind: _Budget(capacity * target, increase, decrease, cooldown)
+            if capacity
+            else None
+            for kind, capacity in ((READ, read_capacity), (WRITE, write_capacity))
+        }
+
+    @classmethod
+    def from_table(cls, table: dict, **kwargs) -> "CapacityRateLimiter":
+        """Returns a limiter for the ``Table`` of a ``describe_table`` response.
+
+        :rtype: :class:`CapacityRateLimiter`
+        """
+        on_demand = (
+            table.get("BillingModeSummary", {}).get("BillingMode") == "PAY_PER_REQUEST"
+        )
+        throughput = {} if on_demand else table.get("ProvisionedThroughput", {})
+
+        return cls(
+            read_capacity=throughput.get("ReadCapacityUnits", 0),
+            write_capacity=throughput.get("WriteCapacityUnits", 0),
+            **kwargs,
+        )
+
+    def acquire(self, kind: str):
+        """Waits until there are :class:`kind` ("read" or "write") capacity units available."""
+        budget = self._budgets[kind]
+        if budget is None:
+            return
+
+        while True:
+            with self._lock:
+                budget.refill(time.monotonic())
+                if budget.tokens > 0:
+                    return
+                wait = -budget.tokens / budget.rate + 0.001
+
+            time.sleep(wait)
+
+    def consume(self, kind: str, units: float):
+        """Pays for the capacity units that a request consumed."""
+        budget = self._budgets[kind]
+        if budget is None:
+            return
+
+        with self._lock:
+            budget.tokens -= units
+            budget.consumed += units
+
+    def throttled(self, kind: str):
+        """Lowers the rate after DynamoDB throttled a request."""
+        budget = self._budgets[kind]
+        if budget is None:
+            return
+
+        with self._lock:
+            budget.throttled(time.monotonic())
+
+    def call(self, operation: Callable, kind: str, **request) -> dict:
+        """
+        Makes a request within the budget, for example ``call(client.scan, "read", TableName=...)``.
+        Throttling errors lower the rate and are raised again, to be retried by the caller.
+
+        :rtype: dict
+        """
+        self.acquire(kind)
+
+        try:
+            response = operation(**{"ReturnConsumedCapacity": "TOTAL", **request})
+        except ClientError as e:
+            if e.response["Error"]["Code"] in THROTTLING_ERRORS:
+                self.throttled(kind)
+            raise
+
+        self.consume(kind, consumed_units(response))
+
+        if response.get("UnprocessedItems") or response.get("UnprocessedKeys"):
+            self.throttled(kind)
+
+        return response
+
+    def stats(self) -> dict:
+        """Returns the current rate, ceiling, consumed units and throttles per kind.
+
+        :rtype: dict
+        """
+        with self._lock:
+            return {
+                kind: None
+                if budget is None
+                else {
+                    "rate": round(budget.rate, 3),
+                    "ceiling": budget.ceiling,
+                    "consumed": budget.consumed,
+                    "throttles": budget.throttles,
+                }
+                for kind, budget in self._budgets.items()
+            }
+
+
+def consumed_units(response: dict) -> float:
+    """Returns the total ``CapacityUnits`` of the ``ConsumedCapacity`` of a response.
+
+    :rtype: float
+    """
+    consumed = response.get("ConsumedCapacity") or []
+    if isinstance(consumed, dict):
+        consumed = [consumed]
+
+    return float(sum(entry.get("CapacityUnits", 0) for entry in consumed))
+
+
+def limited_call(
+    operation: Callable,
+    kind: str,
+    rate_limiter: Union[CapacityRateLimiter, None],
+    **request
+) -> dict:
+    """Makes a request through the rate limiter when there is one, see :meth:`CapacityRateLimiter.call`.
+
+    :rtype: dict
+    """
+    if rate_limiter is None:
+        return operation(**request)
+
+    return rate_limiter.call(operation, kind, **request)
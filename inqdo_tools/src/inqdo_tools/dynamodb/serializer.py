@@ -0,0 +1,262 @@
+"""
+DynamoDB serializer
+===================
+"""
+
+from collections import abc as collections_abc
+from decimal import Decimal
+from typing import Callable, List
+
+from boto3.dynamodb.types import (
+    DYNAMODB_CONTEXT,
+    Binary,
+    TypeDeserializer,
+    TypeSerializer,
+)
+
+_NONE_TYPE = type(None)
+
+# Largest integer that fits in a DynamoDB number without going through a Decimal context
+_MAX_EXACT_INT = 10**38
+
+
+class Serializer(object):
+    """
+    The Serializer class converts python values into DynamoDB attribute values.
+
+    It produces the same output as :class:`boto3.dynamodb.types.TypeSerializer`, but resolves the
+    conversion function once per python type and caches it, instead of running the whole chain of
+    type checks for every value. One instance can be shared by all threads.
+    """
+
+    def __init__(self):
+        """Constructor method"""
+        self._fallback = TypeSerializer()
+        self._dispatch = {
+            _NONE_TYPE: self._serialize_null,
+            bool: self._serialize_bool,
+            str: self._serialize_s,
+            int: self._serialize_int,
+            Decimal: self._serialize_n,
+            bytes: self._serialize_b,
+            bytearray: self._serialize_b,
+            Binary: self._serialize_binary,
+            dict: self._serialize_m,
+            list: self._serialize_l,
+            tuple: self._serialize_l,
+            set: self._serialize_set,
+            frozenset: self._serialize_set,
+        }
+
+    def serialize(self, value) -> dict:
+        """Serializes a single python value, for example ``"a"`` into ``{"S": "a"}``.
+
+        :rtype: dict
+        """
+        try:
+            return self._dispatch[type(value)](value)
+        except KeyError:
+            return self._dispatch_for(type(value))(value)
+
+    def serialize_item(self, item: dict) -> dict:
+        """Serializes every attribute of an item.
+
+        :rtype: dict
+        """
+        serialize = self.serialize
+        return {k: serialize(v) for k, v in item.items()}
+
+    def serialize_items(self, items: List[dict]) -> List[dict]:
+        """Serializes a list of items.
+
+        :rtype: list
+        """
+        serialize_item = self.serialize_item
+        return [serialize_item(item) for item in items]
+
+    def _dispatch_for(self, value_type: type) -> Callable:
+        # Subclasses (and other mappings or sets) are resolved once and then cached
+        if issubclass(value_type, float):
+            raise TypeError("Float types are not supported. Use Decimal types instead.")
+
+        for base, function in list(self._dispatch.items()):
+            if base is not _NONE_TYPE and issubclass(value_type, base):
+                break
+        else:
+            if issubclass(value_type, collections_abc.Mapping):
+                function = self._serialize_m
+            elif issubclass(value_type, collections_abc.Set):
+                function = self._serialize_set
+            else:
+                function = self._fallback.serialize
+
+        self._dispatch[value_type] = function
+        return function
+
+    @staticmethod
+    def _serialize_null(value) -> dict:
+        return {"NULL": True}
+
+    @staticmethod
+    def _serialize_bool(value: bool) -> dict:
+        return {"BOOL": value}
+
+    @staticmethod
+    def _serialize_s(value: str) -> dict:
+        return {"S": value}
+
+    @staticmethod
+    def _number(value) -> str:
+        if type(value) is int and -_MAX_EXACT_INT < value < _MAX_EXACT_INT:
+            return str(value)
+
+        number = str(DYNAMODB_CONTEXT.create_decimal(value))
+        if number in ("Infinity", "NaN"):
+            raise TypeError("Infinity and NaN not supported")
+
+        return number
+
+    def _serialize_int(self, value: int) -> dict:
+        return {"N": self._number(value)}
+
+    def _serialize_n(self, value) -> dict:
+        return {"N": self._number(value)}
+
+    @staticmethod
+    def _serialize_b(value) -> dict:
+        return {"B": value}
+
+    @staticmethod
+    def _serialize_binary(value: Binary) -> dict:
+        return {"B": value.value}
+
+    def _serialize_m(self, value) -> dict:
+        serialize = self.serialize
+        return {"M": {k: serialize(v) for k, v in value.items()}}
+
+    def _serialize_l(self, value) -> dict:
+        serialize = self.serialize
+        return {"L": [serialize(v) for v in value]}
+
+    def _serialize_set(self, value) -> dict:
+        # Same type resolution as boto3, an empty set becomes a number set
+        if all(
+            isinstance(v, (int, Decimal)) and not isinstance(v, bool) for v in value
+        ):
+            return {"NS": [self._number(v) for v in value]}
+        if all(isinstance(v, str) for v in value):
+            return {"SS": list(value)}
+        if all(isinstance(v, (Binary, bytearray, bytes)) for v in value):
+            return {"BS": [v.value if isinstance(v, Binary) else v for v in value]}
+
+        return self._fallback.serialize(value)
+
+
+class Deserializer(object):
+    """
+    The Deserializer class converts DynamoDB attribute values into python values.
+
+    It produces the same output as :class:`boto3.dynamodb.types.TypeDeserializer`, with one function
+    per DynamoDB type tag. Numbers are returned as ``Decimal`` by default, callers can opt in to
+    ``float`` or to ``int``/``float`` ("native") numbers instead.
+
+    :param numbers: How numbers are returned, one of "decimal", "float" or "native", defaults to "decimal".
+    :type numbers: str, optional
+    """
+
+    NUMBER_TYPES = ("decimal", "float", "native")
+
+    def __init__(self, numbers: str = "decimal"):
+        """Constructor method"""
+        if numbers not in self.NUMBER_TYPES:
+            raise ValueError(
+                f"numbers should be one of {', '.join(self.NUMBER_TYPES)}, not '{numbers}'."
+            )
+
+        self.numbers = numbers
+        self._number = {
+            "decimal": DYNAMODB_CONTEXT.create_decimal,
+            "float": float,
+            "native": _native_number,
+        }[numbers]
+        self._dispatch = {
+            "S": _identity,
+            "N": self._number,
+            "BOOL": _identity,
+            "NULL": _none,
+            "B": Binary,
+            "M": self._deserialize_m,
+            "L": self._deserialize_l,
+            "SS": set,
+            "NS": self._deserialize_ns,
+            "BS": self._deserialize_bs,
+        }
+        self._fallback = TypeDeserializer()
+
+    def deserialize(self, value: dict):
+        """Deserializes a single attribute value, for example ``{"S": "a"}`` into ``"a"``.
+
+        :rtype: Any
+        """
+        if not value:
+            # Raises the same error as boto3
+            return self._fallback.deserialize(value)
+
+        ((tag, data),) = value.items()
+
+        try:
+            function = self._dispatch[tag]
+        except KeyError:
+            raise TypeError(f"Dynamodb type {tag} is not supported")
+
+        return function(data)
+
+    def deserialize_item(self, item: dict) -> dict:
+        """Deserializes every attribute of an item.
+
+        :rtype: dict
+        """
+        deserialize = self.deserialize
+        return {k: deserialize(v) for k, v in item.items()}
+
+    def deserialize_items(self, items: List[dict]) -> List[dict]:
+        """Deserializes a list of items.
+
+        :rtype: list
+        """
+        deserialize_item = self.deserialize_item
+        return [deserialize_item(item) for item in items]
+
+    def _deserialize_m(self, value: dict) -> dict:
+        deserialize = self.deserialize
+        return {k: deserialize(v) for k, v in value.items()}
+
+    def _deserialize_l(self, value: list) -> list:
+        deserialize = self.deserialize
+        return [deserialize(v) for v in value]
+
+    def _deserialize_ns(self, value: list) -> set:
+        return set(map(self._number, value))
+
+    @staticmethod
+    def _deserialize_bs(value: list) -> set:
+        return set(map(Binary, value))
+
+
+def _identity(value):
+    return value
+
+
+def _none(value):
+    return None
+
+
+def _native_number(value: str):
+    if "." in value or "e" in value or "E" in value:
+        return float(value)
+
+    return int(value)
+
+
+serializer = Serializer()
+deserializer = Deserializer()
@@ -0,0 +1,299 @@
+"""
+DynamoDB table copy
+===================
+"""
+
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Union
+
+if "DEBUG_INQDO_TOOLS" in os.environ.keys():  # pragma: no cover
+    from dynamodb.batch_writer import BatchWriter
+    from dynamodb.cursor import Cursor
+    from dynamodb.rate_limiter import READ, CapacityRateLimiter, limited_call
+    from dynamodb.serializer import deserializer, serializer
+else:
+    from inqdo_tools.dynamodb.batch_writer import BatchWriter
+    from inqdo_tools.dynamodb.cursor import Cursor
+    from inqdo_tools.dynamodb.rate_limiter import (
+        READ,
+        CapacityRateLimiter,
+        limited_call,
+    )
+    from inqdo_tools.dynamodb.serializer import deserializer, serializer
+
+
+class TableCopy(object):
+    """
+    The TableCopy class copies all items of a table to another table, which can be in another
+    region or account.
+
+    The source table is read with a parallel segmented scan and every page is written with a
+    :class:`BatchWriter`. Items are copied in their serialized form, so they are only converted
+    when a :class:`transform` is given. The transform receives every item as a python dict and
+    returns the item to write, or None to skip it.
+
+    With a :class:`checkpoint_file` the ``LastEvaluatedKey`` of every segment is saved after its
+    pages are written. An interrupted copy that is started again with the same checkpoint file
+    continues where every segment stopped, instead of copying the whole table again. A page of
+    which items failed holds the checkpoint of its segment back, so the next run copies it again.
+
+    :param source_client: A low-level DynamoDB client for the source table.
+    :type source_client: :class:`botocore.client.BaseClient`
+
+    :param source_table: The name of the source table.
+    :type source_table: str
+
+    :param target_client: A low-level DynamoDB client for the target table.
+    :type target_client: :class:`botocore.client.BaseClient`
+
+    :param target_table: The name of the target table.
+    :type target_table: str
+
+    :param total_segments: An optional number of segments that are copied in parallel, defaults to 4.
+    :type total_segments: int, optional
+
+    :param transform: An optional function that is called with every item and returns the item to write.
+    :type transform: Callable, optional
+
+    :param checkpoint_file: An optional path of the file to save the progress in.
+    :type checkpoint_file: str, optional
+
+    :param checkpoint_interval: An optional minimum number of seconds between two saves of the
+        checkpoint file, defaults to 5.
+    :type checkpoint_interval: float, optional
+
+    :param page_size: An optional maximum number of items read per scan request.
+    :type page_size: int, optional
+
+    :param max_retries: An optional number of retries for unprocessed and throttled items, defaults to 8.
+    :type max_retries: int, optional
+
+    :param source_rate_limiter: An optional limiter that keeps the scan within the capacity of the source table.
+    :type source_rate_limiter: :class:`CapacityRateLimiter`, optional
+
+    :param target_rate_limiter: An optional limiter that keeps the writes within the capacity of the target table.
+    :type target_rate_limiter: :class:`CapacityRateLimiter`, optional
+    """
+
+    def __init__(
+        self,
+        source_client,
+        source_table: str,
+        target_client,
+        target_table: str,
+        total_segments: int = 4,
+        transform: Callable = None,
+        checkpoint_file: str = None,
+        checkpoint_interval: float = 5,
+        page_size: int = None,
+        max_retries: int = 8,
+        source_rate_limiter: CapacityRateLimiter = None,
+        target_rate_limiter: CapacityRateLimiter = None,
+    ):
+        """Constructor method"""
+        self.source_client = source_client
+        self.source_table = source_table
+        self.target_client = target_client
+        self.target_table = target_table
+        self.total_segments = total_segments
+        self.transform = transform
+        self.checkpoint_file = checkpoint_file
+        self.checkpoint_interval = checkpoint_interval
+        self.page_size = page_size
+        self.max_retries = max_retries
+        self.source_rate_limiter = source_rate_limiter
+        self.target_rate_limiter = target_rate_limiter
+
+        self._cursor = Cursor()
+        self._lock = threading.Lock()
+        self._segments = {}
+        self._saved_at = 0.0
+
+    def run(self) -> dict:
+        """
+        Copies the table, or the rest of it when a checkpoint file exists.
+
+        :return: The number of ``Scanned``, ``Copied``, ``Skipped`` and ``Failed`` items of this run,
+            the ``Failed`` items themselves under ``FailedItems``, the number of ``Seconds`` and
+            the throughput in ``ItemsPerSecond``.
+        :rtype: dict
+        """
+        self._segments = self._load_checkpoint()
+        resumed = any(
+            segment["Done"] or segment["LastEvaluatedKey"]
+            for segment in self._segments.values()
+        )
+
+        totals = {
+            "Scanned": 0,
+            "Copied": 0,
+            "Skipped": 0,
+            "Failed": 0,
+            "FailedItems": [],
+        }
+        started_at = time.monotonic()
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.total_segments) as executor:
+                futures = [
+                    executor.submit(self._copy_segment, segment, totals)
+                    for segment in range(self.total_segments)
+                    if not self._segments[segment]["Done"]
+                ]
+                for future in futures:
+                    future.result()
+        finally:
+            self._save_checkpoint(force=True)
+
+        seconds = time.monotonic() - started_at
+
+        return {
+            **totals,
+            "Resumed": resumed,
+            "Seconds": round(seconds, 3),
+            "ItemsPerSecond": round(totals["Copied"] / seconds, 1) if seconds else 0.0,
+        }
+
+    def _copy_segment(self, segment: int, totals: dict):
+        writer = BatchWriter(
+            client=self.target_client,
+            table_name=self.target_table,
+            serialize=_identity,
+            max_workers=2,
+            max_retries=self.max_retries,
+            rate_limiter=self.target_rate_limiter,
+        )
+
+        request = {
+            "TableName": self.source_table,
+            "Segment": segment,
+            "TotalSegments": self.total_segments,
+        }
+        if self.page_size:
+            request["Limit"] = self.page_size
+
+        scan = self.source_client.scan
+
+        last_evaluated_key = self._cursor.decode(
+            self._segments[segment]["LastEvaluatedKey"]
+        )
+        complete = True
+
+        while True:
+            if last_evaluated_key:
+                response = limited_call(
+                    scan,
+                    READ,
+                    self.source_rate_limiter,
+                    ExclusiveStartKey=last_evaluated_key,
+                    **request,
+                )
+            else:
+                response = limited_call(scan, READ, self.source_rate_limiter, **request)
+
+            items = self._transform(response["Items"])
+            result = writer.put_items(items)
+            last_evaluated_key = response.get("LastEvaluatedKey")
+
+            with self._lock:
+                totals["Scanned"] += len(response["Items"])
+                totals["Copied"] += result["Written"]
+                totals["Skipped"] += len(response["Items"]) - len(items)
+                totals["Failed"] += len(result["Failed"])
+                totals["FailedItems"].extend(
+                    {
+                        "Item": deserializer.deserialize_item(failed["Item"]),
+                        "Error": failed["Error"],
+                    }
+                    for failed in result["Failed"]
+                )
+                # The checkpoint stays before the first page with failed items, so they are copied on resume
+                complete = complete and not result["Failed"]
+                if complete:
+                    self._segments[segment] = {
+                        "LastEvaluatedKey": self._cursor.encode(last_evaluated_key),
+                        "Done": not last_evaluated_key,
+                    }
+
+            self._save_checkpoint()
+
+            if not last_evaluated_key:
+                return
+
+    def _transform(self, items: list) -> list:
+        if not self.transform:
+            return items
+
+        transformed = (
+            self.transform(deserializer.deserialize_item(item)) for item in items
+        )
+
+        return [
+            serializer.serialize_item(item) for item in transformed if item is not None
+        ]
+
+    def _load_checkpoint(self) -> dict:
+        segments = {
+            segment: {"LastEvaluatedKey": None, "Done": False}
+            for segment in range(self.total_segments)
+        }
+
+        if not self.checkpoint_file or not os.path.exists(self.checkpoint_file):
+            return segments
+
+        with open(self.checkpoint_file) as f:
+            checkpoint = json.load(f)
+
+        expected = (self.source_table, self.target_table, self.total_segments)
+        found = (
+            checkpoint.get("Source"),
+            checkpoint.get("Target"),
+            checkpoint.get("TotalSegments"),
+        )
+        if found != expected:
+            raise ValueError(
+                f"Checkpoint file '{self.checkpoint_file}' is for a copy of {found[0]} to {found[1]} "
+                f"in {found[2]} segments, not of {expected[0]} to {expected[1]} in {expected[2]} segments."
+            )
+
+        segments.update(
+            {int(segment): state for segment, state in checkpoint["Segments"].items()}
+        )
+
+        return segments
+
+    def _save_checkpoint(self, force: bool = False):
+        if not self.checkpoint_file:
+            return
+
+        with self._lock:
+            if (
+                not force
+                and time.monotonic() - self._saved_at < self.checkpoint_interval
+            ):
+                return
+
+            checkpoint = {
+                "Source": self.source_table,
+                "Target": self.target_table,
+                "TotalSegments": self.total_segments,
+                "Segments": {
+                    str(segment): state for segment, state in self._segments.items()
+                },
+            }
+
+            # Written next to the checkpoint and renamed, so an interruption never leaves half a file
+            temporary_file = f"{self.checkpoint_file}.tmp"
+            with open(temporary_file, "w") as f:
+                json.dump(checkpoint, f)
+            os.replace(temporary_file, self.checkpoint_file)
+
+            self._saved_at = time.monotonic()
+
+
+def _identity(item: Union[dict, None]) -> Union[dict, None]:
+    return item
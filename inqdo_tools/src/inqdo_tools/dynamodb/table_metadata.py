@@ -0,0 +1,147 @@
+"""
+DynamoDB table metadata
+=======================
+"""
+
+import threading
+import time
+from typing import List, Union
+
+
+class TableMetadata(object):
+    """
+    The TableMetadata class holds the parts of a ``describe_table`` response that the client needs.
+
+    :param table: The ``Table`` of a ``describe_table`` response.
+    :type table: dict
+    """
+
+    def __init__(self, table: dict):
+        """Constructor method"""
+        self.table = table
+        self.table_name = table["TableName"]
+        self.key_names = _key_names(table["KeySchema"])
+        self.attribute_types = {
+            definition["AttributeName"]: definition["AttributeType"]
+            for definition in table.get("AttributeDefinitions", [])
+        }
+        self.indexes = {
+            index["IndexName"]: _key_names(index["KeySchema"])
+            for index in table.get("LocalSecondaryIndexes", [])
+            + table.get("GlobalSecondaryIndexes", [])
+        }
+        self.billing_mode = table.get("BillingModeSummary", {}).get(
+            "BillingMode", "PROVISIONED"
+        )
+        self.item_count = table.get("ItemCount", 0)
+
+    @property
+    def partition_key(self) -> str:
+        """The name of the partition key of the table.
+
+        :rtype: str
+        """
+        return self.key_names[0]
+
+    @property
+    def sort_key(self) -> Union[str, None]:
+        """The name of the sort key of the table, None when it only has a partition key.
+
+        :rtype: str
+        """
+        return self.key_names[1] if len(self.key_names) > 1 else None
+
+    def to_dict(self) -> dict:
+        """Returns the metadata as a dict.
+
+        :rtype: dict
+        """
+        return {
+            "TableName": self.table_name,
+            "KeyNames": list(self.key_names),
+            "Indexes": {
+                name: list(key_names) for name, key_names in self.indexes.items()
+            },
+            "BillingMode": self.billing_mode,
+            "ItemCount": self.item_count,
+        }
+
+
+class TableMetadataCache(object):
+    """
+    The TableMetadataCache class keeps the metadata of tables for the whole process.
+
+    Creating a client for a table that was described less than :class:`ttl` seconds ago does not call
+    ``describe_table`` again, which saves a request on every warm Lambda invocation. Tables are
+    cached per account (:class:`arn`), region and endpoint, tables that do not exist are not cached.
+    DynamoDB only updates the ``ItemCount`` about every six hours, so a long ttl is fine for it.
+
+    :param ttl: An optional number of seconds that the metadata is kept, defaults to 300.
+    :type ttl: float, optional
+    """
+
+    def __init__(self, ttl: float = 300):
+        """Constructor method"""
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._tables = {}
+
+    def get(
+        self, client, table_name: str, scope: tuple = (), refresh: bool = False
+    ) -> TableMetadata:
+        """
+        Returns the metadata of a table, and describes it with the low-level :class:`client` when it is
+        not cached or expired.
+
+        :param scope: Optional values that identify the account, region and endpoint of the client.
+        :type scope: tuple, optional
+
+        :raises ValueError: When the table does not exist.
+
+        :rtype: :class:`TableMetadata`
+        """
+        key = (*scope, table_name)
+        now = time.monotonic()
+
+        if not refresh:
+            with self._lock:
+                cached = self._tables.get(key)
+            if cached is not None and cached[1] > now:
+                return cached[0]
+
+        try:
+            metadata = TableMetadata(
+                client.describe_table(TableName=table_name)["Table"]
+            )
+        except client.exceptions.ResourceNotFoundException:
+            self.invalidate(table_name, scope)
+            raise ValueError(
+                f"Table: '{table_name}' does not exist. Did you create one yet and are you in the correct region?"
+            )
+
+        with self._lock:
+            self._tables[key] = (metadata, now + self.ttl)
+
+        return metadata
+
+    def invalidate(self, table_name: str, scope: tuple = ()):
+        """Removes the metadata of a table."""
+        with self._lock:
+            self._tables.pop((*scope, table_name), None)
+
+    def clear(self):
+        """Removes the metadata of all tables."""
+        with self._lock:
+            self._tables.clear()
+
+
+# The cache shared by all clients of the process
+table_metadata_cache = TableMetadataCache()
+
+
+def _key_names(key_schema: List[dict]) -> List[str]:
+    # The partition key first, then the sort key
+    return [
+        key["AttributeName"]
+        for key in sorted(key_schema, key=lambda key: key["KeyType"] != "HASH")
+    ]
@@ -0,0 +1,275 @@
+"""
+DynamoDB transaction builder
+============================
+"""
+
+import os
+import re
+import time
+import uuid
+from typing import Callable, Union
+
+from boto3.dynamodb.conditions import ConditionBase, ConditionExpressionBuilder
+from botocore.exceptions import ClientError
+
+if "DEBUG_INQDO_TOOLS" in os.environ.keys():  # pragma: no cover
+    from dynamodb.utils import backoff_delay, chunks
+else:
+    from inqdo_tools.dynamodb.utils import backoff_delay, chunks
+
+# Maximum number of operations in a single transact_write_items call
+TRANSACTION_SIZE = 100
+
+# Errors after which the same transaction is tried again
+RETRYABLE_ERRORS = (
+    "InternalServerError",
+    "ProvisionedThroughputExceededException",
+    "RequestLimitExceeded",
+    "ThrottlingException",
+    "TransactionInProgressException",
+)
+
+# Assignments of a placeholder to an attribute in an update expression, for example "#p = :p"
+_ASSIGNMENT = re.compile(r"([#\w]+)\s*=\s*(:\w+)(?![\w\s]*[+-])")
+
+
+class TransactionBuilder(object):
+    """
+    The TransactionBuilder class collects puts, updates, deletes and condition checks and writes
+    them with ``transact_write_items``.
+
+    Operations are serialized once when they are added. On :meth:`commit` they are submitted in
+    transactions of at most 100 operations, each with its own ``ClientRequestToken``, so a retried
+    transaction is never applied twice. Transactions that are cancelled because of a
+    ``TransactionConflict`` or throttling are retried with jittered exponential backoff.
+    Only the operations within one transaction of 100 are atomic.
+
+    Operations can target other tables than :class:`table_name`, and a transaction can not hold two
+    operations on the same item. Used as a context manager it commits when the block exits
+    without an exception::
+
+        with client.transaction() as transaction:
+            transaction.put({"movieName": "The Dark Knight", "year": 2008})
+            transaction.delete({"movieName": "Batman Begins"}, condition=Attr("year").lt(2006))
+
+    :param client: A low-level DynamoDB client.
+    :type client: :class:`botocore.client.BaseClient`
+
+    :param table_name: The default table of the operations.
+    :type table_name: str
+
+    :param serialize: Function that serializes a python value into a DynamoDB attribute value.
+    :type serialize: Callable
+
+    :param serialize_item: An optional function that serializes a complete item, for example with
+        compression, defaults to serializing every value with :class:`serialize`. It is used for put items
+        and for values that an update assigns to an attribute.
+    :type serialize_item: Callable, optional
+
+    :param max_retries: An optional number of retries for conflicting and throttled transactions, defaults to 8.
+    :type max_retries: int, optional
+
+    :param on_commit: An optional function that is called with the operations of every committed transaction.
+    :type on_commit: Callable, optional
+    """
+
+    def __init__(
+        self,
+        client,
+        table_name: str,
+        serialize: Callable,
+        serialize_item: Callable = None,
+        max_retries: int = 8,
+        on_commit: Callable = None,
+    ):
+        """Constructor method"""
+        self.client = client
+        self.table_name = table_name
+        self.serialize = serialize
+        self.serialize_item = serialize_item or self._serialize_item
+        self.max_retries = max_retries
+        self.on_commit = on_commit
+        self.operations = []
+
+    def __len__(self) -> int:
+        return len(self.operations)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.commit()
+
+    def put(self, item: dict, condition: ConditionBase = None, table_name: str = None):
+        """Adds a put of a complete item, optionally with a condition on the existing item.
+
+        :rtype: :class:`TransactionBuilder`
+        """
+        operation = {"Item": self.serialize_item(item)}
+        return self._add("Put", operation, condition, table_name)
+
+    def update(
+        self,
+        key: dict,
+        update_expression: str,
+        expression_values: dict = None,
+        expression_names: dict = None,
+        condition: ConditionBase = None,
+        table_name: str = None,
+    ):
+        """
+        Adds an update of a single item.
+
+        :param update_expression: The update expression, the DynamoDB way, for example ``SET #y = :y``.
+        :type update_expression: str
+
+        :param expression_values: The python values of the placeholders, for example ``{":y": 2008}``.
+        :type expression_values: dict, optional
+
+        :param expression_names: The attribute names of the placeholders, for example ``{"#y": "year"}``.
+        :type expression_names: dict, optional
+
+        :rtype: :class:`TransactionBuilder`
+        """
+        operation = {
+            "Key": self._serialize_item(key),
+            "UpdateExpression": update_expression,
+            "ExpressionAttributeNames": dict(expression_names or {}),
+            "ExpressionAttributeValues": self._serialize_values(
+                update_expression, expression_names or {}, expression_values or {}
+            ),
+        }
+        return self._add("Update", operation, condition, table_name)
+
+    def delete(
+        self, key: dict, condition: ConditionBase = None, table_name: str = None
+    ):
+        """Adds a delete of a single item.
+
+        :rtype: :class:`TransactionBuilder`
+        """
+        operation = {"Key": self._serialize_item(key)}
+        return self._add("Delete", operation, condition, table_name)
+
+    def condition_check(
+        self, key: dict, condition: ConditionBase, table_name: str = None
+    ):
+        """Adds a condition on an item that is not written, the transaction fails when it is not met.
+
+        :rtype: :class:`TransactionBuilder`
+        """
+        operation = {"Key": self._serialize_item(key)}
+        return self._add("ConditionCheck", operation, condition, table_name)
+
+    def commit(self) -> dict:
+        """
+        Writes all collected operations, in transactions of at most 100 operations.
+        The builder is empty afterwards, so it can be reused.
+
+        :raises botocore.exceptions.ClientError: When a transaction is cancelled, for example because
+            a condition is not met, or still conflicts after all retries. The transactions before it
+            have been committed.
+
+        :return: The number of committed operations under ``Committed`` and transactions under ``Transactions``.
+        :rtype: dict
+        """
+        operations, self.operations = self.operations, []
+        transactions = chunks(operations, TRANSACTION_SIZE)
+
+        for transaction in transactions:
+            self._commit_transaction(transaction)
+            if self.on_commit:
+                self.on_commit(transaction)
+
+        return {"Committed": len(operations), "Transactions": len(transactions)}
+
+    def _commit_transaction(self, transaction: list):
+        # The same token for every attempt makes retries idempotent
+        token = str(uuid.uuid4())
+
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                time.sleep(backoff_delay(attempt))
+
+            try:
+                return self.client.transact_write_items(
+                    TransactItems=transaction, ClientRequestToken=token
+                )
+            except ClientError as e:
+                if attempt == self.max_retries or not _is_retryable(e):
+                    raise
+
+    def _add(
+        self,
+        kind: str,
+        operation: dict,
+        condition: Union[ConditionBase, None],
+        table_name: Union[str, None],
+    ):
+        operation["TableName"] = table_name or self.table_name
+
+        if condition is not None:
+            built = ConditionExpressionBuilder().build_expression(condition)
+            operation["ConditionExpression"] = built.condition_expression
+            operation.setdefault("ExpressionAttributeNames", {}).update(
+                built.attribute_name_placeholders
+            )
+            operation.setdefault("ExpressionAttributeValues", {}).update(
+                self._serialize_item(built.attribute_value_placeholders)
+            )
+
+        # Empty placeholder maps are rejected by DynamoDB
+        for parameter in ("ExpressionAttributeNames", "ExpressionAttributeValues"):
+            if not operation.get(parameter, True):
+                del operation[parameter]
+
+        self.operations.append({kind: operation})
+
+        return self
+
+    def _serialize_item(self, item: dict) -> dict:
+        serialize = self.serialize
+        return {k: serialize(v) for k, v in item.items()}
+
+    def _serialize_values(
+        self, update_expression: str, expression_names: dict, expression_values: dict
+    ) -> dict:
+        # Values that are assigned to an attribute are serialized as that attribute of an item
+        attributes = {
+            placeholder: expression_names.get(name, name)
+            for name, placeholder in _ASSIGNMENT.findall(update_expression)
+        }
+
+        serialized = self._serialize_item(expression_values)
+        for placeholder, value in expression_values.items():
+            if placeholder in attributes:
+                attribute = attributes[placeholder]
+                serialized[placeholder] = self.serialize_item({attribute: value})[
+                    attribute
+                ]
+
+        return serialized
+
+
+def _is_retryable(error: ClientError) -> bool:
+    code = error.response["Error"]["Code"]
+
+    if code in RETRYABLE_ERRORS:
+        return True
+
+    if code == "TransactionCanceledException":
+        reasons = [
+            reason.get("Code")
+            for reason in error.response.get("CancellationReasons", [])
+        ]
+        if reasons:
+            # Only retry when nothing else than a conflict or throttling cancelled the transaction
+            return any(r == "TransactionConflict" for r in reasons) and all(
+                r in ("None", "TransactionConflict", "ThrottlingError", None)
+                for r in reasons
+            )
+
+        return "TransactionConflict" in error.response["Error"].get("Message", "")
+
+    return False
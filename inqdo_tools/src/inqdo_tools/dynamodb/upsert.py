@@ -0,0 +1,369 @@
+"""
+DynamoDB diff upsert
+====================
+"""
+
+import base64
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Iterable, List
+
+from boto3.dynamodb.conditions import Attr, ConditionExpressionBuilder
+from botocore.exceptions import ClientError
+
+if "DEBUG_INQDO_TOOLS" in os.environ.keys():  # pragma: no cover
+    from dynamodb.batch_writer import RETRYABLE_ERRORS
+    from dynamodb.metrics import MetricsSink, measured
+    from dynamodb.rate_limiter import WRITE, CapacityRateLimiter, limited_call
+    from dynamodb.serializer import deserializer, serializer
+    from dynamodb.utils import (
+        BATCH_GET_SIZE,
+        backoff_delay,
+        batch_get,
+        batched,
+        build_projection,
+        key_id,
+    )
+else:
+    from inqdo_tools.dynamodb.batch_writer import RETRYABLE_ERRORS
+    from inqdo_tools.dynamodb.metrics import MetricsSink, measured
+    from inqdo_tools.dynamodb.rate_limiter import (
+        WRITE,
+        CapacityRateLimiter,
+        limited_call,
+    )
+    from inqdo_tools.dynamodb.serializer import deserializer, serializer
+    from inqdo_tools.dynamodb.utils import (
+        BATCH_GET_SIZE,
+        backoff_delay,
+        batch_get,
+        batched,
+        build_projection,
+        key_id,
+    )
+
+HASH = "hash"
+ITEM = "item"
+
+# Maximum length of a condition expression
+MAX_CONDITION_SIZE = 4096
+
+
+class DiffUpsert(object):
+    """
+    The DiffUpsert class writes only the items that differ from what is already in the table.
+
+    Sync jobs often write a whole dataset of which only a few items changed. Reading an item costs
+    a quarter of writing it, so the current state of every 100 incoming items is read with one
+    ``batch_get_item``, and only new and changed items are written. Unchanged items are skipped.
+
+    Items are compared in one of two ways:
+
+    * ``compare="hash"`` stores a hash of the content of every written item in :class:`hash_attribute`
+      and only reads back the keys and that hash. Items written without it count as changed once.
+    * ``compare="item"`` reads back the complete items and compares them with the incoming items.
+
+    Every write is a ``put_item`` with a condition that the item was not changed by someone else
+    since it was read: the item still does not exist, or the stored hash (``"hash"``) or every stored
+    attribute (``"item"``) still has the value that was read. Attributes that someone else adds to
+    an item are not detected in ``"item"`` mode. Writes of which the condition fails are not
+    retried, but counted as ``Conflicts``.
+
+    A condition expression can be at most 4 KB, which is about 240 attributes in ``"item"`` mode.
+    For wider items only the attributes that fit are checked, :class:`hash_attribute` first when the
+    stored item has one, so changes to the other attributes are overwritten. Use ``"hash"`` mode to
+    detect every change of wide items.
+
+    :param client: A low-level DynamoDB client.
+    :type client: :class:`botocore.client.BaseClient`
+
+    :param table_name: The name of the table to write to.
+    :type table_name: str
+
+    :param key_names: The names of the key attributes of the table.
+    :type key_names: list
+
+    :param serialize: Function that serializes a python dict into DynamoDB attribute values for the write.
+    :type serialize: Callable
+
+    :param deserialize: Function that deserializes the DynamoDB attribute values of a stored item.
+    :type deserialize: Callable
+
+    :param compare: An optional way to compare the items, "hash" (default) or "item".
+    :type compare: str, optional
+
+    :param hash_attribute: An optional name of the attribute that holds the content hash, defaults to "contentHash".
+    :type hash_attribute: str, optional
+
+    :param max_workers: An optional number of chunks of 100 items that are handled in parallel, defaults to 4.
+    :type max_workers: int, optional
+
+    :param max_retries: An optional number of retries for unprocessed keys and throttled writes, defaults to 8.
+    :type max_retries: int, optional
+
+    :param rate_limiter: An optional limiter that keeps the requests within the capacity of the table.
+    :type rate_limiter: :class:`CapacityRateLimiter`, optional
+
+    :param metrics: An optional sink to record the metrics of the requests in.
+    :type metrics: :class:`MetricsSink`, optional
+
+    :param on_written: An optional function that is called with every item once it is written,
+        for example to invalidate a cache.
+    :type on_written: Callable, optional
+    """
+
+    def __init__(
+        self,
+        client,
+        table_name: str,
+        key_names: List[str],
+        serialize: Callable,
+        deserialize: Callable,
+        compare: str = HASH,
+        hash_attribute: str = "contentHash",
+        max_workers: int = 4,
+        max_retries: int = 8,
+        rate_limiter: CapacityRateLimiter = None,
+        metrics: MetricsSink = None,
+        on_written: Callable[[dict], None] = None,
+    ):
+        """Constructor method"""
+        if compare not in (HASH, ITEM):
+            raise ValueError(
+                f"compare should be '{HASH}' or '{ITEM}', not '{compare}'."
+            )
+
+        self.client = client
+        self.table_name = table_name
+        self.key_names = list(key_names)
+        self.serialize = serialize
+        self.deserialize = deserialize
+        self.compare = compare
+        self.hash_attribute = hash_attribute
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.rate_limiter = rate_limiter
+        self.metrics = metrics
+        self.on_written = on_written
+
+    def write(self, items: Iterable[dict]) -> dict:
+        """
+        Writes the new and changed items. The items are consumed lazily, in chunks of 100.
+        When an item occurs more than once in a chunk, the last one is written.
+
+        :return: The number of ``Written``, ``Skipped`` (unchanged) and ``Conflicts`` (changed by
+            someone else) items, and under ``Failed`` a list with the ``Item`` and ``Error`` of every
+            item that could not be written.
+        :rtype: dict
+        """
+        result = {"Written": 0, "Skipped": 0, "Conflicts": 0, "Failed": []}
+        lock = threading.Lock()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            in_flight = set()
+
+            for chunk in batched(items, BATCH_GET_SIZE):
+                # Only a few chunks are queued ahead of the workers, to keep memory use flat
+                if len(in_flight) >= self.max_workers * 2:
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        future.result()
+
+                in_flight.add(executor.submit(self._write_chunk, chunk, result, lock))
+
+            for future in in_flight:
+                future.result()
+
+        return result
+
+    def _write_chunk(self, chunk: List[dict], result: dict, lock: threading.Lock):
+        # batch_get_item rejects duplicate keys
+        items = list({key_id(item, self.key_names): item for item in chunk}.values())
+        stored = self._prefetch(items)
+
+        skipped = len(chunk) - len(items)
+        for item in items:
+            raw = stored.get(key_id(item, self.key_names))
+            current = self.deserialize(raw) if raw is not None else None
+
+            if self.compare == HASH:
+                content = content_hash(item, exclude=(self.hash_attribute,))
+                if current is not None and current.get(self.hash_attribute) == content:
+                    skipped += 1
+                    continue
+                self._put(
+                    {**item, self.hash_attribute: content}, current, raw, result, lock
+                )
+            else:
+                if current is not None and current == item:
+                    skipped += 1
+                    continue
+                self._put(item, current, raw, result, lock)
+
+        with lock:
+            result["Skipped"] += skipped
+
+    def _prefetch(self, items: List[dict]) -> dict:
+        keys = [
+            serializer.serialize_item({name: item[name] for name in self.key_names})
+            for item in items
+        ]
+        request = (
+            build_projection(self.key_names + [self.hash_attribute])
+            if self.compare == HASH
+            else None
+        )
+
+        stored = batch_get(
+            self.client,
+            self.table_name,
+            keys,
+            request=request,
+            max_retries=self.max_retries,
+            rate_limiter=self.rate_limiter,
+            metrics=self.metrics,
+        )
+
+        # The items are kept as stored, so item mode can compare the attributes in their stored form
+        return {key_id(self._key(item), self.key_names): item for item in stored}
+
+    def _key(self, item: dict) -> dict:
+        return deserializer.deserialize_item(
+            {name: item[name] for name in self.key_names}
+        )
+
+    def _put(
+        self, item: dict, current: dict, raw: dict, result: dict, lock: threading.Lock
+    ):
+        request = {
+            "TableName": self.table_name,
+            "Item": self.serialize(item),
+            **self._condition(current, raw),
+        }
+
+        put_item = measured(
+            self.client.put_item, "put_item", self.table_name, self.metrics
+        )
+
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                time.sleep(backoff_delay(attempt))
+
+            try:
+                limited_call(put_item, WRITE, self.rate_limiter, **request)
+            except ClientError as e:
+                code = e.response["Error"]["Code"]
+
+                if code in RETRYABLE_ERRORS and attempt < self.max_retries:
+                    continue
+
+                with lock:
+                    if code == "ConditionalCheckFailedException":
+                        result["Conflicts"] += 1
+                    else:
+                        result["Failed"].append(
+                            {"Item": item, "Error": e.response["Error"]["Message"]}
+                        )
+                return
+
+            with lock:
+                result["Written"] += 1
+            if self.on_written is not None:
+                self.on_written(item)
+            return
+
+    def _condition(self, current: dict, raw: dict) -> dict:
+        if current is None:
+            condition = Attr(self.key_names[0]).not_exists()
+        elif self.compare == HASH:
+            stored_hash = current.get(self.hash_attribute)
+            hash_attribute = Attr(self.hash_attribute)
+            condition = (
+                hash_attribute.not_exists()
+                if stored_hash is None
+                else hash_attribute.eq(stored_hash)
+            )
+        else:
+            return self._item_condition(raw)
+
+        built = ConditionExpressionBuilder().build_expression(condition)
+        request = {
+            "ConditionExpression": built.condition_expression,
+            "ExpressionAttributeNames": built.attribute_name_placeholders,
+        }
+        if built.attribute_value_placeholders:
+            request["ExpressionAttributeValues"] = serializer.serialize_item(
+                built.attribute_value_placeholders
+            )
+
+        return request
+
+    def _item_condition(self, raw: dict) -> dict:
+        # Every attribute that was read still has the value that was read, as far as they fit in the expression
+        names = sorted(raw, key=lambda name: name != self.hash_attribute)
+        terms = []
+        size = -len(" AND ")
+
+        for i, name in enumerate(names):
+            term = f"#c{i} = :c{i}"
+            size += len(" AND ") + len(term)
+            if size > MAX_CONDITION_SIZE:
+                break
+            terms.append(term)
+
+        return {
+            "ConditionExpression": " AND ".join(terms),
+            "ExpressionAttributeNames": {
+                f"#c{i}": name for i, name in enumerate(names[: len(terms)])
+            },
+            "ExpressionAttributeValues": {
+                f":c{i}": raw[name] for i, name in enumerate(names[: len(terms)])
+            },
+        }
+
+
+def content_hash(item: dict, exclude: Iterable[str] = ()) -> str:
+    """
+    Returns a hash of the content of an item, which does not depend on the order of its attributes
+    or of the members of its sets.
+
+    :param item: The item, as python dict.
+    :type item: dict
+
+    :param exclude: Optional names of attributes to leave out, such as the attribute that holds the hash.
+    :type exclude: list, optional
+
+    :rtype: str
+    """
+    exclude = set(exclude)
+    serialized = serializer.serialize_item(
+        {k: v for k, v in item.items() if k not in exclude}
+    )
+    data = json.dumps(
+        {k: _canonical(v) for k, v in serialized.items()},
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+
+    return hashlib.blake2b(data.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _canonical(value: dict) -> dict:
+    ((tag, data),) = value.items()
+
+    if tag == "B":
+        return {"B": base64.b64encode(data).decode()}
+    if tag == "BS":
+        return {"BS": sorted(base64.b64encode(v).decode() for v in data)}
+    if tag in ("SS", "NS"):
+        return {tag: sorted(data)}
+    if tag == "M":
+        return {"M": {k: _canonical(v) for k, v in data.items()}}
+    if tag == "L":
+        return {"L": [_canonical(v) for v in data]}
+
+    return value
@@ -0,0 +1,300 @@
+"""
+DynamoDB utils
+==============
+"""
+
+import base64
+import itertools
+import os
+import random
+import re
+import time
+from typing import Callable, Iterable, Iterator, List, Union
+
+from boto3.dynamodb.conditions import ConditionBase, ConditionExpressionBuilder
+
+if "DEBUG_INQDO_TOOLS" in os.environ.keys():  # pragma: no cover
+    from dynamodb.filters import to_condition
+    from dynamodb.metrics import measured
+    from dynamodb.rate_limiter import READ, limited_call
+else:
+    from inqdo_tools.dynamodb.filters import to_condition
+    from inqdo_tools.dynamodb.metrics import measured
+    from inqdo_tools.dynamodb.rate_limiter import READ, limited_call
+
+# Maximum number of keys in a single batch_get_item request
+BATCH_GET_SIZE = 100
+
+_PATH_SEGMENT = re.compile(r"^([^\[\]]+)((?:\[\d+\])*)$")
+
+
+def build_projection(attributes: List[str]) -> dict:
+    """
+    Builds a placeholder-safe ``ProjectionExpression`` for a list of attribute paths.
+    Nested paths are supported with dots and list indexes, for example ``address.lines[0]``.
+
+    :param attributes: The attribute (paths) to return.
+    :type attributes: list
+
+    :return: The ``ProjectionExpression`` and ``ExpressionAttributeNames`` request parameters.
+    :rtype: dict
+    """
+    names = {}
+    placeholders = {}
+    paths = []
+
+    for attribute in attributes:
+        path = []
+        for segment in attribute.split("."):
+            match = _PATH_SEGMENT.match(segment)
+            if not match:
+                raise ValueError(f"Invalid attribute path in projection: '{attribute}'")
+
+            name, indexes = match.groups()
+            if name not in placeholders:
+                placeholders[name] = f"#p{len(placeholders)}"
+                names[placeholders[name]] = name
+
+            path.append(f"{placeholders[name]}{indexes}")
+
+        paths.append(".".join(path))
+
+    return {
+        "ProjectionExpression": ", ".join(paths),
+        "ExpressionAttributeNames": names,
+    }
+
+
+def build_request(
+    serialize: Callable,
+    key_condition: ConditionBase = None,
+    filter_expression: Union[ConditionBase, dict] = None,
+    projection: Union[List[str], None] = None,
+) -> dict:
+    """
+    Builds the expression parameters of a low-level ``query`` or ``scan`` request from boto3
+    conditions (:class:`boto3.dynamodb.conditions.Key` / :class:`boto3.dynamodb.conditions.Attr`)
+    and a projection. All expressions share one set of placeholders.
+
+    :param serialize: Function that serializes a python value into a DynamoDB attribute value.
+    :type serialize: Callable
+
+    :param key_condition: An optional key condition, for queries.
+    :type key_condition: :class:`boto3.dynamodb.conditions.ConditionBase`, optional
+
+    :param filter_expression: An optional filter condition, or a dict of lookups for :func:`where`.
+    :type filter_expression: :class:`boto3.dynamodb.conditions.ConditionBase` or dict, optional
+
+    :param projection: An optional list of attributes to return.
+    :type projection: list, optional
+
+    :rtype: dict
+    """
+    request = {}
+    names = {}
+    values = {}
+    builder = ConditionExpressionBuilder()
+
+    for parameter, condition, is_key_condition in (
+        ("KeyConditionExpression", key_condition, True),
+        ("FilterExpression", to_condition(filter_expression), False),
+    ):
+        if condition is None:
+            continue
+
+        built = builder.build_expression(condition, is_key_condition=is_key_condition)
+        request[parameter] = built.condition_expression
+        names.update(built.attribute_name_placeholders)
+        values.update(
+            {k: serialize(v) for k, v in built.attribute_value_placeholders.items()}
+        )
+
+    if projection:
+        projection_request = build_projection(projection)
+        request["ProjectionExpression"] = projection_request["ProjectionExpression"]
+        names.update(projection_request["ExpressionAttributeNames"])
+
+    if names:
+        request["ExpressionAttributeNames"] = names
+    if values:
+        request["ExpressionAttributeValues"] = values
+
+    return request
+
+
+def backoff_delay(attempt: int, base: float = 0.05, cap: float = 5.0) -> float:
+    """
+    Returns the number of seconds to wait before retry :class:`attempt` (starting at 1),
+    using exponential backoff with full jitter.
+
+    :rtype: float
+    """
+    return random.uniform(0, min(cap, base * 2**attempt))
+
+
+def batch_get(
+    client,
+    table_name: str,
+    keys: List[dict],
+    request: dict = None,
+    max_retries: int = 8,
+    rate_limiter=None,
+    metrics=None,
+) -> List[dict]:
+    """
+    Reads at most :data:`BATCH_GET_SIZE` serialized keys with ``batch_get_item`` on a low-level client.
+    ``UnprocessedKeys`` are retried with jittered exponential backoff.
+
+    :param client: A low-level DynamoDB client.
+    :type client: :class:`botocore.client.BaseClient`
+
+    :param table_name: The name of the table to read from.
+    :type table_name: str
+
+    :param keys: The serialized keys, for example ``[{"movieName": {"S": "The Dark Knight"}}]``.
+    :type keys: list
+
+    :param request: Optional extra parameters for the table, such as a ``ProjectionExpression``.
+    :type request: dict, optional
+
+    :param max_retries: An optional number of retries for unprocessed keys, defaults to 8.
+    :type max_retries: int, optional
+
+    :param rate_limiter: An optional limiter that keeps the reads within the capacity of the table.
+    :type rate_limiter: :class:`CapacityRateLimiter`, optional
+
+    :param metrics: An optional sink to record the metrics of the requests in.
+    :type metrics: :class:`MetricsSink`, optional
+
+    :return: The serialized items that were found, in no particular order.
+    :rtype: list
+    """
+    items = []
+    request_items = {table_name: {"Keys": keys, **(request or {})}}
+    operation = measured(client.batch_get_item, "batch_get_item", table_name, metrics)
+
+    for attempt in range(max_retries + 1):
+        if attempt:
+            time.sleep(backoff_delay(attempt))
+
+        response = limited_call(
+            operation, READ, rate_limiter, RequestItems=request_items
+        )
+        items.extend(response["Responses"].get(table_name, []))
+
+        request_items = response.get("UnprocessedKeys")
+        if not request_items:
+            return items
+
+    unprocessed = len(request_items[table_name]["Keys"])
+    raise RuntimeError(
+        f"Could not read {unprocessed} keys after {max_retries} retries."
+    )
+
+
+def key_id(key: dict, key_names) -> tuple:
+    """
+    Returns a hashable identifier for the key attributes of an item or key.
+
+    :param key: The item or key.
+    :type key: dict
+
+    :param key_names: The names of the key attributes.
+    :type key_names: Iterable[str]
+
+    :rtype: tuple
+    """
+    return tuple((name, key[name]) for name in sorted(key_names))
+
+
+def chunks(items: list, size: int) -> list:
+    """Splits a list in lists of at most :class:`size` items.
+
+    :rtype: list
+    """
+    return list(batched(items, size))
+
+
+def batched(iterable: Iterable, size: int) -> Iterator[list]:
+    """Lazily splits any iterable in lists of at most :class:`size` items.
+
+    :rtype: Iterator[list]
+    """
+    iterator = iter(iterable)
+    while True:
+        batch = list(itertools.islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def rate_limited(items: Iterable, per_second: float) -> Iterator:
+    """
+    Yields the items at no more than :class:`per_second` items per second on average.
+    A token bucket of one second allows short bursts, so fast consumers are not slowed down
+    by a sleep for every single item.
+
+    :rtype: Iterator
+    """
+    capacity = max(1.0, per_second)
+    tokens = capacity
+    refilled_at = time.monotonic()
+
+    for item in items:
+        now = time.monotonic()
+        tokens = min(capacity, tokens + (now - refilled_at) * per_second)
+        refilled_at = now
+
+        if tokens < 1:
+            time.sleep((1 - tokens) / per_second)
+            tokens = 1
+            refilled_at = time.monotonic()
+
+        tokens -= 1
+        yield item
+
+
+def to_json_item(item: dict) -> dict:
+    """Replaces the binary values of a serialized item by base64 strings, so it can be written as json.
+
+    :rtype: dict
+    """
+    return {k: _to_json_value(v) for k, v in item.items()}
+
+
+def from_json_item(item: dict) -> dict:
+    """Restores the binary values of an item read by :func:`to_json_item`.
+
+    :rtype: dict
+    """
+    return {k: _from_json_value(v) for k, v in item.items()}
+
+
+def _to_json_value(value: dict) -> dict:
+    ((tag, data),) = value.items()
+
+    if tag == "B":
+        return {"B": base64.b64encode(data).decode()}
+    if tag == "BS":
+        return {"BS": [base64.b64encode(v).decode() for v in data]}
+    if tag == "M":
+        return {"M": to_json_item(data)}
+    if tag == "L":
+        return {"L": [_to_json_value(v) for v in data]}
+
+    return value
+
+
+def _from_json_value(value: dict) -> dict:
+    ((tag, data),) = value.items()
+
+    if tag == "B":
+        return {"B": base64.b64decode(data)}
+    if tag == "BS":
+        return {"BS": [base64.b64decode(v) for v in data]}
+    if tag == "M":
+        return {"M": from_json_item(data)}
+    if tag == "L":
+        return {"L": [_from_json_value(v) for v in data]}
+
+    return value
@@ -4,14 +4,175 @@ AssumeRole object
 """
 
 import os
+import threading
+from datetime import datetime, timezone
+from typing import Callable
 
 import boto3
+from botocore.credentials import RefreshableCredentials
 
 if "DEBUG_INQDO_TOOLS" in os.environ.keys():  # pragma: no cover
+    from utils.client_cache import client_cache
     from utils.common import destruct_dict
 else:
+    from inqdo_tools.utils.client_cache import client_cache
     from inqdo_tools.utils.common import destruct_dict
 
+# Seconds before expiration at which credentials are refreshed in the background,
+# and at which they are no longer handed out. These mirror botocore's refresh windows.
+ADVISORY_REFRESH_TIMEOUT = 15 * 60
+MANDATORY_REFRESH_TIMEOUT = 10 * 60
+
+
+class CredentialCache(object):
+    """
+    The CredentialCache class shares assumed role credentials within the process.
+
+    Credentials are keyed by role ARN and session name. Cached credentials are returned until
+    they get close to their ``Expiration``: inside the advisory window a refresh is started in the
+    background while the cached credentials are still handed out, inside the mandatory window
+    callers wait for fresh credentials.
+
+    Attributes:
+        hits (int): The number of lookups that were served from the cache.
+        misses (int): The number of lookups that had to wait for an STS call.
+        refreshes (int): The number of background refreshes that were started.
+    """
+
+    def __init__(
+        self,
+        advisory_refresh_timeout: int = ADVISORY_REFRESH_TIMEOUT,
+        mandatory_refresh_timeout: int = MANDATORY_REFRESH_TIMEOUT,
+    ):
+        """Constructor method"""
+        self.advisory_refresh_timeout = advisory_refresh_timeout
+        self.mandatory_refresh_timeout = mandatory_refresh_timeout
+        self._responses = {}
+        self._key_locks = {}
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+
+    def get(self, role_arn: str, role_session_name: str, fetch: Callable) -> dict:
+        """
+        Returns the cached ``assume_role`` response for the role, calling ``fetch`` when needed.
+
+        :param role_arn: The ARN of the assumed role.
+        :type role_arn: str
+
+        :param role_session_name: The identifier of the assumed role session.
+        :type role_session_name: str
+
+        :param fetch: Callable without arguments that performs the ``assume_role`` call.
+        :type fetch: Callable
+
+        :rtype: dict
+        """
+        key = (role_arn, role_session_name)
+
+        response = self._lookup(key, fetch)
+        if response is not None:
+            return response
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            # Another thread may have refreshed the credentials while we were waiting
+            response = self._lookup(key, fetch, count_miss=True)
+            if response is None:
+                response = self._store(key, fetch())
+
+        return response
+
+    def invalidate(self, role_arn: str = None, role_session_name: str = None) -> int:
+        """
+        Removes the cached credentials matching the given role ARN and/or session name.
+        Without arguments all credentials are removed.
+
+        :rtype: int
+        :return: The number of removed credentials.
+        """
+        with self._lock:
+            matching = [
+                key
+                for key in self._responses
+                if role_arn in (None, key[0]) and role_session_name in (None, key[1])
+            ]
+            for key in matching:
+                del self._responses[key]
+
+        return len(matching)
+
+    def clear(self):
+        """Removes all cached credentials and resets the counters."""
+        with self._lock:
+            self._responses.clear()
+            self.hits = 0
+            self.misses = 0
+            self.refreshes = 0
+
+    def stats(self) -> dict:
+        """Returns the hit/miss/refresh counters and the number of cached credentials.
+
+        :rtype: dict
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "refreshes": self.refreshes,
+                "size": len(self._responses),
+            }
+
+    def _lookup(self, key: tuple, fetch: Callable, count_miss: bool = False):
+        with self._lock:
+            response = self._responses.get(key)
+            remaining = _seconds_remaining(response) if response else 0
+
+            if remaining > self.mandatory_refresh_timeout:
+                self.hits += 1
+
+                if (
+                    remaining <= self.advisory_refresh_timeout
+                    and key not in self._refreshing
+                ):
+                    self._refreshing.add(key)
+                    self.refreshes += 1
+                    threading.Thread(
+                        target=self._background_refresh,
+                        args=(key, fetch),
+                        daemon=True,
+                    ).start()
+
+                return response
+
+            if count_miss:
+                self.misses += 1
+
+        return None
+
+    def _store(self, key: tuple, response: dict) -> dict:
+        with self._lock:
+            self._responses[key] = response
+
+        return response
+
+    def _background_refresh(self, key: tuple, fetch: Callable):
+        try:
+            self._store(key, fetch())
+        except Exception:
+            # The cached credentials are still valid, the next lookup will try again
+            pass
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+
+credential_cache = CredentialCache()
+
 
 class AssumeRole(object):
     """
@@ -27,6 +188,9 @@ class AssumeRole(object):
     and make the assume_role API call,
     it also takes in region as a keyword argument which defaults to eu-west-1 if not provided
 
+    Credentials are shared through the process-wide :data:`credential_cache`, so the STS call is
+    only made when no valid credentials for the role and session name are cached.
+
     :param role_arn: The ARN of the role to be assumed.
     :type role_arn: str
 
@@ -36,6 +200,9 @@ class AssumeRole(object):
     :param region: The region in which to make the API call, defaults to eu-west-1
     :type region: str, optional
 
+    :param cache: Set to False to always call STS, defaults to True
+    :type cache: bool, optional
+
     :rtype: dict
     """
 
@@ -58,17 +225,68 @@ class AssumeRole(object):
         )
         self.role_arn = role_arn
 
-        self.sts_client = boto3.client(
-            "sts",
-            region_name=self.region,
+        self.sts_client = client_cache.get(
+            client_cache.key(service="sts", region=self.region),
+            lambda: boto3.client("sts", region_name=self.region),
         )
 
-        self.assumed_role_object = self.sts_client.assume_role(
-            RoleArn=self.role_arn,
-            RoleSessionName=self.role_session_name,
-        )
+        if "cache" in kwargs and not kwargs["cache"]:
+            self.assumed_role_object = self._assume_role()
+        else:
+            self.assumed_role_object = credential_cache.get(
+                role_arn=self.role_arn,
+                role_session_name=self.role_session_name,
+                fetch=self._assume_role,
+            )
 
         self.credentials = self.assumed_role_object["Credentials"]
 
     def get_credentials(self) -> dict:
         return self.credentials
+
+    def get_refreshable_credentials(self) -> RefreshableCredentials:
+        """
+        Returns botocore credentials that refresh themselves through the credential cache.
+        Clients built with these credentials keep working after the current credentials expire.
+
+        :rtype: :class:`botocore.credentials.RefreshableCredentials`
+        """
+        return RefreshableCredentials.create_from_metadata(
+            metadata=self._to_metadata(self.credentials),
+            refresh_using=self._refresh,
+            method="sts-assume-role",
+        )
+
+    def _assume_role(self) -> dict:
+        return self.sts_client.assume_role(
+            RoleArn=self.role_arn,
+            RoleSessionName=self.role_session_name,
+        )
+
+    def _refresh(self) -> dict:
+        response = credential_cache.get(
+            role_arn=self.role_arn,
+            role_session_name=self.role_session_name,
+            fetch=self._assume_role,
+        )
+        self.assumed_role_object = response
+        self.credentials = response["Credentials"]
+
+        return self._to_metadata(self.credentials)
+
+    @staticmethod
+    def _to_metadata(credentials: dict) -> dict:
+        return {
+            "access_key": credentials["AccessKeyId"],
+            "secret_key": credentials["SecretAccessKey"],
+            "token": credentials["SessionToken"],
+            "expiry_time": credentials["Expiration"].isoformat(),
+        }
+
+
+def _seconds_remaining(response: dict) -> float:
+    expiration = response["Credentials"]["Expiration"]
+    if expiration.tzinfo is None:
+        expiration = expiration.replace(tzinfo=timezone.utc)
+
+    return (expiration - datetime.now(timezone.utc)).total_seconds()
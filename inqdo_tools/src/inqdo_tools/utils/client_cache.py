@@ -0,0 +1,147 @@
+"""
+Client cache
+============
+"""
+
+import threading
+import time
+from typing import Callable, Union
+
+
+class ClientCache(object):
+    """
+    The ClientCache class is a thread-safe, process-wide store for boto3 clients.
+
+    Building a boto3 client parses the botocore service model and sets up a new connection pool,
+    which is expensive. Because boto3 clients are thread-safe, a single client per service, region,
+    role ARN and endpoint can be shared by every caller in the process, including across warm
+    Lambda invocations.
+
+    Entries can be given an expiry time, after which they are treated as a miss and rebuilt.
+
+    Attributes:
+        hits (int): The number of lookups that were served from the cache.
+        misses (int): The number of lookups that had to build a new client.
+    """
+
+    def __init__(self):
+        """Constructor method"""
+        self._clients = {}
+        self._key_locks = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(
+        service: str,
+        region: str,
+        arn: Union[str, None] = None,
+        endpoint_url: Union[str, None] = None,
+    ) -> tuple:
+        """Returns the cache key for the given client settings.
+
+        :rtype: tuple
+        """
+        return (service, region, arn or None, endpoint_url or None)
+
+    def get(self, key: tuple, factory: Callable):
+        """
+        Returns the cached client for the key, or builds one with the factory.
+
+        The factory is called without arguments and must return either a client or a tuple
+        of a client and an expiry timestamp (seconds since the epoch).
+        Clients for different keys are built concurrently, clients for the same key only once.
+
+        :param key: The cache key, see :meth:`key`.
+        :type key: tuple
+
+        :param factory: Callable that builds the client on a miss.
+        :type factory: Callable
+        """
+        client = self._lookup(key)
+        if client is not None:
+            return client
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            # Another thread may have built the client while we were waiting
+            client = self._lookup(key, count_miss=True)
+            if client is not None:
+                return client
+
+            built = factory()
+            client, expires_at = built if isinstance(built, tuple) else (built, None)
+
+            with self._lock:
+                self._clients[key] = (client, expires_at)
+
+        return client
+
+    def invalidate(
+        self,
+        service: str = None,
+        region: str = None,
+        arn: str = None,
+        endpoint_url: str = None,
+    ) -> int:
+        """
+        Removes every cached client matching the given settings.
+        Settings that are not given match any value, so calling it without arguments clears the cache.
+
+        :rtype: int
+        :return: The number of removed clients.
+        """
+        criteria = self.key(service, region, arn, endpoint_url)
+
+        with self._lock:
+            matching = [
+                key
+                for key in self._clients
+                if all(c is None or c == k for c, k in zip(criteria, key))
+            ]
+            for key in matching:
+                del self._clients[key]
+
+        return len(matching)
+
+    def clear(self):
+        """Removes all cached clients and resets the counters."""
+        with self._lock:
+            self._clients.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        """Returns the hit/miss counters and the number of cached clients.
+
+        :rtype: dict
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._clients),
+            }
+
+    def _lookup(self, key: tuple, count_miss: bool = False):
+        with self._lock:
+            entry = self._clients.get(key)
+
+            if entry is not None:
+                client, expires_at = entry
+                if expires_at is None or expires_at > time.time():
+                    self.hits += 1
+                    return client
+
+                del self._clients[key]
+
+            if count_miss:
+                self.misses += 1
+
+        return None
+
+
+client_cache = ClientCache()
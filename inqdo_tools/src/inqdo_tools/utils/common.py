@@ -135,12 +135,39 @@ def to_json(d: dict) -> str:
 
 
 @ErrorHandler.base_exception
-def b64decode(b: str) -> dict:
+def b64decode(b: str, urlsafe: bool = False) -> dict:
+    """
+    Decodes a base64 encoded json string, see :func:`b64encode`.
+
+    :param urlsafe: Optional flag for strings encoded with ``urlsafe=True``.
+    :type urlsafe: bool
+
+    :rtype: dict
+    """
+    if urlsafe:
+        return from_json(
+            base64.b64decode(
+                b + "=" * (-len(b) % 4), altchars=b"-_", validate=True
+            ).decode()
+        )
+
     return from_json(base64.b64decode(b, validate=True).decode())
 
 
 @ErrorHandler.base_exception
-def b64encode(d: dict) -> str:
+def b64encode(d: dict, urlsafe: bool = False) -> str:
+    """
+    Encodes a dict as a base64 encoded json string.
+
+    :param urlsafe: Optional flag to use the URL-safe alphabet (``-`` and ``_``) without padding,
+        so the string can be used in a query string or path as is.
+    :type urlsafe: bool
+
+    :rtype: str
+    """
+    if urlsafe:
+        return base64.urlsafe_b64encode(to_json(d).encode()).decode().rstrip("=")
+
     return base64.b64encode(to_json(d).encode()).decode()
 
 
@@ -5,13 +5,14 @@ Client object
 import os
 
 import boto3
+import botocore.session
 
 if "DEBUG_INQDO_TOOLS" in os.environ.keys():  # pragma: no cover
     from .assume_role import AssumeRole
-    from .common import destruct_dict
+    from .client_cache import client_cache
 else:
     from .assume_role import AssumeRole
-    from .common import destruct_dict
+    from .client_cache import client_cache
 
 
 class Client(object):
@@ -25,6 +26,10 @@ class Client(object):
 
     The class uses the boto3 library to interact with the AWS services,
     it also uses AssumeRole class to obtain the temporary security credentials if arn is provided in the arguments.
+    Assumed role clients use refreshable credentials from the shared credential cache.
+
+    Clients are shared through the process-wide :data:`client_cache`, keyed by service, region,
+    role ARN and endpoint, so repeated constructions (and warm Lambda invocations) reuse the same client.
 
     :param service: The name of the service for which the client is required.
     :type service: str
@@ -36,6 +41,12 @@ class Client(object):
     :param region: The region in which to make the API call, defaults to eu-west-1
     :type region: str, optional
 
+    :param endpoint_url: An optional endpoint url for the client.
+    :type endpoint_url: str, optional
+
+    :param cache: Set to False to always build a new client, defaults to True
+    :type cache: bool, optional
+
     :rtype: dict
     """
 
@@ -43,32 +54,41 @@ class Client(object):
         """Constructor method"""
         self.service = service
         self.region = kwargs["region"] if "region" in kwargs else "eu-west-1"
+        self.endpoint_url = kwargs["endpoint_url"] if "endpoint_url" in kwargs else None
         self.get(**kwargs)
 
     def get(self, **kwargs) -> dict:
-        if "arn" in kwargs:
-            credentials = AssumeRole(role_arn=kwargs["arn"]).get_credentials()
-
-            destructed_items = destruct_dict(
-                dict_to_destruct=credentials,
-                keys=[
-                    "AccessKeyId",
-                    "SecretAccessKey",
-                    "SessionToken",
-                ],
-            )
-
-            access_key_id, secret_access_key, session_token = destructed_items
-
-            self.service = boto3.client(
-                self.service,
-                aws_access_key_id=access_key_id,
-                aws_secret_access_key=secret_access_key,
-                aws_session_token=session_token,
-                region_name=self.region,
-            )
-        else:
-            self.service = boto3.client(
-                self.service,
-                region_name=self.region,
-            )
+        arn = kwargs["arn"] if "arn" in kwargs else None
+
+        if "cache" in kwargs and not kwargs["cache"]:
+            self.service = self._build(arn=arn)[0]
+            return
+
+        key = client_cache.key(
+            service=self.service,
+            region=self.region,
+            arn=arn,
+            endpoint_url=self.endpoint_url,
+        )
+        self.service = client_cache.get(key, lambda: self._build(arn=arn))
+
+    def _build(self, arn: str = None) -> tuple:
+        client_kwargs = {"region_name": self.region}
+        if self.endpoint_url:
+            client_kwargs["endpoint_url"] = self.endpoint_url
+
+        if not arn:
+            return boto3.client(self.service, **client_kwargs), None
+
+        # The client shares one set of refreshable credentials through the credential cache,
+        # so it never needs to be rebuilt when the assumed role credentials expire.
+        botocore_session = botocore.session.get_session()
+        botocore_session._credentials = AssumeRole(
+            role_arn=arn
+        ).get_refreshable_credentials()
+
+        client = boto3.Session(botocore_session=botocore_session).client(
+            self.service, **client_kwargs
+        )
+
+        return client, None
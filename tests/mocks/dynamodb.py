@@ -1,10 +1,13 @@
 import boto3
 import pytest
+from inqdo_tools.dynamodb.table_metadata import table_metadata_cache
 from moto import mock_dynamodb, mock_sts
 
 
 @pytest.fixture()
 def dynamodb_resource(aws_credentials):
+    # Every test starts with new tables
+    table_metadata_cache.clear()
     with mock_dynamodb():
         conn = boto3.resource("dynamodb", region_name="eu-west-1")
         yield conn
@@ -19,6 +22,7 @@ def sts_client(aws_credentials):
 
 @pytest.fixture()
 def dynamodb_client(sts_client):
+    table_metadata_cache.clear()
     with mock_dynamodb():
         conn = boto3.client("dynamodb", region_name="eu-west-1")
         yield conn
@@ -197,7 +201,9 @@ def dynamodb_put_item_for_query(dynamodb_create_table_query, dynamodb_resource):
 
 
 @pytest.fixture
-def dynamodb_put_item_with_range(dynamodb_create_table_with_range_key, dynamodb_resource):
+def dynamodb_put_item_with_range(
+    dynamodb_create_table_with_range_key, dynamodb_resource
+):
     table_connection = dynamodb_resource.Table("movies-prd")
     table_connection.put_item(
         Item={"movieName": "The Dark Knight", "year": "2008", "genre": "action"}
@@ -225,13 +231,10 @@ def dynamodb_client_put_item(dynamodb_client_create_table, dynamodb_client):
     item = {
         "movieName": {"S": "The Dark Knight"},
         "year": {"S": "2008"},
-        "genre": {"S": "action"}
+        "genre": {"S": "action"},
     }
 
-    dynamodb_client.put_item(
-        TableName="movies-prd",
-        Item=item
-    )
+    dynamodb_client.put_item(TableName="movies-prd", Item=item)
 
 
 @pytest.fixture
@@ -252,14 +255,144 @@ def dynamodb_client_create_table_query(dynamodb_client):
 
 
 @pytest.fixture
-def dynamodb_client_put_item_for_query(dynamodb_client_create_table_query, dynamodb_client):
-    item = {
-        "name": {"S": "inQdo"},
-        "number":  {"S": "5"}
-    }
+def dynamodb_client_put_item_for_query(
+    dynamodb_client_create_table_query, dynamodb_client
+):
+    item = {"name": {"S": "inQdo"}, "number": {"S": "5"}}
 
-    dynamodb_client.put_item(
-        TableName="players-prd",
-        Item=item
+    dynamodb_client.put_item(TableName="players-prd", Item=item)
+    yield
+
+
+@pytest.fixture
+def dynamodb_put_items(dynamodb_create_table, dynamodb_resource):
+    table_connection = dynamodb_resource.Table("movies-prd")
+    with table_connection.batch_writer() as batch:
+        for i in range(25):
+            batch.put_item(
+                Item={
+                    "movieName": f"Movie {i:02d}",
+                    "year": 2000 + i,
+                    "genre": "action" if i % 2 else "drama",
+                }
+            )
+    yield
+
+
+@pytest.fixture
+def dynamodb_segmented_scan(monkeypatch):
+    """moto ignores Segment/TotalSegments, this splits the scan pages of a client like DynamoDB would"""
+
+    def apply(client):
+        scan = client.scan
+        requested_segments = []
+
+        def segmented_scan(**kwargs):
+            segment = kwargs.pop("Segment", 0)
+            total_segments = kwargs.pop("TotalSegments", 1)
+            requested_segments.append((segment, total_segments))
+
+            select = kwargs.pop("Select", None)
+
+            response = scan(**kwargs)
+            response["Items"] = [
+                item
+                for i, item in enumerate(response["Items"])
+                if i % total_segments == segment
+            ]
+            response["Count"] = len(response["Items"])
+            if select == "COUNT":
+                del response["Items"]
+            return response
+
+        monkeypatch.setattr(client, "scan", segmented_scan)
+
+        return requested_segments
+
+    return apply
+
+
+@pytest.fixture
+def dynamodb_put_items_for_query(dynamodb_create_table_query, dynamodb_resource):
+    table_connection = dynamodb_resource.Table("players-prd")
+    with table_connection.batch_writer() as batch:
+        for i in range(30):
+            batch.put_item(
+                Item={
+                    "name": "inQdo",
+                    "number": f"{i:02d}",
+                    "position": "keeper" if i < 3 else "player",
+                }
+            )
+        batch.put_item(Item={"name": "other", "number": "01", "position": "keeper"})
+    yield
+
+
+@pytest.fixture
+def dynamodb_put_items_with_indexes(dynamodb_resource):
+    dynamodb_resource.create_table(
+        TableName="readings-prd",
+        KeySchema=[
+            {"AttributeName": "device", "KeyType": "HASH"},
+            {"AttributeName": "timestamp", "KeyType": "RANGE"},
+        ],
+        AttributeDefinitions=[
+            {"AttributeName": "device", "AttributeType": "S"},
+            {"AttributeName": "timestamp", "AttributeType": "N"},
+            {"AttributeName": "status", "AttributeType": "S"},
+            {"AttributeName": "site", "AttributeType": "S"},
+        ],
+        LocalSecondaryIndexes=[
+            {
+                "IndexName": "by-status",
+                "KeySchema": [
+                    {"AttributeName": "device", "KeyType": "HASH"},
+                    {"AttributeName": "status", "KeyType": "RANGE"},
+                ],
+                "Projection": {"ProjectionType": "ALL"},
+            }
+        ],
+        GlobalSecondaryIndexes=[
+            {
+                "IndexName": "by-site",
+                "KeySchema": [
+                    {"AttributeName": "site", "KeyType": "HASH"},
+                    {"AttributeName": "timestamp", "KeyType": "RANGE"},
+                ],
+                "Projection": {"ProjectionType": "ALL"},
+                "ProvisionedThroughput": {
+                    "ReadCapacityUnits": 10,
+                    "WriteCapacityUnits": 10,
+                },
+            }
+        ],
+        ProvisionedThroughput={"ReadCapacityUnits": 10, "WriteCapacityUnits": 10},
+    )
+    table_connection = dynamodb_resource.Table("readings-prd")
+    with table_connection.batch_writer() as batch:
+        for i in range(20):
+            batch.put_item(
+                Item={
+                    "device": f"device-{i % 2}",
+                    "timestamp": 1000 + i,
+                    "status": f"{'ok' if i % 3 else 'error'}-{i:02d}",
+                    "site": "utrecht" if i < 12 else "amsterdam",
+                    "value": i,
+                }
+            )
+    yield
+
+
+@pytest.fixture
+def dynamodb_create_copy_table(dynamodb_resource):
+    dynamodb_resource.create_table(
+        TableName="movies-copy",
+        KeySchema=[
+            {"AttributeName": "movieName", "KeyType": "HASH"},
+        ],
+        AttributeDefinitions=[
+            {"AttributeName": "movieName", "AttributeType": "S"},
+        ],
+        ProvisionedThroughput={"ReadCapacityUnits": 10, "WriteCapacityUnits": 10},
     )
     yield
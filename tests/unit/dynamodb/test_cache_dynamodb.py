@@ -0,0 +1,88 @@
+from inqdo_tools.dynamodb import cache as cache_module
+from inqdo_tools.dynamodb.cache import ItemCache
+
+
+# GET AND PUT
+def test_get_and_put():
+
+    cache = ItemCache()
+    cache.put(
+        "movies-prd",
+        {"movieName": "The Dark Knight"},
+        {"movieName": "The Dark Knight", "year": 2008},
+    )
+
+    item = cache.get("movies-prd", {"movieName": "The Dark Knight"})
+    item["year"] = 2009
+
+    assert cache.get("movies-prd", {"movieName": "The Dark Knight"})["year"] == 2008
+    assert cache.get("series-prd", {"movieName": "The Dark Knight"}) is None
+    assert cache.stats() == {"hits": 2, "misses": 1, "evictions": 0, "size": 1}
+
+
+# LRU EVICTION
+def test_lru_eviction():
+
+    cache = ItemCache(max_size=2)
+    cache.put("movies-prd", {"movieName": "A"}, {"movieName": "A"})
+    cache.put("movies-prd", {"movieName": "B"}, {"movieName": "B"})
+    cache.get("movies-prd", {"movieName": "A"})
+    cache.put("movies-prd", {"movieName": "C"}, {"movieName": "C"})
+
+    assert cache.get("movies-prd", {"movieName": "B"}) is None
+    assert cache.get("movies-prd", {"movieName": "A"}) == {"movieName": "A"}
+    assert cache.get("movies-prd", {"movieName": "C"}) == {"movieName": "C"}
+    assert cache.stats()["evictions"] == 1
+
+
+# TTL
+def test_ttl(monkeypatch):
+
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now[0])
+
+    cache = ItemCache(ttl=10)
+    cache.put("movies-prd", {"movieName": "A"}, {"movieName": "A"})
+    cache.put("movies-prd", {"movieName": "B"}, {"movieName": "B"}, ttl=60)
+    now[0] += 30
+
+    assert cache.get("movies-prd", {"movieName": "A"}) is None
+    assert cache.get("movies-prd", {"movieName": "B"}) == {"movieName": "B"}
+    assert cache.stats()["size"] == 1
+
+
+# INVALIDATE
+def test_invalidate():
+
+    cache = ItemCache()
+    cache.put("movies-prd", {"movieName": "A", "genre": "action"}, {"movieName": "A"})
+    cache.put("movies-prd", {"movieName": "B"}, {"movieName": "B"})
+    cache.put("series-prd", {"movieName": "B"}, {"movieName": "B"})
+
+    assert cache.invalidate("movies-prd", {"genre": "action", "movieName": "A"}) is True
+    assert cache.invalidate("movies-prd", {"movieName": "A"}) is False
+    assert cache.invalidate_table("movies-prd") == 1
+    assert cache.stats()["size"] == 1
+
+    cache.clear()
+
+    assert cache.stats() == {"hits": 0, "misses": 0, "evictions": 0, "size": 0}
+
+
+# SCOPE
+def test_scope():
+
+    cache = ItemCache()
+    local, other = ("", "eu-west-1", ""), (
+        "arn:aws:iam::123456789012:role/test-role",
+        "eu-west-1",
+        "",
+    )
+    cache.put(
+        "movies-prd", {"movieName": "A"}, {"movieName": "A", "year": 2008}, scope=local
+    )
+
+    assert cache.get("movies-prd", {"movieName": "A"}, scope=other) is None
+    assert cache.get("movies-prd", {"movieName": "A"}, scope=local)["year"] == 2008
+    assert cache.invalidate_table("movies-prd", scope=other) == 0
+    assert cache.invalidate_table("movies-prd", scope=local) == 1
@@ -1,4 +1,11 @@
-from dynamodb.client import DynamoDBClient, ComparisonOperators
+import time
+
+import boto3
+import pytest
+from boto3.dynamodb.conditions import Attr, Key
+from dynamodb.client import ComparisonOperators, DynamoDBClient
+from inqdo_tools.dynamodb.cache import ItemCache
+from inqdo_tools.dynamodb.cursor import InvalidCursor
 
 
 # CREATE AND UPDATE
@@ -14,7 +21,9 @@ def test_create_and_update(dynamodb_resource, dynamodb_create_table):
 
 
 # CREATE AND UPDATE MISSING PRIMARY KEY
-def test_create_and_update_missing_primary_key(dynamodb_resource, dynamodb_create_table):
+def test_create_and_update_missing_primary_key(
+    dynamodb_resource, dynamodb_create_table
+):
 
     ddbclient = DynamoDBClient(table_name="movies-prd")
 
@@ -30,18 +39,12 @@ def test_create_and_update_missing_primary_key(dynamodb_resource, dynamodb_creat
 def test_client_create_and_update(dynamodb_client, dynamodb_client_create_table):
     ddbclient = DynamoDBClient(
         table_name="movies-prd",
-        arn="arn:aws:iam::123456789012:role/service-role/test-role"
+        arn="arn:aws:iam::123456789012:role/service-role/test-role",
     )
 
-    item = {
-        "movieName": "The Dark Knight",
-        "year": "2008",
-        "genre": "action"
-    }
+    item = {"movieName": "The Dark Knight", "year": "2008", "genre": "action"}
 
-    response = ddbclient.create_and_update(
-        data=item
-    )
+    response = ddbclient.create_and_update(data=item)
 
     assert response == {"Success": "Saved or updated item."}
 
@@ -78,6 +81,203 @@ def test_create_and_update_batch_missing_primary_key(
     assert data != {"Success": "Saved or updated items in batch."}
 
 
+# CREATE AND UPDATE BATCH PARALLEL
+def test_create_and_update_batch_parallel(dynamodb_resource, dynamodb_create_table):
+
+    ddbclient = DynamoDBClient(table_name="movies-prd")
+
+    data = ddbclient.create_and_update_batch(
+        batch_list=({"movieName": f"Movie {i:03d}", "year": i} for i in range(260)),
+        max_workers=3,
+    )
+
+    assert data == {"Success": "Saved or updated items in batch."}
+    assert len(ddbclient.read_all()) == 260
+
+
+# CREATE AND UPDATE BATCH FAILED ITEMS
+def test_create_and_update_batch_failed_items(dynamodb_resource, dynamodb_create_table):
+
+    ddbclient = DynamoDBClient(table_name="movies-prd")
+
+    data = ddbclient.create_and_update_batch(
+        batch_list=[
+            {"movieName": "The Godfather", "year": "1972"},
+            {"year": "2008", "genre": "1972"},
+            {"movieName": "The Dark Knight", "year": "2008"},
+        ]
+    )
+
+    assert data["Written"] == 2
+    assert [failed["Item"] for failed in data["Failed"]] == [
+        {"year": "2008", "genre": "1972"}
+    ]
+
+
+# CREATE AND UPDATE BATCH UNPROCESSED ITEMS
+def test_create_and_update_batch_unprocessed_items(
+    dynamodb_resource, dynamodb_create_table, monkeypatch
+):
+
+    ddbclient = DynamoDBClient(table_name="movies-prd")
+    batch_write_item = ddbclient.dynamodb_client.batch_write_item
+    calls = []
+
+    def throttled_batch_write_item(RequestItems):
+        calls.append(RequestItems)
+        requests = RequestItems["movies-prd"]
+        response = batch_write_item(RequestItems={"movies-prd": requests[:1]})
+        if len(requests) > 1:
+            response["UnprocessedItems"] = {"movies-prd": requests[1:]}
+        return response
+
+    monkeypatch.setattr(
+        ddbclient.dynamodb_client, "batch_write_item", throttled_batch_write_item
+    )
+
+    data = ddbclient.create_and_update_batch(
+        batch_list=[{"movieName": f"Movie {i}"} for i in range(3)]
+    )
+
+    assert data == {"Success": "Saved or updated items in batch."}
+    assert len(calls) == 3
+    assert len(ddbclient.read_all()) == 3
+
+
+# CLIENT CREATE AND UPDATE BATCH
+def test_client_create_and_update_batch(dynamodb_client, dynamodb_client_create_table):
+    ddbclient = DynamoDBClient(
+        table_name="movies-prd",
+        arn="arn:aws:iam::123456789012:role/service-role/test-role",
+    )
+
+    data = ddbclient.create_and_update_batch(
+        batch_list=[
+            {"movieName": "The Dark Knight", "year": "2008", "genre": "1972"},
+            {"movieName": "The Godfather", "year": "2008", "genre": "crime"},
+        ]
+    )
+
+    assert data == {"Success": "Saved or updated items in batch."}
+    assert len(ddbclient.read_all()) == 2
+
+
+# READ BATCH
+def test_read_batch(dynamodb_resource, dynamodb_put_items):
+
+    ddbclient = DynamoDBClient(table_name="movies-prd")
+    keys = [{"movieName": f"Movie {i:02d}"} for i in range(24, -1, -1)]
+
+    data = ddbclient.read_batch(
+        keys=keys + [{"movieName": "Unknown"}, {"movieName": "Movie 03"}]
+    )
+
+    assert [item["movieName"] for item in data[:25]] == [
+        key["movieName"] for key in keys
+    ]
+    assert data[25:] == [
+        None,
+        {"movieName": "Movie 03", "year": 2003, "genre": "action"},
+    ]
+
+
+# READ BATCH WITH PROJECTION
+def test_read_batch_with_projection(dynamodb_resource, dynamodb_put_items):
+
+    ddbclient = DynamoDBClient(table_name="movies-prd")
+
+    data = ddbclient.read_batch(
+        keys=[{"movieName": "Movie 02"}, {"movieName": "Movie 01"}], projection=["year"]
+    )
+
+    assert data == [
+        {"movieName": "Movie 02", "year": 2002},
+        {"movieName": "Movie 01", "year": 2001},
+    ]
+
+
+# READ BATCH MORE THAN ONE CHUNK
+def test_read_batch_chunks(dynamodb_resource, dynamodb_put_items):
+
+    ddbclient = DynamoDBClient(table_name="movies-prd")
+    keys = [{"movieName": f"Movie {i % 25:02d}"} for i in range(250)] + [
+        {"movieName": f"Missing {i}"} for i in range(150)
+    ]
+
+    data = ddbclient.read_batch(keys=keys, max_workers=2)
+
+    assert [item["movieName"] for item in data[:250]] == [
+        key["movieName"] for key in keys[:250]
+    ]
+    assert data[250:] == [None] * 150
+
+
+# READ BATCH UNPROCESSED KEYS
+def test_read_batch_unprocessed_keys(
+    dynamodb_resource, dynamodb_put_items, monkeypatch
+):
+
+    ddbclient = DynamoDBClient(table_name="movies-prd")
+    batch_get_item = ddbclient.dynamodb_client.batch_get_item
+    requests = []
+
+    def throttled_batch_get_item(RequestItems):
+        requests.append(RequestItems)
+        if len(requests) > 1:
+            return batch_get_item(RequestItems=RequestItems)
+
+        keys = RequestItems["movies-prd"]["Keys"]
+        response = batch_get_item(RequestItems={"movies-prd": {"Keys": keys[:1]}})
+        response["UnprocessedKeys"] = {"movies-prd": {"Keys": keys[1:]}}
+        return response
+
+    monkeypatch.setattr(
+        ddbclient.dynamodb_client, "batch_get_item", throttled_batch_get_item
+    )
+
+    data = ddbclient.read_batch(
+        keys=[{"movieName": "Movie 01"}, {"movieName": "Movie 02"}]
+    )
+
+    assert [item["movieName"] for item in data] == ["Movie 01", "Movie 02"]
+    assert len(requests) == 2
+
+
+# CLIENT READ WITH PROJECTION
+def test_client_read_with_projection(
+    dynamodb_client, dynamodb_client_create_table, dynamodb_client_put_item
+):
+    ddbclient = DynamoDBClient(
+        table_name="movies-prd",
+        arn="arn:aws:iam::123456789012:role/service-role/test-role",
+    )
+
+    data = ddbclient.read(
+        table_primary_key="movieName",
+        value_primary_key="The Dark Knight",
+        projection=["movieName", "year"],
+    )
+
+    assert data == {"movieName": "The Dark Knight", "year": "2008"}
+
+
+# CLIENT READ BATCH
+def test_client_read_batch(dynamodb_client, dynamodb_client_put_item):
+    ddbclient = DynamoDBClient(
+        table_name="movies-prd",
+        arn="arn:aws:iam::123456789012:role/service-role/test-role",
+    )
+
+    data = ddbclient.read_batch(
+        keys=[{"movieName": "Unknown"}, {"movieName": "The Dark Knight"}]
+    )
+
+    assert data == [
+        None,
+        {"movieName": "The Dark Knight", "year": "2008", "genre": "action"},
+    ]
+
+
 # DELETE
 def test_delete(dynamodb_resource, dynamodb_create_table, dynamodb_put_item):
 
@@ -91,15 +291,16 @@ def test_delete(dynamodb_resource, dynamodb_create_table, dynamodb_put_item):
 
 
 # CLIENT DELETE
-def test_client_delete(dynamodb_client, dynamodb_client_create_table, dynamodb_client_put_item):
+def test_client_delete(
+    dynamodb_client, dynamodb_client_create_table, dynamodb_client_put_item
+):
     ddbclient = DynamoDBClient(
         table_name="movies-prd",
-        arn="arn:aws:iam::123456789012:role/service-role/test-role"
+        arn="arn:aws:iam::123456789012:role/service-role/test-role",
     )
 
     data = ddbclient.delete(
-        table_primary_key="movieName",
-        value_primary_key="The Dark Knight"
+        table_primary_key="movieName", value_primary_key="The Dark Knight"
     )
 
     assert data == {"Success": "Deleted item from database."}
@@ -117,6 +318,137 @@ def test_delete_batch(dynamodb_resource, dynamodb_create_table):
     assert data == {"Success": "Deleted items in batch."}
 
 
+# CLIENT DELETE BATCH
+def test_client_delete_batch(
+    dynamodb_client, dynamodb_client_create_table, dynamodb_client_put_item
+):
+    ddbclient = DynamoDBClient(
+        table_name="movies-prd",
+        arn="arn:aws:iam::123456789012:role/service-role/test-role",
+    )
+
+    data = ddbclient.delete_batch(
+        table_primary_key="movieName", batch_list=["The Dark Knight", "The Godfather"]
+    )
+
+    assert data == {"Success": "Deleted items in batch."}
+    assert ddbclient.read_all() == []
+
+
+# DELETE BATCH WITH SORT KEY
+def test_delete_batch_with_sort_key(dynamodb_resource, dynamodb_put_items_with_indexes):
+
+    ddbclient = DynamoDBClient(table_name="readings-prd")
+
+    data = ddbclient.delete_batch(
+        table_primary_key="device",
+        batch_list=[
+            {"device": "device-0", "timestamp": 1000},
+            {"device": "device-1", "timestamp": 1001},
+        ],
+    )
+
+    assert data == {"Success": "Deleted items in batch."}
+    assert len(ddbclient.read_all()) == 18
+
+
+# DELETE PARTITION
+def test_delete_partition(dynamodb_resource, dynamodb_put_items_with_indexes):
+
+    ddbclient = DynamoDBClient(table_name="readings-prd")
+
+    data = ddbclient.delete_partition("device-0", page_size=3)
+
+    assert data == {"Success": "Deleted partition.", "Count": 10}
+    assert {item["device"] for item in ddbclient.read_all()} == {"device-1"}
+
+
+# DELETE PARTITION WITH SORT KEY CONDITION
+def test_delete_partition_with_sort_key(
+    dynamodb_resource, dynamodb_put_items_with_indexes, dynamodb_create_table
+):
+
+    ddbclient = DynamoDBClient(table_name="readings-prd")
+
+    data = ddbclient.delete_partition(
+        "device-1",
+        value_sort_key=1010,
+        comparison_operator=ComparisonOperators.GE,
+        max_workers=2,
+    )
+    remaining = ddbclient.query(table_primary_key="device", query_value="device-1")
+
+    assert data["Count"] == 5
+    assert [item["timestamp"] for item in remaining] == [1001, 1003, 1005, 1007, 1009]
+    assert "Error" in DynamoDBClient(table_name="movies-prd").delete_partition(
+        "The Dark Knight", value_sort_key="x"
+    )
+
+
+# DELETE WHERE
+def test_delete_where(
+    dynamodb_resource, dynamodb_put_items_with_indexes, dynamodb_segmented_scan
+):
+
+    ddbclient = DynamoDBClient(table_name="readings-prd", cache=True)
+    requested_segments = dynamodb_segmented_scan(ddbclient.dynamodb_client)
+    ddbclient.read(
+        table_primary_key="device",
+        value_primary_key="device-0",
+        table_sort_key="timestamp",
+        value_sort_key=1000,
+    )
+
+    data = ddbclient.delete_where(Attr("site").eq("utrecht"), total_segments=3)
+    remaining = ddbclient.read_all()
+
+    assert data == {"Success": "Deleted matching items.", "Count": 12}
+    assert {(0, 3), (1, 3), (2, 3)} <= set(requested_segments)
+    assert len(remaining) == 8 and {item["site"] for item in remaining} == {"amsterdam"}
+    assert ddbclient.cache.stats()["size"] == 0
+
+
+# DELETE WHERE WITH A SLOW DELETER
+def test_delete_where_backpressure(
+    dynamodb_resource, dynamodb_create_table, monkeypatch
+):
+
+    with dynamodb_resource.Table("movies-prd").batch_writer() as batch:
+        for i in range(500):
+            batch.put_item(Item={"movieName": f"Movie {i:03d}", "genre": "drama"})
+
+    ddbclient = DynamoDBClient(table_name="movies-prd")
+    scan = ddbclient.dynamodb_client.scan
+    batch_write_item = ddbclient.dynamodb_client.batch_write_item
+    counts = {"Scanned": 0, "Deleted": 0, "Held": 0}
+
+    def counting_scan(**kwargs):
+        response = scan(**kwargs)
+        counts["Scanned"] += len(response["Items"])
+        return response
+
+    def slow_batch_write_item(**kwargs):
+        # The keys that were scanned but not deleted yet are held in memory
+        counts["Held"] = max(counts["Held"], counts["Scanned"] - counts["Deleted"])
+        time.sleep(0.02)
+        response = batch_write_item(**kwargs)
+        counts["Deleted"] += len(kwargs["RequestItems"]["movies-prd"])
+        return response
+
+    monkeypatch.setattr(ddbclient.dynamodb_client, "scan", counting_scan)
+    monkeypatch.setattr(
+        ddbclient.dynamodb_client, "batch_write_item", slow_batch_write_item
+    )
+
+    data = ddbclient.delete_where(
+        {"genre": "drama"}, total_segments=1, max_workers=1, page_size=10
+    )
+
+    assert data == {"Success": "Deleted matching items.", "Count": 500}
+    # A few pages in the fan-out and a few batches in the writer, instead of the whole table
+    assert counts["Held"] <= 150
+
+
 # READ
 def test_read(dynamodb_resource, dynamodb_create_table, dynamodb_put_item):
 
@@ -129,9 +461,27 @@ def test_read(dynamodb_resource, dynamodb_create_table, dynamodb_put_item):
     assert data == {"movieName": "The Dark Knight", "year": "2008", "genre": "action"}
 
 
+# READ WITH PROJECTION
+def test_read_with_projection(
+    dynamodb_resource, dynamodb_create_table, dynamodb_put_item
+):
+
+    ddbclient = DynamoDBClient(table_name="movies-prd")
+
+    data = ddbclient.read(
+        table_primary_key="movieName",
+        value_primary_key="The Dark Knight",
+        projection=["year"],
+    )
+
+    assert data == {"year": "2008"}
+
+
 # READ SORT KEY
 def test_read_with_sort_key(
-    dynamodb_resource, dynamodb_create_table_with_range_key, dynamodb_put_item_with_range
+    dynamodb_resource,
+    dynamodb_create_table_with_range_key,
+    dynamodb_put_item_with_range,
 ):
 
     ddbclient = DynamoDBClient(table_name="movies-prd")
@@ -147,15 +497,16 @@ def test_read_with_sort_key(
 
 
 # CLIENT READ
-def test_client_read(dynamodb_client, dynamodb_client_create_table, dynamodb_client_put_item):
+def test_client_read(
+    dynamodb_client, dynamodb_client_create_table, dynamodb_client_put_item
+):
     ddbclient = DynamoDBClient(
         table_name="movies-prd",
-        arn="arn:aws:iam::123456789012:role/service-role/test-role"
+        arn="arn:aws:iam::123456789012:role/service-role/test-role",
     )
 
     data = ddbclient.read(
-        table_primary_key="movieName",
-        value_primary_key="The Dark Knight"
+        table_primary_key="movieName", value_primary_key="The Dark Knight"
     )
 
     assert data == {"movieName": "The Dark Knight", "year": "2008", "genre": "action"}
@@ -171,22 +522,260 @@ def test_read_all(dynamodb_resource, dynamodb_create_table, dynamodb_put_item):
     assert data == [{"movieName": "The Dark Knight", "year": "2008", "genre": "action"}]
 
 
+# READ ALL WITH PROJECTION
+def test_read_all_with_projection(
+    dynamodb_resource, dynamodb_create_table, dynamodb_put_item
+):
+
+    ddbclient = DynamoDBClient(table_name="movies-prd")
+
+    data = ddbclient.read_all(projection=["genre"])
+
+    assert data == [{"genre": "action"}]
+
+
+# READ ALL PARALLEL
+def test_read_all_parallel(
+    dynamodb_resource, dynamodb_put_items, dynamodb_segmented_scan
+):
+
+    ddbclient = DynamoDBClient(table_name="movies-prd")
+    requested_segments = dynamodb_segmented_scan(ddbclient.dynamodb_client)
+
+    data = ddbclient.read_all(total_segments=4)
+
+    assert sorted(requested_segments) == [(0, 4), (1, 4), (2, 4), (3, 4)]
+    assert len(data) == 25
+    assert sorted(item["movieName"] for item in data) == [
+        f"Movie {i:02d}" for i in range(25)
+    ]
+
+
+# READ ALL PARALLEL WITH FILTER AND PROJECTION
+def test_read_all_parallel_filter_projection(dynamodb_resource, dynamodb_put_items):
+
+    ddbclient = DynamoDBClient(table_name="movies-prd")
+
+    data = ddbclient.read_all(
+        total_segments=1,
+        filter_expression=Attr("genre").eq("drama") & Attr("year").gte(2010),
+        projection=["movieName", "year"],
+    )
+
+    assert sorted(data, key=lambda item: item["year"]) == [
+        {"movieName": f"Movie {i:02d}", "year": 2000 + i} for i in range(10, 25, 2)
+    ]
+
+
+# READ ALL PARALLEL WITH CALLBACK
+def test_read_all_parallel_callback(dynamodb_resource, dynamodb_put_items):
+
+    ddbclient = DynamoDBClient(table_name="movies-prd")
+    names = []
+
+    data = ddbclient.read_all(
+        total_segments=1, item_callback=lambda item: names.append(item["movieName"])
+    )
+
+    assert data == {"Success": "Scanned items in parallel.", "Count": 25}
+    assert len(names) == 25
+
+
+# CLIENT READ ALL PARALLEL
+def test_client_read_all_parallel(dynamodb_client, dynamodb_client_put_item):
+    ddbclient = DynamoDBClient(
+        table_name="movies-prd",
+        arn="arn:aws:iam::123456789012:role/service-role/test-role",
+    )
+
+    data = ddbclient.read_all(total_segments=1)
+
+    assert data == [{"movieName": "The Dark Knight", "year": "2008", "genre": "action"}]
+
+
+# ITER SCAN
+def test_iter_scan(dynamodb_resource, dynamodb_put_items):
+
+    ddbclient = DynamoDBClient(table_name="movies-prd")
+
+    pages = list(ddbclient.iter_scan(page_size=10, pages=True))
+    items = list(ddbclient.iter_scan(page_size=10, projection=["movieName"]))
+
+    assert [len(page) for page in pages] == [10, 10, 5]
+    assert sorted(items, key=lambda item: item["movieName"]) == [
+        {"movieName": f"Movie {i:02d}"} for i in range(25)
+    ]
+
+
+# NATIVE NUMBERS
+def test_read_native_numbers(dynamodb_resource, dynamodb_put_items):
+
+    ddbclient = DynamoDBClient(table_name="movies-prd", numbers="native")
+
+    item = ddbclient.read(table_primary_key="movieName", value_primary_key="Movie 07")
+    items = ddbclient.read_batch(keys=[{"movieName": "Movie 01"}])
+
+    assert type(item["year"]) is int and item["year"] == 2007
+    assert type(items[0]["year"]) is int
+
+
+# READ WITH CACHE
+def test_read_with_cache(dynamodb_resource, dynamodb_put_items, monkeypatch):
+
+    cache = ItemCache()
+    ddbclient = DynamoDBClient(table_name="movies-prd", cache=cache)
+    get_item = ddbclient.dynamodb_client.get_item
+    calls = []
+
+    def counting_get_item(**kwargs):
+        calls.append(kwargs)
+        return get_item(**kwargs)
+
+    monkeypatch.setattr(ddbclient.dynamodb_client, "get_item", counting_get_item)
+
+    first = ddbclient.read(table_primary_key="movieName", value_primary_key="Movie 07")
+    second = ddbclient.read(table_primary_key="movieName", value_primary_key="Movie 07")
+    ddbclient.read(
+        table_primary_key="movieName", value_primary_key="Movie 07", projection=["year"]
+    )
+    ddbclient.read(table_primary_key="movieName", value_primary_key="Unknown")
+
+    assert first == second == {"movieName": "Movie 07", "year": 2007, "genre": "action"}
+    assert len(calls) == 3
+    assert cache.stats() == {"hits": 1, "misses": 2, "evictions": 0, "size": 1}
+
+
+# CACHE INVALIDATION ON WRITES
+def test_cache_invalidated_by_writes(dynamodb_resource, dynamodb_put_items):
+
+    ddbclient = DynamoDBClient(table_name="movies-prd", cache=True)
+
+    def read(name):
+        return ddbclient.read(table_primary_key="movieName", value_primary_key=name)
+
+    read("Movie 01"), read("Movie 02"), read("Movie 03"), read("Movie 04")
+
+    ddbclient.create_and_update(data={"movieName": "Movie 01", "year": 1999})
+    ddbclient.update(
+        table_primary_key="movieName",
+        value_primary_key="Movie 02",
+        update_expression="SET genre = :g",
+        expression_values={":g": "comedy"},
+    )
+    ddbclient.delete(table_primary_key="movieName", value_primary_key="Movie 03")
+    ddbclient.create_and_update_batch(
+        batch_list=[{"movieName": "Movie 04", "year": 1997}]
+    )
+
+    assert read("Movie 01") == {"movieName": "Movie 01", "year": 1999}
+    assert read("Movie 02")["genre"] == "comedy"
+    assert read("Movie 03").startswith("No items found.")
+    assert read("Movie 04") == {"movieName": "Movie 04", "year": 1997}
+    assert ddbclient.cache.stats()["size"] == 3
+
+
+# CACHE SHARED BETWEEN REGIONS
+def test_cache_shared_between_regions(dynamodb_resource, dynamodb_put_item):
+
+    boto3.resource("dynamodb", region_name="us-east-1").create_table(
+        TableName="movies-prd",
+        KeySchema=[{"AttributeName": "movieName", "KeyType": "HASH"}],
+        AttributeDefinitions=[{"AttributeName": "movieName", "AttributeType": "S"}],
+        BillingMode="PAY_PER_REQUEST",
+    )
+    cache = ItemCache()
+    ireland = DynamoDBClient(table_name="movies-prd", cache=cache)
+    virginia = DynamoDBClient(
+        table_name="movies-prd", region_name="us-east-1", cache=cache
+    )
+
+    assert ireland.read(value_primary_key="The Dark Knight")["year"] == "2008"
+    assert virginia.read(value_primary_key="The Dark Knight").startswith(
+        "No items found."
+    )
+
+
+# CACHE INVALIDATION AFTER BATCH WRITES
+def test_cache_invalidated_after_batch_writes(
+    dynamodb_resource, dynamodb_put_items, monkeypatch
+):
+
+    ddbclient = DynamoDBClient(table_name="movies-prd", cache=True)
+    batch_write_item = ddbclient.dynamodb_client.batch_write_item
+
+    def read(name):
+        return ddbclient.read(table_primary_key="movieName", value_primary_key=name)
+
+    def racing_batch_write_item(**kwargs):
+        # A concurrent read just before the batch is written caches the old items
+        read("Movie 05"), read("Movie 06")
+        return batch_write_item(**kwargs)
+
+    monkeypatch.setattr(
+        ddbclient.dynamodb_client, "batch_write_item", racing_batch_write_item
+    )
+
+    ddbclient.create_and_update_batch(
+        batch_list=[{"movieName": "Movie 05", "year": 1995}]
+    )
+    ddbclient.delete_batch(batch_list=["Movie 06"])
+
+    assert read("Movie 05") == {"movieName": "Movie 05", "year": 1995}
+    assert read("Movie 06").startswith("No items found.")
+
+
+# ITER QUERY
+def test_iter_query(dynamodb_resource, dynamodb_put_items_for_query):
+
+    ddbclient = DynamoDBClient(table_name="players-prd")
+
+    items = ddbclient.iter_query(
+        table_primary_key="name", query_value="inQdo", page_size=7
+    )
+    pages = ddbclient.iter_query(
+        key_condition=Key("name").eq("inQdo") & Key("number").gte("20"),
+        filter_expression=Attr("position").eq("player"),
+        pages=True,
+        page_size=5,
+    )
+
+    assert [item["number"] for item in items] == [f"{i:02d}" for i in range(30)]
+    assert [len(page) for page in pages] == [5, 5]
+
+
+# QUERY ALL PAGES
+def test_query_all_pages(dynamodb_resource, dynamodb_put_items_for_query):
+
+    ddbclient = DynamoDBClient(table_name="players-prd")
+
+    data = ddbclient.query(
+        table_primary_key="name",
+        value_primary_key="inQdo",
+        query_value="03",
+        table_sort_key="number",
+        comparison_operator=ComparisonOperators.GE,
+        page_size=4,
+    )
+
+    assert len(data) == 27
+
+
 # CLIENT UPDATE
-def test_client_update(dynamodb_client, dynamodb_client_create_table, dynamodb_client_put_item):
+def test_client_update(
+    dynamodb_client, dynamodb_client_create_table, dynamodb_client_put_item
+):
     ddbclient = DynamoDBClient(
         table_name="movies-prd",
-        arn="arn:aws:iam::123456789012:role/service-role/test-role"
+        arn="arn:aws:iam::123456789012:role/service-role/test-role",
     )
 
-    item = {
-        ":value": {"S": "romantic"}
-    }
+    item = {":value": {"S": "romantic"}}
 
     data = ddbclient.update(
         table_primary_key="movieName",
         value_primary_key="The Dark Knight",
         update_expression="SET genre = :value",
-        expression_values=item
+        expression_values=item,
     )
 
     assert data == {"movieName": "The Dark Knight", "year": "2008", "genre": "romantic"}
@@ -207,6 +796,22 @@ def test_query_single(
     assert data == [{"name": "inQdo", "number": "5"}]
 
 
+# QUERY WITH PROJECTION
+def test_query_with_projection(
+    dynamodb_resource, dynamodb_create_table, dynamodb_put_item_for_query
+):
+
+    ddbclient = DynamoDBClient(table_name="players-prd")
+
+    data = ddbclient.query(
+        table_primary_key="name",
+        query_value="inQdo",
+        projection=["number"],
+    )
+
+    assert data == [{"number": "5"}]
+
+
 # QUERY WITH SORT KEY
 def test_query_with_sort_key(
     dynamodb_resource, dynamodb_create_table, dynamodb_put_item_for_query
@@ -225,6 +830,40 @@ def test_query_with_sort_key(
     assert data == [{"name": "inQdo", "number": "5"}]
 
 
+# QUERY KEY VALUE TYPES
+def test_query_key_value_types(
+    dynamodb_resource,
+    dynamodb_create_table,
+    dynamodb_put_item_for_query,
+    dynamodb_put_items_with_indexes,
+):
+
+    players = DynamoDBClient(table_name="players-prd")
+    readings = DynamoDBClient(table_name="readings-prd")
+
+    data = players.query(
+        table_primary_key="name",
+        value_primary_key="inQdo",
+        query_value=6,
+        table_sort_key="number",
+        comparison_operator=ComparisonOperators.LT,
+    )
+    newer = readings.query(
+        value_primary_key="device-1",
+        query_value="1015",
+        comparison_operator=ComparisonOperators.GT,
+    )
+    between = readings.query(
+        value_primary_key="device-0",
+        query_value=("1002", 1006),
+        comparison_operator=ComparisonOperators.BETWEEN,
+    )
+
+    assert data == [{"name": "inQdo", "number": "5"}]
+    assert [item["timestamp"] for item in newer] == [1017, 1019]
+    assert [item["timestamp"] for item in between] == [1002, 1004, 1006]
+
+
 # QUERY WITH SORT KEY
 def test_query_no_result(
     dynamodb_resource, dynamodb_create_table, dynamodb_put_item_for_query
@@ -266,7 +905,7 @@ def test_client_query_single(
 ):
     ddbclient = DynamoDBClient(
         table_name="players-prd",
-        arn="arn:aws:iam::123456789012:role/service-role/test-role"
+        arn="arn:aws:iam::123456789012:role/service-role/test-role",
     )
 
     data = ddbclient.query(
@@ -283,7 +922,7 @@ def test_client_query_with_sort_key(
 ):
     ddbclient = DynamoDBClient(
         table_name="players-prd",
-        arn="arn:aws:iam::123456789012:role/service-role/test-role"
+        arn="arn:aws:iam::123456789012:role/service-role/test-role",
     )
 
     data = ddbclient.query(
@@ -303,7 +942,7 @@ def test_client_query_no_result(
 ):
     ddbclient = DynamoDBClient(
         table_name="players-prd",
-        arn="arn:aws:iam::123456789012:role/service-role/test-role"
+        arn="arn:aws:iam::123456789012:role/service-role/test-role",
     )
 
     data = ddbclient.query(
@@ -323,7 +962,7 @@ def test_client_query_missing_keys(
 ):
     ddbclient = DynamoDBClient(
         table_name="players-prd",
-        arn="arn:aws:iam::123456789012:role/service-role/test-role"
+        arn="arn:aws:iam::123456789012:role/service-role/test-role",
     )
 
     data = ddbclient.query(
@@ -334,3 +973,312 @@ def test_client_query_missing_keys(
     )
 
     assert data["Error"] == "Something went wrong."
+
+
+# INDEX QUERY GSI BETWEEN
+def test_index_query_global_index_between(
+    dynamodb_resource, dynamodb_put_items_with_indexes
+):
+
+    ddbclient = DynamoDBClient(table_name="readings-prd")
+
+    data = ddbclient.index_query(
+        index_name="by-site",
+        index_primary_key="site",
+        value_primary_key="utrecht",
+        index_sort_key="timestamp",
+        value_sort_key=(1003, 1006),
+        comparison_operator=ComparisonOperators.BETWEEN,
+    )
+
+    assert [item["timestamp"] for item in data] == [1003, 1004, 1005, 1006]
+
+
+# INDEX QUERY REVERSE WITH LIMIT
+def test_index_query_reverse_limit(dynamodb_resource, dynamodb_put_items_with_indexes):
+
+    ddbclient = DynamoDBClient(table_name="readings-prd")
+
+    data = ddbclient.index_query(
+        index_name="by-site",
+        index_primary_key="site",
+        value_primary_key="amsterdam",
+        reverse=True,
+        limit=3,
+        page_size=2,
+    )
+
+    assert [item["timestamp"] for item in data] == [1019, 1018, 1017]
+
+
+# INDEX QUERY LSI BEGINS WITH
+def test_index_query_local_index_begins_with(
+    dynamodb_resource, dynamodb_put_items_with_indexes
+):
+
+    ddbclient = DynamoDBClient(table_name="readings-prd")
+
+    data = ddbclient.index_query(
+        index_name="by-status",
+        index_primary_key="device",
+        value_primary_key="device-0",
+        index_sort_key="status",
+        value_sort_key="error",
+        comparison_operator=ComparisonOperators.BEGINS_WITH,
+        projection=["status", "value"],
+    )
+
+    assert data == [{"status": f"error-{i:02d}", "value": i} for i in (0, 6, 12, 18)]
+
+
+# INDEX QUERY NOT EQUAL
+def test_index_query_not_equal(dynamodb_resource, dynamodb_put_items_with_indexes):
+
+    ddbclient = DynamoDBClient(table_name="readings-prd")
+
+    data = ddbclient.index_query(
+        index_name="by-status",
+        index_primary_key="device",
+        value_primary_key="device-0",
+        index_sort_key="status",
+        value_sort_key="ok-02",
+        comparison_operator=ComparisonOperators.NE,
+    )
+
+    assert data["Error"] == "Something went wrong."
+
+
+# INDEX QUERY CLIENT
+def test_client_index_query(dynamodb_client, dynamodb_put_items_with_indexes):
+
+    ddbclient = DynamoDBClient(
+        table_name="readings-prd",
+        arn="arn:aws:iam::123456789012:role/service-role/test-role",
+    )
+
+    data = ddbclient.index_query(
+        index_name="by-site",
+        index_primary_key="site",
+        value_primary_key="amsterdam",
+        index_sort_key="timestamp",
+        value_sort_key=1015,
+        comparison_operator=ComparisonOperators.GT,
+        reverse=True,
+    )
+
+    assert [item["timestamp"] for item in data] == [1019, 1018, 1017, 1016]
+
+
+# QUERY PAGE
+def test_query_page(dynamodb_resource, dynamodb_put_items_for_query):
+
+    ddbclient = DynamoDBClient(table_name="players-prd", cursor_secret="secret")
+    pages = []
+    cursor = None
+
+    while True:
+        items, cursor = ddbclient.query_page(
+            table_primary_key="name",
+            query_value="inQdo",
+            cursor=cursor,
+            page_size=12,
+            reverse=True,
+        )
+        pages.append([item["number"] for item in items])
+        if cursor is None:
+            break
+
+    assert [len(page) for page in pages] == [12, 12, 6]
+    assert sum(pages, []) == [f"{i:02d}" for i in range(29, -1, -1)]
+
+
+# QUERY PAGE INVALID CURSOR
+def test_query_page_invalid_cursor(dynamodb_resource, dynamodb_put_items_for_query):
+
+    ddbclient = DynamoDBClient(table_name="players-prd", cursor_secret="secret")
+    _, cursor = ddbclient.query_page(
+        table_primary_key="name", query_value="inQdo", page_size=5
+    )
+
+    with pytest.raises(InvalidCursor):
+        DynamoDBClient(table_name="players-prd").query_page(
+            table_primary_key="name",
+            query_value="inQdo",
+            cursor=cursor[:-2],
+            page_size=5,
+        )
+
+    with pytest.raises(InvalidCursor):
+        ddbclient.scan_page(cursor=cursor)
+
+
+# SCAN PAGE
+def test_scan_page(dynamodb_resource, dynamodb_put_items):
+
+    ddbclient = DynamoDBClient(table_name="movies-prd")
+
+    first, cursor = ddbclient.scan_page(page_size=20, projection=["movieName"])
+    second, last_cursor = ddbclient.scan_page(
+        cursor=cursor, page_size=20, projection=["movieName"]
+    )
+
+    assert len(first) == 20 and len(second) == 5 and last_cursor is None
+    assert sorted(item["movieName"] for item in first + second) == [
+        f"Movie {i:02d}" for i in range(25)
+    ]
+
+
+# QUERY MANY
+def test_query_many(dynamodb_resource, dynamodb_put_items_with_indexes):
+
+    ddbclient = DynamoDBClient(table_name="readings-prd")
+
+    data = list(
+        ddbclient.query_many(
+            table_primary_key="device",
+            partition_values=["device-0", "device-1", "device-2"],
+            sort_key="timestamp",
+            value_sort_key=1010,
+            comparison_operator=ComparisonOperators.GE,
+            page_size=3,
+            max_workers=2,
+        )
+    )
+
+    assert sorted(item["timestamp"] for item in data) == list(range(1010, 1020))
+
+
+# QUERY MANY DEFAULT SORT KEY
+def test_query_many_default_sort_key(
+    dynamodb_resource, dynamodb_put_items_with_indexes, dynamodb_create_table
+):
+
+    ddbclient = DynamoDBClient(table_name="readings-prd")
+
+    data = list(
+        ddbclient.query_many(
+            table_primary_key="device",
+            partition_values=["device-0", "device-1"],
+            value_sort_key=1009,
+            comparison_operator=ComparisonOperators.GT,
+        )
+    )
+    sites = list(
+        ddbclient.query_many(
+            table_primary_key="site",
+            partition_values=["utrecht", "amsterdam"],
+            value_sort_key=(1010, 1013),
+            comparison_operator=ComparisonOperators.BETWEEN,
+            index_name="by-site",
+        )
+    )
+
+    assert sorted(item["timestamp"] for item in data) == list(range(1010, 1020))
+    assert sorted(item["timestamp"] for item in sites) == list(range(1010, 1014))
+
+    with pytest.raises(ValueError):
+        DynamoDBClient(table_name="movies-prd").query_many(
+            "movieName", ["Movie 01"], value_sort_key=1
+        )
+
+
+# QUERY MANY ORDERED
+def test_query_many_ordered(dynamodb_resource, dynamodb_put_items_with_indexes):
+
+    ddbclient = DynamoDBClient(table_name="readings-prd")
+
+    ascending = ddbclient.query_many(
+        table_primary_key="device",
+        partition_values=["device-0", "device-1"],
+        ordered=True,
+        page_size=4,
+    )
+    descending = ddbclient.query_many(
+        table_primary_key="device",
+        partition_values=["device-1", "device-0"],
+        sort_key="timestamp",
+        value_sort_key=(1002, 1008),
+        comparison_operator=ComparisonOperators.BETWEEN,
+        ordered=True,
+        reverse=True,
+    )
+
+    assert [item["timestamp"] for item in ascending] == list(range(1000, 1020))
+    assert [item["timestamp"] for item in descending] == list(range(1008, 1001, -1))
+
+
+# QUERY MANY DEADLINE
+def test_query_many_deadline(
+    dynamodb_resource, dynamodb_put_items_with_indexes, monkeypatch
+):
+
+    ddbclient = DynamoDBClient(table_name="readings-prd")
+    query = ddbclient.dynamodb_client.query
+
+    def slow_query(**kwargs):
+        time.sleep(0.2)
+        return query(**kwargs)
+
+    monkeypatch.setattr(ddbclient.dynamodb_client, "query", slow_query)
+
+    with pytest.raises(TimeoutError):
+        list(
+            ddbclient.query_many(
+                table_primary_key="device",
+                partition_values=[f"device-{i}" for i in range(10)],
+                max_workers=2,
+                timeout=0.3,
+            )
+        )
+
+
+# COUNT
+def test_count(dynamodb_resource, dynamodb_put_items_with_indexes, monkeypatch):
+
+    ddbclient = DynamoDBClient(table_name="readings-prd")
+    query = ddbclient.dynamodb_client.query
+    requests = []
+
+    def recording_query(**kwargs):
+        requests.append(kwargs)
+        return query(**kwargs)
+
+    monkeypatch.setattr(ddbclient.dynamodb_client, "query", recording_query)
+
+    partition = ddbclient.count(query_value="device-0")
+    filtered = ddbclient.count(
+        table_primary_key="device",
+        query_value="device-1",
+        filter_expression={"value__gte": 15},
+    )
+    newer = ddbclient.count(
+        value_primary_key="device-1",
+        query_value=1015,
+        comparison_operator=ComparisonOperators.GT,
+    )
+    site = ddbclient.count(
+        key_condition=Key("site").eq("amsterdam"), index_name="by-site"
+    )
+
+    # moto reports the size of the table as ScannedCount of a query
+    assert partition["Count"] == 10 and filtered["Count"] == 3
+    assert newer["Count"] == 2 and site["Count"] == 8
+    assert filtered["ScannedCount"] >= 10
+    assert all(request["Select"] == "COUNT" for request in requests)
+
+
+# COUNT ALL
+def test_count_all(dynamodb_resource, dynamodb_put_items, dynamodb_segmented_scan):
+
+    ddbclient = DynamoDBClient(table_name="movies-prd")
+
+    assert ddbclient.count_all() == {"Count": 25, "ScannedCount": 25}
+    assert (
+        ddbclient.count_all(filter_expression=Attr("genre").eq("drama"))["Count"] == 13
+    )
+
+    segments = dynamodb_segmented_scan(ddbclient.dynamodb_client)
+    count = ddbclient.count_all(filter_expression={"year__lt": 2010}, total_segments=4)
+
+    assert count["Count"] == 10
+    assert sorted(segments) == [(segment, 4) for segment in range(4)]
@@ -0,0 +1,138 @@
+import os
+from decimal import Decimal
+
+import pytest
+from dynamodb.client import DynamoDBClient
+from inqdo_tools.dynamodb.compression import (
+    MARKER,
+    AttributeCompressor,
+    attribute_value_size,
+    is_compressed,
+    item_size,
+)
+from inqdo_tools.dynamodb.serializer import serializer
+
+BLOB = {
+    "readings": [
+        {"sensor": f"s{i}", "value": Decimal(i), "ok": True} for i in range(200)
+    ],
+    "tags": {"a", "b"},
+}
+
+
+# ROUND TRIP
+@pytest.mark.parametrize("algorithm", ["zlib", "lzma"])
+def test_compress_item(algorithm):
+
+    compressor = AttributeCompressor(["blob"], threshold=100, algorithm=algorithm)
+    item = serializer.serialize_item({"id": "a", "blob": BLOB, "small": "x"})
+
+    compressed = compressor.compress_item(item)
+
+    assert is_compressed(compressed["blob"]) and compressed["blob"]["B"].startswith(
+        MARKER
+    )
+    assert (
+        compressed["small"] == item["small"]
+        and "blob" in item
+        and not is_compressed(item["blob"])
+    )
+    assert item_size(compressed) < item_size(item)
+    assert AttributeCompressor.decompress_item(compressed) == item
+
+
+# THRESHOLD AND INCOMPRESSIBLE VALUES
+def test_compress_item_skipped():
+
+    compressor = AttributeCompressor(["blob", "random"], threshold=1024)
+    item = serializer.serialize_item({"blob": "short", "random": os.urandom(2048)})
+
+    assert compressor.compress_item(item) is item
+    assert AttributeCompressor.decompress_item(item) is item
+
+    with pytest.raises(ValueError):
+        AttributeCompressor(["blob"], algorithm="gzip")
+
+
+# SIZE ESTIMATES
+def test_item_size():
+
+    assert attribute_value_size({"S": "héllo"}) == 6
+    assert attribute_value_size({"N": "123.45"}) == 4
+    assert attribute_value_size({"N": "-1000"}) == 2
+    assert attribute_value_size({"BOOL": True}) == 1
+    assert attribute_value_size({"L": [{"S": "ab"}, {"NULL": True}]}) == 3 + 3 + 2
+    assert attribute_value_size({"M": {"k": {"S": "ab"}}}) == 3 + 1 + 1 + 2
+    assert item_size({"id": {"S": "abc"}, "tags": {"SS": ["a", "bc"]}}) == 2 + 3 + 4 + 3
+
+
+# CLIENT
+def test_client_compression(dynamodb_resource, dynamodb_create_table):
+
+    ddbclient = DynamoDBClient(
+        table_name="movies-prd", compression=AttributeCompressor(["plot"], threshold=64)
+    )
+    movie = {"movieName": "The Dark Knight", "plot": BLOB}
+
+    ddbclient.create_and_update(movie)
+    ddbclient.create_and_update_batch(
+        batch_list=[{"movieName": f"Movie {i}", "plot": BLOB} for i in range(3)]
+    )
+
+    stored = dynamodb_resource.Table("movies-prd").get_item(
+        Key={"movieName": "The Dark Knight"}
+    )["Item"]
+    size = ddbclient.item_size(movie)
+
+    assert stored["plot"].value.startswith(MARKER)
+    assert (
+        ddbclient.read(
+            table_primary_key="movieName", value_primary_key="The Dark Knight"
+        )
+        == movie
+    )
+    assert ddbclient.query(table_primary_key="movieName", query_value="Movie 1") == [
+        {"movieName": "Movie 1", "plot": BLOB}
+    ]
+    assert all(item["plot"] == BLOB for item in ddbclient.read_all())
+    assert size["CompressedSize"] < size["Size"] and size["Fits"]
+    assert size["CompressedWriteCapacityUnits"] < size["WriteCapacityUnits"]
+
+
+# TRANSACTION
+def test_client_compression_in_transaction(dynamodb_resource, dynamodb_create_table):
+
+    ddbclient = DynamoDBClient(
+        table_name="movies-prd", compression=AttributeCompressor(["plot"], threshold=64)
+    )
+    table = dynamodb_resource.Table("movies-prd")
+
+    with ddbclient.transaction() as transaction:
+        transaction.put({"movieName": "The Dark Knight", "plot": BLOB})
+        transaction.put({"movieName": "Batman Begins", "plot": {}})
+    with ddbclient.transaction() as transaction:
+        transaction.update(
+            {"movieName": "Batman Begins"},
+            "SET #p = :p, #y = :y",
+            expression_values={":p": BLOB, ":y": 2005},
+            expression_names={"#p": "plot", "#y": "year"},
+        )
+
+    for movie_name in ("The Dark Knight", "Batman Begins"):
+        stored = table.get_item(Key={"movieName": movie_name})["Item"]
+        assert stored["plot"].value.startswith(MARKER)
+        assert (
+            ddbclient.read(table_primary_key="movieName", value_primary_key=movie_name)[
+                "plot"
+            ]
+            == BLOB
+        )
+
+    assert table.get_item(Key={"movieName": "Batman Begins"})["Item"]["year"] == 2005
+
+
+# KEY ATTRIBUTES
+def test_client_compression_of_key(dynamodb_resource, dynamodb_create_table):
+
+    with pytest.raises(ValueError):
+        DynamoDBClient(table_name="movies-prd", compression=["movieName"])
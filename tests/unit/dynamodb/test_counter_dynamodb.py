@@ -0,0 +1,65 @@
+import pytest
+from dynamodb.client import DynamoDBClient
+
+
+# INCREMENT AND READ
+def test_counter(dynamodb_resource, dynamodb_create_table):
+
+    counter = DynamoDBClient(table_name="movies-prd", numbers="native").counter(
+        shards=4
+    )
+
+    for _ in range(40):
+        counter.increment("views")
+    counter.increment("views", amount=-5)
+    counter.increment("likes", amount=3)
+
+    assert counter.value("views") == 35
+    assert counter.values(["views", "likes", "shares"]) == {
+        "views": 35,
+        "likes": 3,
+        "shares": 0,
+    }
+
+    shards = {
+        item["movieName"]
+        for item in dynamodb_resource.Table("movies-prd").scan()["Items"]
+    }
+    assert len(shards) > 1 and shards <= set(
+        counter.shard_keys("views") + counter.shard_keys("likes")
+    )
+
+
+# SHARD COUNT PER KEY
+def test_counter_shard_counts(dynamodb_resource, dynamodb_create_table):
+
+    counter = DynamoDBClient(table_name="movies-prd").counter(
+        shards=2, shard_counts={"views": 150}
+    )
+
+    for _ in range(30):
+        counter.increment("views")
+        counter.increment("likes")
+
+    assert counter.shard_keys("likes") == ["likes#0", "likes#1"]
+    assert len(counter.shard_keys("views")) == 150
+    assert counter.values(["views", "likes"]) == {"views": 30, "likes": 30}
+
+
+# CLIENT COUNTER
+def test_client_counter(dynamodb_client, dynamodb_resource, dynamodb_create_table):
+
+    counter = DynamoDBClient(
+        table_name="movies-prd",
+        arn="arn:aws:iam::123456789012:role/service-role/test-role",
+    ).counter()
+    counter.increment("views", amount=2)
+
+    assert counter.value("views") == 2
+
+
+# TABLE WITH SORT KEY
+def test_counter_with_sort_key(dynamodb_resource, dynamodb_create_table_with_range_key):
+
+    with pytest.raises(ValueError):
+        DynamoDBClient(table_name="movies-prd").counter()
@@ -0,0 +1,53 @@
+import pytest
+from inqdo_tools.dynamodb.cursor import Cursor, InvalidCursor
+
+KEY = {"name": {"S": "inQdo"}, "number": {"N": "5"}, "hash": {"B": b"\xff\x00"}}
+
+
+# ENCODE AND DECODE
+def test_encode_decode():
+
+    cursor = Cursor()
+    token = cursor.encode(KEY)
+
+    assert all(c.isalnum() or c in "-_" for c in token)
+    assert cursor.decode(token) == KEY
+    assert cursor.encode(None) is None
+    assert cursor.decode(None) is None
+
+
+# SIGNED
+def test_signed():
+
+    cursor = Cursor(secret="secret")
+    token = cursor.encode(KEY, scope="players-prd")
+
+    assert cursor.decode(token, scope="players-prd") == KEY
+
+    with pytest.raises(InvalidCursor):
+        cursor.decode(token, scope="movies-prd")
+
+    with pytest.raises(InvalidCursor):
+        Cursor(secret="other").decode(token, scope="players-prd")
+
+    with pytest.raises(InvalidCursor):
+        cursor.decode(Cursor().encode(KEY), scope="players-prd")
+
+
+# MALFORMED
+def test_malformed(capsys):
+
+    cursor = Cursor()
+
+    for token in (
+        "not a cursor",
+        "a",
+        "_w",
+        Cursor().encode({"name": {"M": {}}}),
+        "e30",
+    ):
+        with pytest.raises(InvalidCursor):
+            cursor.decode(token)
+
+    # A bad cursor is an error of the caller, nothing is logged
+    assert "Something went wrong" not in capsys.readouterr().out
@@ -0,0 +1,63 @@
+import gzip
+import json
+import time
+
+from boto3.dynamodb.types import Binary
+from dynamodb.client import DynamoDBClient
+from inqdo_tools.dynamodb.utils import rate_limited
+
+
+# EXPORT AND IMPORT
+def test_export_import(
+    dynamodb_resource, dynamodb_put_items, dynamodb_create_copy_table, tmp_path
+):
+
+    path = str(tmp_path / "movies.jsonl.gz")
+    dynamodb_resource.Table("movies-prd").put_item(
+        Item={
+            "movieName": "Binary",
+            "poster": b"\x00\xff",
+            "tags": {b"a", b"b"},
+            "crew": [{"photo": b"\x01"}],
+        }
+    )
+
+    exported = DynamoDBClient(table_name="movies-prd").export_to_file(
+        path, total_segments=1, page_size=7
+    )
+
+    with gzip.open(path, "rt") as f:
+        lines = [json.loads(line) for line in f]
+
+    assert exported == {"Success": "Exported items.", "Count": 26}
+    assert len(lines) == 26
+    assert {
+        "Item": {
+            "movieName": {"S": "Movie 00"},
+            "year": {"N": "2000"},
+            "genre": {"S": "drama"},
+        }
+    } in lines
+
+    imported = DynamoDBClient(table_name="movies-copy").import_from_file(
+        path, max_workers=2
+    )
+    copy = dynamodb_resource.Table("movies-copy")
+
+    assert imported == {"Success": "Imported items.", "Count": 26}
+    assert copy.get_item(Key={"movieName": "Binary"})["Item"] == {
+        "movieName": "Binary",
+        "poster": Binary(b"\x00\xff"),
+        "tags": {Binary(b"a"), Binary(b"b")},
+        "crew": [{"photo": Binary(b"\x01")}],
+    }
+    assert len(copy.scan()["Items"]) == 26
+
+
+# RATE LIMITED
+def test_rate_limited():
+
+    started_at = time.monotonic()
+
+    assert list(rate_limited(range(30), per_second=20)) == list(range(30))
+    assert 0.4 < time.monotonic() - started_at < 1.5
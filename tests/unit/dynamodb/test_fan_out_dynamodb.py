@@ -0,0 +1,66 @@
+import time
+
+import pytest
+from inqdo_tools.dynamodb.fan_out import PAGES_PER_SOURCE, fan_out
+
+
+# UNORDERED
+def test_fan_out():
+
+    sources = [
+        lambda i=i: ([i * 10 + j for j in range(3)] for _ in range(2)) for i in range(5)
+    ]
+
+    assert sorted(fan_out(sources, max_workers=2)) == sorted(
+        [i * 10 + j for i in range(5) for j in range(3)] * 2
+    )
+    assert list(fan_out([])) == []
+
+
+# ORDERED
+def test_fan_out_ordered():
+
+    sources = [lambda: [[1, 4], [7]], lambda: [[2, 3]], lambda: [], lambda: [[5, 6, 8]]]
+
+    assert list(fan_out(sources, max_workers=3, key=lambda item: item)) == [
+        1,
+        2,
+        3,
+        4,
+        5,
+        6,
+        7,
+        8,
+    ]
+
+
+# FAILURE
+def test_fan_out_failure():
+    def failing():
+        yield [1]
+        raise RuntimeError("Throttled")
+
+    with pytest.raises(RuntimeError, match="Throttled"):
+        list(fan_out([lambda: [[2]], failing]))
+
+
+# BACKPRESSURE
+@pytest.mark.parametrize("key", [None, lambda item: item])
+def test_fan_out_backpressure(key):
+
+    read = []
+
+    def source(i):
+        for page in range(100):
+            read.append((i, page))
+            yield [i * 1000 + page]
+
+    items = fan_out([lambda i=i: source(i) for i in range(3)], max_workers=3, key=key)
+    first = [next(items) for _ in range(5)]
+    time.sleep(0.3)
+    buffered = len(read)
+    items.close()
+
+    assert len(first) == 5
+    # Without backpressure the readers would have read all 300 pages by now
+    assert buffered <= 5 + 3 * (PAGES_PER_SOURCE + 1)
@@ -0,0 +1,86 @@
+import pytest
+from boto3.dynamodb.conditions import Attr, ConditionExpressionBuilder
+from dynamodb.client import DynamoDBClient
+from inqdo_tools.dynamodb.filters import _split, to_condition, where
+
+
+def build(condition) -> str:
+    return ConditionExpressionBuilder().build_expression(condition).condition_expression
+
+
+# SPLIT
+def test_split():
+
+    assert _split("year__between") == ("year", "between")
+    assert _split("genre") == ("genre", "eq")
+    assert _split("release__date") == ("release__date", "eq")
+    assert _split("release__date__gt") == ("release__date", "gt")
+
+    with pytest.raises(ValueError):
+        _split("year__gtee", strict=True)
+
+
+# WHERE
+def test_where():
+
+    condition = where(
+        genre="drama",
+        year__between=(2000, 2010),
+        title__begins_with="The",
+        rating__exists=False,
+    )
+    expected = (
+        Attr("genre").eq("drama")
+        & Attr("year").between(2000, 2010)
+        & Attr("title").begins_with("The")
+        & Attr("rating").not_exists()
+    )
+
+    assert build(condition) == build(expected)
+    assert build(where({"address.city": "Utrecht"})) == "#n0.#n1 = :v0"
+    assert build(where({"release__date": "2008"})) == build(
+        Attr("release__date").eq("2008")
+    )
+    assert build(where(genre__in=("drama", "action")) | ~where(year__ne=2008)) == (
+        "(#n0 IN (:v0, :v1) OR (NOT #n1 <> :v2))"
+    )
+    assert to_condition(None) is None
+    assert build(to_condition({"tags__contains": "batman"})) == "contains(#n0, :v0)"
+
+
+# WHERE INVALID
+@pytest.mark.parametrize(
+    "lookups,exception",
+    [
+        ({"year__between": 2000}, TypeError),
+        ({"genre__in": "drama"}, TypeError),
+        ({"genre__in": []}, ValueError),
+        ({"title__begins_with": 1}, TypeError),
+        ({"rating__exists": "yes"}, TypeError),
+        ({"rating__type": "STRING"}, ValueError),
+        ({"year__gtee": 5}, ValueError),
+        ({}, ValueError),
+    ],
+)
+def test_where_invalid(lookups, exception):
+
+    with pytest.raises(exception):
+        where(**lookups)
+
+
+# WHERE CLIENT
+def test_where_client(dynamodb_resource, dynamodb_put_items):
+
+    ddbclient = DynamoDBClient(table_name="movies-prd")
+
+    dramas = ddbclient.read_all(filter_expression=where(genre="drama", year__gte=2020))
+    actions = ddbclient.read_all(
+        filter_expression={"genre": "action", "year__lt": 2006}
+    )
+
+    assert sorted(item["movieName"] for item in dramas) == [
+        "Movie 20",
+        "Movie 22",
+        "Movie 24",
+    ]
+    assert sorted(item["year"] for item in actions) == [2001, 2003, 2005]
@@ -0,0 +1,172 @@
+import pytest
+from botocore.exceptions import ClientError
+from dynamodb.client import DynamoDBClient
+from inqdo_tools.dynamodb import metrics as metrics_module
+from inqdo_tools.dynamodb.metrics import InMemoryMetricsSink, MetricsSink, measured
+
+
+def metric(operation="query", latency=1.0, **kwargs):
+    return {"Table": "movies-prd", "Operation": operation, "Latency": latency, **kwargs}
+
+
+# HISTOGRAM AND TOTALS
+def test_in_memory_sink():
+
+    sink = InMemoryMetricsSink(buckets=(10, 100))
+
+    for latency in [1.0] * 8 + [50.0, 400.0]:
+        sink.record(
+            metric(
+                latency=latency,
+                ConsumedCapacity=0.5,
+                Count=2,
+                ScannedCount=4,
+                Bytes=100,
+            )
+        )
+    sink.record(metric(operation="get_item", latency=3.0, Error="ThrottlingException"))
+
+    stats = sink.snapshot()["movies-prd"]
+
+    assert stats["query"]["Calls"] == 10 and stats["query"]["ConsumedCapacity"] == 5.0
+    assert (
+        stats["query"]["Count"] == 20
+        and stats["query"]["ScannedCount"] == 40
+        and stats["query"]["Bytes"] == 1000
+    )
+    assert stats["query"]["Latency"]["Buckets"] == {"10": 8, "100": 1, "+Inf": 1}
+    assert stats["query"]["Latency"]["p50"] == 10.0
+    assert stats["query"]["Latency"]["p90"] == 100.0
+    assert stats["query"]["Latency"]["p99"] == 400.0
+    assert stats["query"]["Latency"]["Max"] == 400.0
+    assert stats["get_item"]["Errors"] == 1 and stats["get_item"]["Count"] == 0
+
+
+# DUMP
+def test_dump(caplog):
+
+    sink = InMemoryMetricsSink()
+    sink.record(metric())
+
+    kept = sink.dump(reset=False, log=False)
+    dumped = sink.dump()
+
+    assert kept == dumped and "movies-prd" in dumped
+    assert '"DynamoDBMetrics"' in caplog.text
+    assert sink.snapshot() == {}
+
+
+# DUMP AFTER LAMBDA INVOCATION
+def test_dump_after(caplog):
+
+    sink = InMemoryMetricsSink()
+
+    @sink.dump_after
+    def handler(event, context):
+        sink.record(metric())
+        raise RuntimeError("failed")
+
+    with pytest.raises(RuntimeError):
+        handler({}, None)
+
+    assert '"movies-prd"' in caplog.text
+    assert sink.snapshot() == {}
+
+
+# SINK WITHOUT RECORD
+def test_sink_without_record():
+    class CloudWatchSink(MetricsSink):
+        def flush(self):
+            pass
+
+    with pytest.raises(TypeError):
+        CloudWatchSink()
+
+
+# MEASURED
+def test_measured():
+
+    sink = InMemoryMetricsSink()
+    requests = []
+
+    def operation(**request):
+        requests.append(request)
+        if request.get("Fail"):
+            raise ClientError(
+                {"Error": {"Code": "ValidationException", "Message": ""}}, "Query"
+            )
+        return {
+            "Count": 3,
+            "ScannedCount": 7,
+            "ConsumedCapacity": {"CapacityUnits": 1.5},
+            "ResponseMetadata": {"HTTPHeaders": {"content-length": "512"}},
+        }
+
+    assert measured(operation, "query", "movies-prd", None) is operation
+
+    measured(operation, "query", "movies-prd", sink)(TableName="movies-prd")
+    with pytest.raises(ClientError):
+        measured(operation, "query", "movies-prd", sink)(
+            TableName="movies-prd", Fail=True
+        )
+
+    stats = sink.snapshot()["movies-prd"]["query"]
+
+    assert requests[0]["ReturnConsumedCapacity"] == "TOTAL"
+    assert stats["Calls"] == 2 and stats["Errors"] == 1
+    assert (
+        stats["Count"] == 3
+        and stats["ScannedCount"] == 7
+        and stats["ConsumedCapacity"] == 1.5
+    )
+    assert stats["Bytes"] == 512
+
+
+# CLIENT OPERATIONS
+def test_client_metrics(dynamodb_resource, dynamodb_put_items):
+
+    sink = InMemoryMetricsSink()
+    ddbclient = DynamoDBClient(table_name="movies-prd", metrics=sink)
+
+    ddbclient.read(table_primary_key="movieName", value_primary_key="Movie 01")
+    ddbclient.read(table_primary_key="movieName", value_primary_key="Movie 99")
+    ddbclient.update(
+        table_primary_key="movieName",
+        value_primary_key="Movie 01",
+        update_expression="SET genre = :g",
+        expression_values={":g": "comedy"},
+    )
+    ddbclient.query(table_primary_key="movieName", query_value="Movie 02")
+    ddbclient.read_all()
+    ddbclient.create_and_update_batch(
+        batch_list=[{"movieName": f"New {i:02d}"} for i in range(30)]
+    )
+    ddbclient.read_batch(keys=[{"movieName": "New 01"}, {"movieName": "New 02"}])
+
+    stats = sink.snapshot()["movies-prd"]
+
+    assert stats["get_item"]["Calls"] == 2 and stats["get_item"]["Count"] == 1
+    assert stats["update_item"]["Calls"] == 1
+    assert stats["query"]["Count"] == 1
+    assert stats["scan"]["Count"] == 25 and stats["scan"]["ScannedCount"] == 25
+    assert (
+        stats["batch_write_item"]["Calls"] == 2
+        and stats["batch_write_item"]["Count"] == 30
+    )
+    assert stats["batch_get_item"]["Count"] == 2
+    assert stats["scan"]["ConsumedCapacity"] > 0
+
+
+# DEFAULT SINK
+def test_client_default_metrics_sink(dynamodb_resource, dynamodb_put_item):
+
+    metrics_module.metrics_sink.reset()
+    ddbclient = DynamoDBClient(table_name="movies-prd", metrics=True)
+    ddbclient.read(table_primary_key="movieName", value_primary_key="The Dark Knight")
+
+    assert ddbclient.metrics is metrics_module.metrics_sink
+    assert (
+        metrics_module.metrics_sink.dump(log=False)["movies-prd"]["get_item"]["Count"]
+        == 1
+    )
+    assert DynamoDBClient(table_name="movies-prd").metrics is None
@@ -0,0 +1,137 @@
+import pytest
+from botocore.exceptions import ClientError
+from dynamodb.client import DynamoDBClient
+from inqdo_tools.dynamodb import rate_limiter as rate_limiter_module
+from inqdo_tools.dynamodb.rate_limiter import CapacityRateLimiter
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(rate_limiter_module.time, "monotonic", lambda: now[0])
+
+    def sleep(seconds):
+        now[0] += seconds
+
+    monkeypatch.setattr(rate_limiter_module.time, "sleep", sleep)
+
+    return now
+
+
+# FROM TABLE
+def test_from_table():
+
+    provisioned = CapacityRateLimiter.from_table(
+        {"ProvisionedThroughput": {"ReadCapacityUnits": 100, "WriteCapacityUnits": 10}},
+        target=0.5,
+    )
+    on_demand = CapacityRateLimiter.from_table(
+        {
+            "BillingModeSummary": {"BillingMode": "PAY_PER_REQUEST"},
+            "ProvisionedThroughput": {},
+        }
+    )
+
+    assert provisioned.stats()["read"] == {
+        "rate": 50.0,
+        "ceiling": 50.0,
+        "consumed": 0.0,
+        "throttles": 0,
+    }
+    assert provisioned.stats()["write"]["ceiling"] == 5.0
+    assert on_demand.stats() == {"read": None, "write": None}
+
+    with pytest.raises(ValueError):
+        CapacityRateLimiter(read_capacity=10, write_capacity=10, target=1.5)
+
+
+# ACQUIRE WAITS FOR CAPACITY
+def test_acquire(clock):
+
+    limiter = CapacityRateLimiter(read_capacity=10, write_capacity=10, target=1)
+    started_at = clock[0]
+
+    for _ in range(30):
+        limiter.acquire("read")
+        limiter.consume("read", 1)
+
+    # 10 units of burst, the other 20 at 10 units per second
+    assert 1.9 < clock[0] - started_at < 2.2
+
+
+# AIMD
+def test_aimd(clock):
+
+    limiter = CapacityRateLimiter(
+        read_capacity=100, write_capacity=100, target=0.8, cooldown=1
+    )
+
+    limiter.throttled("write")
+    limiter.throttled("write")
+
+    assert limiter.stats()["write"]["rate"] == 40.0
+    assert limiter.stats()["write"]["throttles"] == 2
+
+    # 1.5 seconds of additive increase of 4 units per second, then halved
+    clock[0] += 1.5
+    limiter.throttled("write")
+    assert limiter.stats()["write"]["rate"] == 23.0
+
+    clock[0] += 5
+    limiter.acquire("write")
+    assert limiter.stats()["write"]["rate"] == 43.0
+
+    clock[0] += 60
+    limiter.acquire("write")
+    assert limiter.stats()["write"]["rate"] == 80.0
+    assert limiter.stats()["read"]["rate"] == 80.0
+
+
+# CALL
+def test_call(clock):
+
+    limiter = CapacityRateLimiter(read_capacity=10, write_capacity=10, target=1)
+    requests = []
+
+    def batch_write_item(**kwargs):
+        requests.append(kwargs)
+        return {
+            "UnprocessedItems": {"t": [{}]},
+            "ConsumedCapacity": [{"TableName": "t", "CapacityUnits": 4.0}],
+        }
+
+    def throttled_scan(**kwargs):
+        raise ClientError(
+            {"Error": {"Code": "ProvisionedThroughputExceededException"}}, "Scan"
+        )
+
+    limiter.call(batch_write_item, "write", RequestItems={})
+
+    with pytest.raises(ClientError):
+        limiter.call(throttled_scan, "read", TableName="t")
+
+    assert requests == [{"RequestItems": {}, "ReturnConsumedCapacity": "TOTAL"}]
+    assert limiter.stats()["write"] == {
+        "rate": 5.0,
+        "ceiling": 10,
+        "consumed": 4.0,
+        "throttles": 1,
+    }
+    assert limiter.stats()["read"]["throttles"] == 1
+
+
+# CLIENT RATE LIMIT
+def test_client_rate_limit(dynamodb_resource, dynamodb_create_table):
+
+    ddbclient = DynamoDBClient(table_name="movies-prd", rate_limit=0.5)
+
+    ddbclient.create_and_update_batch(
+        batch_list=[{"movieName": f"Movie {i:02d}"} for i in range(60)]
+    )
+    data = ddbclient.read_all()
+    items = ddbclient.read_batch(keys=[{"movieName": "Movie 01"}])
+    stats = ddbclient.rate_limiter.stats()
+
+    assert len(data) == 60 and items == [{"movieName": "Movie 01"}]
+    assert stats["write"]["ceiling"] == 5.0 and stats["write"]["consumed"] > 0
+    assert stats["read"]["consumed"] > 0
@@ -0,0 +1,72 @@
+from collections import OrderedDict, namedtuple
+from decimal import Decimal, Inexact
+
+import pytest
+from boto3.dynamodb.types import Binary, TypeDeserializer, TypeSerializer
+from inqdo_tools.dynamodb.serializer import Deserializer, Serializer
+
+Point = namedtuple("Point", ["x", "y"])
+
+ITEM = {
+    "string": "The Dark Knight",
+    "int": 2008,
+    "big_int": -5 * 10**37,
+    "decimal": Decimal("8.3"),
+    "bool": True,
+    "null": None,
+    "bytes": b"\x00\x01",
+    "binary": Binary(b"\x02"),
+    "map": OrderedDict([("nested", {"list": [1, "two", Decimal("3.5"), None]})]),
+    "tuple": Point(1, 2),
+    "string_set": {"action", "crime"},
+    "number_set": {1, Decimal("2.5")},
+    "binary_set": {b"a", b"b"},
+}
+
+
+def test_serialize_same_as_boto3():
+    assert Serializer().serialize_item(ITEM) == {
+        k: TypeSerializer().serialize(v) for k, v in ITEM.items()
+    }
+
+
+def test_deserialize_same_as_boto3():
+    serialized = Serializer().serialize_items([ITEM, {"string": "other"}])
+
+    assert Deserializer().deserialize_items(serialized) == [
+        {k: TypeDeserializer().deserialize(v) for k, v in item.items()}
+        for item in serialized
+    ]
+
+
+def test_serialize_float():
+    with pytest.raises(TypeError):
+        Serializer().serialize({"a": 1.5})
+
+
+def test_serialize_number_precision():
+    with pytest.raises(Inexact):
+        Serializer().serialize(10**40 + 1)
+
+
+def test_deserialize_numbers():
+    item = {"int": {"N": "5"}, "float": {"N": "8.3"}, "list": {"L": [{"N": "1E+2"}]}}
+
+    assert Deserializer(numbers="float").deserialize_item(item) == {
+        "int": 5.0,
+        "float": 8.3,
+        "list": [100.0],
+    }
+    assert Deserializer(numbers="native").deserialize_item(item) == {
+        "int": 5,
+        "float": 8.3,
+        "list": [100.0],
+    }
+
+    native = Deserializer(numbers="native").deserialize_item(item)
+    assert isinstance(native["int"], int) and isinstance(native["float"], float)
+
+
+def test_deserialize_invalid_numbers_option():
+    with pytest.raises(ValueError):
+        Deserializer(numbers="int")
@@ -0,0 +1,141 @@
+import json
+
+from dynamodb.client import DynamoDBClient
+
+
+def copied_items(dynamodb_resource):
+    items = dynamodb_resource.Table("movies-copy").scan()["Items"]
+    return sorted(items, key=lambda item: item["movieName"])
+
+
+# COPY
+def test_copy(
+    dynamodb_resource,
+    dynamodb_put_items,
+    dynamodb_create_copy_table,
+    dynamodb_segmented_scan,
+):
+
+    source = DynamoDBClient(table_name="movies-prd")
+    requested_segments = dynamodb_segmented_scan(source.dynamodb_client)
+
+    result = source.copy_to(
+        DynamoDBClient(table_name="movies-copy"), total_segments=3, page_size=4
+    )
+
+    assert {segment for segment, _ in requested_segments} == {0, 1, 2}
+    assert (
+        result["Scanned"],
+        result["Copied"],
+        result["Skipped"],
+        result["Failed"],
+    ) == (25, 25, 0, 0)
+    assert result["Resumed"] is False and result["ItemsPerSecond"] > 0
+    assert copied_items(dynamodb_resource) == sorted(
+        dynamodb_resource.Table("movies-prd").scan()["Items"],
+        key=lambda item: item["movieName"],
+    )
+
+
+# COPY WITH TRANSFORM
+def test_copy_with_transform(
+    dynamodb_resource, dynamodb_put_items, dynamodb_create_copy_table
+):
+    def transform(item):
+        if item["genre"] == "drama":
+            return None
+        return {**item, "year": item["year"] + 100}
+
+    result = DynamoDBClient(table_name="movies-prd").copy_to(
+        DynamoDBClient(table_name="movies-copy"), total_segments=1, transform=transform
+    )
+
+    assert (result["Copied"], result["Skipped"]) == (12, 13)
+    assert copied_items(dynamodb_resource)[0] == {
+        "movieName": "Movie 01",
+        "year": 2101,
+        "genre": "action",
+    }
+
+
+# RESUME FROM CHECKPOINT
+def test_copy_resume(
+    dynamodb_resource, dynamodb_put_items, dynamodb_create_copy_table, tmp_path
+):
+
+    checkpoint_file = str(tmp_path / "checkpoint.json")
+    source = DynamoDBClient(table_name="movies-prd")
+    target = DynamoDBClient(table_name="movies-copy")
+    copied = []
+
+    def interrupting_transform(item):
+        if len(copied) == 12:
+            raise KeyboardInterrupt()
+        copied.append(item["movieName"])
+        return item
+
+    try:
+        source.copy_to(
+            target,
+            total_segments=1,
+            page_size=5,
+            transform=interrupting_transform,
+            checkpoint_file=checkpoint_file,
+            checkpoint_interval=0,
+        )
+    except KeyboardInterrupt:
+        pass
+
+    with open(checkpoint_file) as f:
+        checkpoint = json.load(f)
+
+    assert checkpoint["Segments"]["0"]["Done"] is False
+    assert len(copied_items(dynamodb_resource)) == 10
+
+    result = source.copy_to(
+        target, total_segments=1, page_size=5, checkpoint_file=checkpoint_file
+    )
+
+    assert result["Resumed"] is True and result["Copied"] == 15
+    assert len(copied_items(dynamodb_resource)) == 25
+
+    mismatch = source.copy_to(target, total_segments=2, checkpoint_file=checkpoint_file)
+
+    assert mismatch["Error"] == "Something went wrong."
+
+
+# RESUME AFTER FAILED ITEMS
+def test_copy_resume_failed(
+    dynamodb_resource, dynamodb_put_items, dynamodb_create_copy_table, tmp_path
+):
+
+    checkpoint_file = str(tmp_path / "checkpoint.json")
+    source = DynamoDBClient(table_name="movies-prd")
+    target = DynamoDBClient(table_name="movies-copy")
+
+    def breaking_transform(item):
+        # An item without its key is rejected by DynamoDB
+        if item["movieName"] == "Movie 07":
+            return {"year": item["year"]}
+        return item
+
+    failed = source.copy_to(
+        target,
+        total_segments=1,
+        page_size=5,
+        transform=breaking_transform,
+        checkpoint_file=checkpoint_file,
+    )
+
+    with open(checkpoint_file) as f:
+        checkpoint = json.load(f)
+
+    assert failed["Failed"] == 1 and failed["Copied"] == 24
+    assert checkpoint["Segments"]["0"]["Done"] is False
+
+    resumed = source.copy_to(
+        target, total_segments=1, page_size=5, checkpoint_file=checkpoint_file
+    )
+
+    assert resumed["Resumed"] is True and resumed["Failed"] == 0
+    assert len(copied_items(dynamodb_resource)) == 25
@@ -0,0 +1,120 @@
+import pytest
+from dynamodb.client import ComparisonOperators, DynamoDBClient
+from inqdo_tools.dynamodb import table_metadata as table_metadata_module
+from inqdo_tools.dynamodb.table_metadata import TableMetadataCache, table_metadata_cache
+
+
+class CountingClient(object):
+    """Wraps a low-level client and counts the describe_table calls"""
+
+    def __init__(self, client):
+        self.client = client
+        self.exceptions = client.exceptions
+        self.calls = 0
+
+    def describe_table(self, **kwargs):
+        self.calls += 1
+        return self.client.describe_table(**kwargs)
+
+
+# METADATA
+def test_table_metadata(dynamodb_resource, dynamodb_put_items_with_indexes):
+
+    metadata = DynamoDBClient(table_name="readings-prd").table_metadata()
+
+    assert metadata.key_names == ["device", "timestamp"]
+    assert metadata.partition_key == "device" and metadata.sort_key == "timestamp"
+    assert metadata.to_dict()["Indexes"] == {
+        "by-status": ["device", "status"],
+        "by-site": ["site", "timestamp"],
+    }
+    assert metadata.billing_mode == "PROVISIONED"
+
+
+# CACHE TTL
+def test_table_metadata_cache(dynamodb_resource, dynamodb_create_table, monkeypatch):
+
+    now = [1000.0]
+    monkeypatch.setattr(table_metadata_module.time, "monotonic", lambda: now[0])
+    client = CountingClient(
+        DynamoDBClient(table_name="movies-prd", check_exists=False).dynamodb_client
+    )
+    cache = TableMetadataCache(ttl=60)
+
+    first = cache.get(client, "movies-prd", scope=("eu-west-1",))
+    cache.get(client, "movies-prd", scope=("eu-west-1",))
+    cache.get(client, "movies-prd", scope=("us-east-1",))
+    now[0] += 61
+    cache.get(client, "movies-prd", scope=("eu-west-1",))
+    cache.get(client, "movies-prd", scope=("eu-west-1",), refresh=True)
+
+    assert first.key_names == ["movieName"] and client.calls == 4
+
+    with pytest.raises(ValueError):
+        cache.get(client, "series-prd")
+
+
+# SHARED BETWEEN CLIENTS
+def test_table_metadata_shared(dynamodb_resource, dynamodb_create_table):
+
+    DynamoDBClient(table_name="movies-prd")
+    client = DynamoDBClient(table_name="movies-prd", check_exists=False)
+    counting_client = CountingClient(client.dynamodb_client)
+    client.dynamodb_client = counting_client
+
+    assert client.key_names == ["movieName"] and counting_client.calls == 0
+
+    table_metadata_cache.clear()
+
+    assert (
+        client.table_metadata(refresh=True).key_names == ["movieName"]
+        and counting_client.calls == 1
+    )
+
+    with pytest.raises(ValueError):
+        DynamoDBClient(table_name="series-prd")
+
+
+# LAZY EXISTENCE CHECK
+def test_check_exists_lazy(dynamodb_resource):
+
+    ddbclient = DynamoDBClient(table_name="series-prd", check_exists=False)
+
+    assert ddbclient.read(value_primary_key="Dark")["Error"] == "Something went wrong."
+
+
+# INFERRED KEY NAMES
+def test_inferred_key_names(
+    dynamodb_resource, dynamodb_put_items_with_indexes, dynamodb_create_table
+):
+
+    ddbclient = DynamoDBClient(table_name="readings-prd", check_exists=False)
+
+    item = ddbclient.read(value_primary_key="device-0", value_sort_key=1000)
+    updated = ddbclient.update(
+        value_primary_key="device-0",
+        value_sort_key=1000,
+        update_expression="SET reading = :v",
+        expression_values={":v": 99},
+    )
+    partition = ddbclient.query(query_value="device-1")
+    newer = ddbclient.query(
+        value_primary_key="device-1",
+        query_value=1015,
+        comparison_operator=ComparisonOperators.GT,
+    )
+    deleted = ddbclient.delete(value_primary_key="device-0", value_sort_key=1002)
+
+    assert item["value"] == 0 and updated == {"Success": "Updated fields."}
+    assert len(partition) == 10 and [item["timestamp"] for item in newer] == [
+        1017,
+        1019,
+    ]
+    assert deleted == {"Success": "Deleted item from database."}
+    assert (
+        ddbclient.read(value_primary_key="device-0", value_sort_key=1000)["reading"]
+        == 99
+    )
+    assert "Error" in DynamoDBClient(table_name="movies-prd").read(
+        value_primary_key="Dark", value_sort_key=1
+    )
@@ -0,0 +1,137 @@
+import boto3
+import pytest
+from boto3.dynamodb.conditions import Attr
+from botocore.exceptions import ClientError
+from dynamodb.client import DynamoDBClient
+from inqdo_tools.dynamodb.serializer import serializer
+from inqdo_tools.dynamodb.transaction import TransactionBuilder
+
+
+def builder(**kwargs):
+    client = boto3.client("dynamodb", region_name="eu-west-1")
+    return TransactionBuilder(
+        client=client, table_name="movies-prd", serialize=serializer.serialize, **kwargs
+    )
+
+
+def read(name):
+    return DynamoDBClient(table_name="movies-prd").read(
+        table_primary_key="movieName", value_primary_key=name
+    )
+
+
+# COMMIT
+def test_commit(dynamodb_resource, dynamodb_put_items):
+
+    transaction = builder()
+    transaction.put(
+        {"movieName": "Movie 30", "year": 2030},
+        condition=Attr("movieName").not_exists(),
+    )
+    transaction.update(
+        {"movieName": "Movie 01"},
+        "SET #y = :y",
+        expression_values={":y": 1999},
+        expression_names={"#y": "year"},
+    )
+    transaction.delete({"movieName": "Movie 02"})
+    transaction.condition_check(
+        {"movieName": "Movie 03"}, condition=Attr("genre").eq("action")
+    )
+
+    assert len(transaction) == 4
+    assert transaction.commit() == {"Committed": 4, "Transactions": 1}
+    assert len(transaction) == 0
+    assert read("Movie 30") == {"movieName": "Movie 30", "year": 2030}
+    assert read("Movie 01")["year"] == 1999
+    assert read("Movie 02").startswith("No items found.")
+
+
+# COMMIT IN CHUNKS
+def test_commit_chunks(dynamodb_resource, dynamodb_create_table):
+
+    transaction = builder()
+    for i in range(250):
+        transaction.put({"movieName": f"Movie {i:03d}", "year": 2000})
+
+    assert transaction.commit() == {"Committed": 250, "Transactions": 3}
+    assert len(DynamoDBClient(table_name="movies-prd").read_all()) == 250
+
+
+# CONDITION FAILED
+def test_condition_failed(dynamodb_resource, dynamodb_put_items):
+
+    transaction = builder()
+    transaction.put(
+        {"movieName": "Movie 01", "year": 1999},
+        condition=Attr("movieName").not_exists(),
+    )
+    transaction.delete({"movieName": "Movie 02"})
+
+    with pytest.raises(ClientError):
+        transaction.commit()
+
+    assert read("Movie 01")["year"] == 2001
+    assert read("Movie 02")["year"] == 2002
+
+
+# RETRY ON CONFLICT
+def test_retry_on_conflict(dynamodb_resource, dynamodb_put_items, monkeypatch):
+
+    transaction = builder()
+    transact_write_items = transaction.client.transact_write_items
+    tokens = []
+
+    def conflicting_transact_write_items(**kwargs):
+        tokens.append(kwargs["ClientRequestToken"])
+        if len(tokens) < 3:
+            raise ClientError(
+                {
+                    "Error": {
+                        "Code": "TransactionCanceledException",
+                        "Message": "Transaction cancelled",
+                    },
+                    "CancellationReasons": [
+                        {"Code": "TransactionConflict"},
+                        {"Code": "None"},
+                    ],
+                },
+                "TransactWriteItems",
+            )
+        return transact_write_items(**kwargs)
+
+    monkeypatch.setattr(
+        transaction.client, "transact_write_items", conflicting_transact_write_items
+    )
+    transaction.delete({"movieName": "Movie 01"}).delete({"movieName": "Movie 02"})
+
+    assert transaction.commit() == {"Committed": 2, "Transactions": 1}
+    assert len(tokens) == 3 and len(set(tokens)) == 1
+
+
+# CLIENT TRANSACTION
+def test_client_transaction(dynamodb_client, dynamodb_put_items):
+
+    ddbclient = DynamoDBClient(
+        table_name="movies-prd",
+        arn="arn:aws:iam::123456789012:role/service-role/test-role",
+        cache=True,
+    )
+    ddbclient.read(table_primary_key="movieName", value_primary_key="Movie 04")
+
+    with ddbclient.transaction() as transaction:
+        transaction.put({"movieName": "Movie 04", "year": 1996})
+        transaction.put({"movieName": "Movie 31", "year": 2031})
+
+    assert (
+        ddbclient.read(table_primary_key="movieName", value_primary_key="Movie 04")[
+            "year"
+        ]
+        == 1996
+    )
+    assert (
+        ddbclient.read(table_primary_key="movieName", value_primary_key="Movie 31")[
+            "year"
+        ]
+        == 2031
+    )
@@ -0,0 +1,208 @@
+import pytest
+from dynamodb.client import DynamoDBClient
+from inqdo_tools.dynamodb.serializer import deserializer, serializer
+from inqdo_tools.dynamodb.upsert import MAX_CONDITION_SIZE, DiffUpsert, content_hash
+
+
+def movies(count: int, changed: dict = None) -> list:
+    changed = changed or {}
+    return [
+        {
+            "movieName": f"Movie {i:02d}",
+            "year": 2000 + i,
+            "genre": changed.get(i, "drama"),
+        }
+        for i in range(count)
+    ]
+
+
+# CONTENT HASH
+def test_content_hash():
+
+    item = {
+        "movieName": "The Dark Knight",
+        "tags": {"batman", "joker", "gotham"},
+        "meta": {"a": 1, "b": [1, 2]},
+    }
+    reordered = {
+        "meta": {"b": [1, 2], "a": 1},
+        "tags": {"gotham", "joker", "batman"},
+        "movieName": "The Dark Knight",
+    }
+
+    assert content_hash(item) == content_hash(reordered)
+    assert content_hash(item) != content_hash({**item, "meta": {"a": 1, "b": [2, 1]}})
+    assert content_hash(
+        {**item, "contentHash": "x"}, exclude=["contentHash"]
+    ) == content_hash(item)
+
+
+# HASH MODE
+def test_diff_upsert_hash(dynamodb_resource, dynamodb_create_table):
+
+    ddbclient = DynamoDBClient(table_name="movies-prd")
+
+    first = ddbclient.create_and_update_batch(batch_list=movies(150), diff="hash")
+    second = ddbclient.create_and_update_batch(
+        batch_list=movies(152, changed={3: "action", 120: "comedy"}), diff="hash"
+    )
+    stored = ddbclient.read(table_primary_key="movieName", value_primary_key="Movie 03")
+
+    assert first == {
+        "Success": "Saved or updated changed items in batch.",
+        "Written": 150,
+        "Skipped": 0,
+        "Conflicts": 0,
+    }
+    assert second["Written"] == 4 and second["Skipped"] == 148
+    assert stored["genre"] == "action" and stored["contentHash"] == content_hash(
+        movies(4, changed={3: "action"})[3]
+    )
+
+
+# ITEM MODE
+def test_diff_upsert_item(dynamodb_resource, dynamodb_put_items):
+
+    ddbclient = DynamoDBClient(table_name="movies-prd")
+    items = ddbclient.read_all()
+    items[0] = {**items[0], "genre": "western"}
+
+    result = ddbclient.create_and_update_batch(
+        batch_list=items + [items[1]], diff="item", max_workers=2
+    )
+
+    assert result["Written"] == 1 and result["Skipped"] == 25
+    assert "contentHash" not in ddbclient.read(
+        table_primary_key="movieName", value_primary_key="Movie 01"
+    )
+
+
+# CONFLICTS
+def test_diff_upsert_conflict(dynamodb_resource, dynamodb_put_item, monkeypatch):
+
+    dynamodb_client = DynamoDBClient(table_name="movies-prd").dynamodb_client
+    upsert = DiffUpsert(
+        client=dynamodb_client,
+        table_name="movies-prd",
+        key_names=["movieName"],
+        serialize=serializer.serialize_item,
+        deserialize=deserializer.deserialize_item,
+    )
+    # The item was written by someone else after it was read
+    monkeypatch.setattr(upsert, "_prefetch", lambda items: {})
+
+    result = upsert.write([{"movieName": "The Dark Knight", "year": "2008"}])
+
+    assert result == {"Written": 0, "Skipped": 0, "Conflicts": 1, "Failed": []}
+
+    with pytest.raises(ValueError):
+        DiffUpsert(
+            dynamodb_client,
+            "movies-prd",
+            ["movieName"],
+            serializer.serialize_item,
+            dict,
+            compare="size",
+        )
+
+
+# ITEM MODE CONFLICTS
+def test_diff_upsert_item_conflict(dynamodb_resource, dynamodb_put_item, monkeypatch):
+
+    dynamodb_client = DynamoDBClient(table_name="movies-prd").dynamodb_client
+    upsert = DiffUpsert(
+        client=dynamodb_client,
+        table_name="movies-prd",
+        key_names=["movieName"],
+        serialize=serializer.serialize_item,
+        deserialize=deserializer.deserialize_item,
+        compare="item",
+    )
+    prefetch = upsert._prefetch
+
+    def racing_prefetch(items):
+        stored = prefetch(items)
+        # Someone else changes the item after it was read
+        dynamodb_resource.Table("movies-prd").update_item(
+            Key={"movieName": "The Dark Knight"},
+            UpdateExpression="SET #y = :y",
+            ExpressionAttributeNames={"#y": "year"},
+            ExpressionAttributeValues={":y": "2009"},
+        )
+        return stored
+
+    monkeypatch.setattr(upsert, "_prefetch", racing_prefetch)
+
+    result = upsert.write([{"movieName": "The Dark Knight", "year": "2010"}])
+
+    assert result == {"Written": 0, "Skipped": 0, "Conflicts": 1, "Failed": []}
+    stored = dynamodb_resource.Table("movies-prd").get_item(
+        Key={"movieName": "The Dark Knight"}
+    )["Item"]
+    assert stored["year"] == "2009"
+
+
+# WIDE ITEMS
+def test_diff_upsert_item_wide(dynamodb_resource, dynamodb_create_table, monkeypatch):
+
+    dynamodb_client = DynamoDBClient(table_name="movies-prd").dynamodb_client
+    upsert = DiffUpsert(
+        client=dynamodb_client,
+        table_name="movies-prd",
+        key_names=["movieName"],
+        serialize=serializer.serialize_item,
+        deserialize=deserializer.deserialize_item,
+        compare="item",
+    )
+    wide = {
+        "movieName": "The Dark Knight",
+        "contentHash": "a",
+        **{f"attribute{i}": i for i in range(400)},
+    }
+    dynamodb_resource.Table("movies-prd").put_item(Item=wide)
+
+    put_item = dynamodb_client.put_item
+    requests = []
+
+    def recording_put_item(**kwargs):
+        requests.append(kwargs)
+        return put_item(**kwargs)
+
+    monkeypatch.setattr(dynamodb_client, "put_item", recording_put_item)
+
+    result = upsert.write([{**wide, "attribute0": -1}])
+
+    condition = requests[0]["ConditionExpression"]
+    assert result == {"Written": 1, "Skipped": 0, "Conflicts": 0, "Failed": []}
+    assert len(condition) <= MAX_CONDITION_SIZE
+    assert requests[0]["ExpressionAttributeNames"]["#c0"] == "contentHash"
+    assert (
+        len(requests[0]["ExpressionAttributeNames"])
+        == condition.count(" AND ") + 1
+        < len(wide)
+    )
+
+
+# CACHE
+def test_diff_upsert_cache(dynamodb_resource, dynamodb_put_items):
+
+    ddbclient = DynamoDBClient(table_name="movies-prd", cache=True)
+    items = ddbclient.read_all()
+
+    def read(name):
+        return ddbclient.read(table_primary_key="movieName", value_primary_key=name)
+
+    read("Movie 00"), read("Movie 01")
+    changed = [
+        {**item, "genre": "western"} if item["movieName"] == "Movie 00" else item
+        for item in items
+    ]
+
+    result = ddbclient.create_and_update_batch(batch_list=changed, diff="item")
+
+    assert result["Written"] == 1 and result["Skipped"] == 24
+    assert read("Movie 00")["genre"] == "western"
+    # The skipped item is still cached
+    assert (
+        read("Movie 01")["genre"] == "action" and ddbclient.cache.stats()["hits"] == 1
+    )
@@ -0,0 +1,61 @@
+import json
+
+import pytest
+from boto3.dynamodb.conditions import Attr, Key
+from inqdo_tools.dynamodb.utils import (
+    build_projection,
+    build_request,
+    from_json_item,
+    to_json_item,
+)
+
+
+def test_build_projection():
+    request = build_projection(["year", "address.lines[0]", "name", "address.city"])
+
+    assert request == {
+        "ProjectionExpression": "#p0, #p1.#p2[0], #p3, #p1.#p4",
+        "ExpressionAttributeNames": {
+            "#p0": "year",
+            "#p1": "address",
+            "#p2": "lines",
+            "#p3": "name",
+            "#p4": "city",
+        },
+    }
+
+
+def test_build_projection_invalid_path():
+    with pytest.raises(ValueError):
+        build_projection(["address..city"])
+
+
+def test_build_request():
+    request = build_request(
+        serialize=lambda value: {"S": value},
+        key_condition=Key("name").eq("inQdo"),
+        filter_expression=Attr("position").eq("keeper"),
+        projection=["name"],
+    )
+
+    assert request == {
+        "KeyConditionExpression": "#n0 = :v0",
+        "FilterExpression": "#n1 = :v1",
+        "ProjectionExpression": "#p0",
+        "ExpressionAttributeNames": {"#n0": "name", "#n1": "position", "#p0": "name"},
+        "ExpressionAttributeValues": {":v0": {"S": "inQdo"}, ":v1": {"S": "keeper"}},
+    }
+
+
+def test_json_item_round_trip():
+
+    item = {
+        "b": {"B": b"\x00"},
+        "m": {"M": {"l": {"L": [{"BS": [b"\x01"]}, {"N": "1"}]}}},
+    }
+
+    assert json.loads(json.dumps(to_json_item(item))) == {
+        "b": {"B": "AA=="},
+        "m": {"M": {"l": {"L": [{"BS": ["AQ=="]}, {"N": "1"}]}}},
+    }
+    assert from_json_item(to_json_item(item)) == item
@@ -0,0 +1,70 @@
+import os
+import re
+import subprocess
+import sys
+
+import inqdo_tools
+
+# Cumulative import time budget for `from inqdo_tools import Response` in microseconds
+IMPORT_TIME_BUDGET_US = 100000
+
+
+def _run_isolated(code: str, *args: str) -> subprocess.CompletedProcess:
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)}
+    env.pop("DEBUG_INQDO_TOOLS", None)
+
+    return subprocess.run(
+        [sys.executable, *args, "-c", code],
+        capture_output=True,
+        env=env,
+        text=True,
+        check=True,
+    )
+
+
+def test_public_names():
+    """Test that every name in __all__ resolves lazily"""
+
+    for name in inqdo_tools.__all__:
+        assert getattr(inqdo_tools, name) is not None
+
+    assert set(inqdo_tools.__all__) <= set(dir(inqdo_tools))
+
+
+def test_unknown_name():
+    """Test that unknown names still raise an AttributeError"""
+
+    try:
+        inqdo_tools.DoesNotExist
+    except AttributeError as e:
+        assert "DoesNotExist" in str(e)
+    else:
+        assert False
+
+
+def test_response_import_does_not_load_boto3():
+    """Test that importing Response does not pull in boto3"""
+
+    result = _run_isolated(
+        "import sys; from inqdo_tools import Response; "
+        "print(sorted(m for m in sys.modules if m.split('.')[0] in ('boto3', 'botocore')))"
+    )
+
+    assert result.stdout.strip() == "[]"
+
+
+def test_response_import_time_budget():
+    """Test that importing Response stays within the import time budget"""
+
+    result = _run_isolated("from inqdo_tools import Response", "-X", "importtime")
+
+    cumulative = [
+        int(match.group(1))
+        for match in re.finditer(
+            r"^import time:\s+\d+ \|\s+(\d+) \|\s*inqdo_tools$",
+            result.stderr,
+            re.MULTILINE,
+        )
+    ]
+
+    assert cumulative and cumulative[0] < IMPORT_TIME_BUDGET_US
@@ -1,4 +1,6 @@
-from inqdo_tools.utils.assume_role import AssumeRole
+from datetime import datetime, timedelta, timezone
+
+from inqdo_tools.utils.assume_role import AssumeRole, credential_cache
 
 
 def test_get_credentials(sts_client):
@@ -32,3 +34,49 @@ def test_get_credentials_with_session_name(sts_client):
         "SessionToken",
         "Expiration",
     ]
+
+
+def test_credentials_are_cached(sts_client):
+    """Test that the same role and session name share one STS call"""
+
+    credential_cache.clear()
+
+    role_arn = "1234567891010987654321"
+    first = AssumeRole(role_arn=role_arn)
+    second = AssumeRole(role_arn=role_arn)
+    other_session = AssumeRole(role_arn=role_arn, role_session_name="other")
+
+    assert first.get_credentials() is second.get_credentials()
+    assert first.get_credentials() is not other_session.get_credentials()
+    assert credential_cache.stats() == {
+        "hits": 1,
+        "misses": 2,
+        "refreshes": 0,
+        "size": 2,
+    }
+
+
+def test_expiring_credentials_are_refreshed(sts_client):
+    """Test that credentials inside the mandatory refresh window are not handed out"""
+
+    credential_cache.clear()
+
+    role_arn = "1234567891010987654321"
+    first = AssumeRole(role_arn=role_arn)
+    first.get_credentials()["Expiration"] = datetime.now(timezone.utc) + timedelta(
+        minutes=5
+    )
+
+    second = AssumeRole(role_arn=role_arn)
+
+    assert second.get_credentials() is not first.get_credentials()
+    assert credential_cache.stats()["misses"] == 2
+
+
+def test_refreshable_credentials(sts_client):
+    """Test the refreshable credentials of the AssumeRole object"""
+
+    my_client = AssumeRole(role_arn="1234567891010987654321")
+    credentials = my_client.get_refreshable_credentials().get_frozen_credentials()
+
+    assert credentials.access_key == my_client.get_credentials()["AccessKeyId"]
@@ -1,4 +1,6 @@
 from inqdo_tools.utils.common import (
+    b64decode,
+    b64encode,
     destruct_dict,
     dict_get,
     dict_get_forced,
@@ -78,3 +80,14 @@ def test_destruct_dict():
     )
 
     assert destructed_items == ("a", "b")
+
+
+def test_b64encode_urlsafe():
+    data = {"key": "??>>~~", "number": 1}
+
+    encoded = b64encode(d=data, urlsafe=True)
+
+    assert "+" not in encoded and "/" not in encoded and "=" not in encoded
+    assert b64decode(b=encoded, urlsafe=True) == data
+    assert b64decode(b=b64encode(d=data)) == data
+    assert b64decode(b="not/valid", urlsafe=True)["Error"] == "Something went wrong."
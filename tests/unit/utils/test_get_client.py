@@ -1,3 +1,5 @@
+from inqdo_tools.utils.assume_role import credential_cache
+from inqdo_tools.utils.client_cache import client_cache
 from inqdo_tools.utils.get_client import Client
 
 
@@ -5,6 +7,52 @@ def test_client_with_arn(sts_client):
     """Test get client with arn"""
 
     role_arn = "1234567891010987654321"
-    my_client = Client('sts', arn=role_arn)
+    my_client = Client("sts", arn=role_arn)
 
     assert my_client.region == "eu-west-1"
+
+
+def test_client_is_cached(sts_client):
+    """Test that clients with the same settings are reused"""
+
+    client_cache.clear()
+
+    first = Client("sts").service
+    second = Client("sts").service
+    other_region = Client("sts", region="eu-central-1").service
+
+    assert first is second
+    assert first is not other_region
+    assert client_cache.stats() == {"hits": 1, "misses": 2, "size": 2}
+
+
+def test_client_cache_invalidate(sts_client):
+    """Test explicit invalidation of cached clients"""
+
+    client_cache.clear()
+
+    first = Client("sts").service
+    Client("sts", region="eu-central-1")
+
+    assert client_cache.invalidate(service="sts", region="eu-west-1") == 1
+    assert Client("sts").service is not first
+    assert client_cache.invalidate() == 2
+
+
+def test_client_without_cache(sts_client):
+    """Test that the cache can be bypassed"""
+
+    assert Client("sts", cache=False).service is not Client("sts", cache=False).service
+
+
+def test_clients_share_assumed_role_credentials(sts_client):
+    """Test that clients for the same role reuse one set of credentials"""
+
+    client_cache.clear()
+    credential_cache.clear()
+
+    role_arn = "1234567891010987654321"
+    Client("sts", arn=role_arn)
+    Client("ssm", arn=role_arn)
+
+    assert credential_cache.stats()["misses"] == 1